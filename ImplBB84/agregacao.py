@@ -0,0 +1,126 @@
+import numpy as np
+
+# Máximo de pontos por série enviada ao navegador, qualquer que seja n_bits
+MAX_PONTOS = 2000
+
+# Largura padrão da janela da densidade de erros, como fração dos qubits transmitidos
+FRACAO_JANELA = 0.02
+
+
+def limites_intervalos(n, n_intervalos=MAX_PONTOS):
+    """
+    Divide n posições em intervalos consecutivos de larguras quase iguais
+
+    Args:
+        n (int): Número de posições
+        n_intervalos (int): Número desejado de intervalos (no máximo n)
+
+    Returns:
+        np.ndarray: n_intervalos + 1 limites crescentes, de 0 a n
+    """
+    n_intervalos = max(1, min(n_intervalos, n))
+    return np.linspace(0, n, n_intervalos + 1).round().astype(np.int64)
+
+
+def _razao(numerador, denominador):
+    """
+    Divide elemento a elemento, com NaN onde o denominador é zero
+
+    O resultado é float32: basta para gráficos e reduz o que vai ao navegador.
+    """
+    numerador = np.asarray(numerador, dtype=np.float32)
+    denominador = np.asarray(denominador, dtype=np.float32)
+    return np.divide(numerador, denominador, out=np.full_like(numerador, np.nan), where=denominador > 0)
+
+
+def contagens_por_intervalo(resultado, limites):
+    """
+    Conta bits peneirados e erros em cada intervalo de qubits
+
+    Args:
+        resultado (ResultadoBB84): Resultado completo da execução
+        limites (np.ndarray): Limites dos intervalos (ver `limites_intervalos`)
+
+    Returns:
+        tuple: (bits peneirados, erros) por intervalo
+    """
+    mesma_base = resultado.mesma_base
+    erros = (resultado.alice_bits != resultado.bob_resultados) & mesma_base
+    inicios = limites[:-1]
+    return (np.add.reduceat(mesma_base, inicios, dtype=np.int64),
+            np.add.reduceat(erros, inicios, dtype=np.int64))
+
+
+def evolucao(resultado, n_pontos=MAX_PONTOS, janela=None):
+    """
+    Resume a execução ao longo da transmissão em no máximo `n_pontos` intervalos
+
+    Todas as séries saem de duas reduções vetorizadas (`np.add.reduceat`)
+    sobre as máscaras de peneiramento e de erro, seguidas de somas
+    acumuladas sobre os intervalos; o tamanho da saída não depende de
+    n_bits. A densidade de erros usa uma janela deslizante de `janela`
+    qubits, arredondada para um número inteiro de intervalos.
+
+    Args:
+        resultado (ResultadoBB84): Resultado completo da execução
+        n_pontos (int): Número máximo de intervalos
+        janela (int | None): Largura da janela em qubits (None usa `FRACAO_JANELA` de n_bits)
+
+    Returns:
+        dict: Arrays por intervalo ('qubits' ao fim do intervalo, 'taxa_erro_acumulada',
+            'taxa_erro_intervalo', 'densidade_erros', 'fracao_peneirada') e a 'janela' efetiva em qubits
+    """
+    n = resultado.n_bits
+    if n == 0:
+        vazio = np.array([], dtype=np.float32)
+        return {'qubits': np.array([], dtype=np.int32), 'taxa_erro_acumulada': vazio, 'taxa_erro_intervalo': vazio,
+                'densidade_erros': vazio, 'fracao_peneirada': vazio, 'janela': 0}
+
+    limites = limites_intervalos(n, n_pontos)
+    peneirados, erros = contagens_por_intervalo(resultado, limites)
+    peneirados_acumulados = np.cumsum(peneirados)
+    erros_acumulados = np.cumsum(erros)
+
+    # Janela deslizante: diferença entre somas acumuladas defasadas de k intervalos
+    largura_media = n / len(peneirados)
+    janela = janela if janela is not None else FRACAO_JANELA * n
+    k = int(min(max(1, round(janela / largura_media)), len(peneirados)))
+    peneirados_janela = peneirados_acumulados - np.concatenate([np.zeros(k, dtype=np.int64),
+                                                                peneirados_acumulados[:-k]])
+    erros_janela = erros_acumulados - np.concatenate([np.zeros(k, dtype=np.int64), erros_acumulados[:-k]])
+
+    return {
+        'qubits': limites[1:].astype(np.int32),
+        'taxa_erro_acumulada': _razao(erros_acumulados, peneirados_acumulados),
+        'taxa_erro_intervalo': _razao(erros, peneirados),
+        'densidade_erros': _razao(erros_janela, peneirados_janela),
+        'fracao_peneirada': _razao(peneirados, np.diff(limites)),
+        'janela': int(round(k * largura_media)),
+    }
+
+
+def mapa_erros(resultado, linhas=40, colunas=100):
+    """
+    Dispõe a taxa de erro por intervalo em uma grade, para um mapa de calor
+
+    A transmissão é dividida em até linhas × colunas intervalos, lidos
+    linha a linha; rajadas de erro aparecem como regiões contíguas. Células
+    sem bits peneirados (ou além do último intervalo) ficam com NaN.
+
+    Args:
+        resultado (ResultadoBB84): Resultado completo da execução
+        linhas (int): Linhas da grade
+        colunas (int): Colunas da grade
+
+    Returns:
+        tuple: (matriz linhas × colunas de taxas de erro, qubits por célula)
+    """
+    n = resultado.n_bits
+    celulas = np.full(linhas * colunas, np.nan, dtype=np.float32)
+    if n == 0:
+        return celulas.reshape(linhas, colunas), 0
+
+    limites = limites_intervalos(n, linhas * colunas)
+    peneirados, erros = contagens_por_intervalo(resultado, limites)
+    celulas[:len(peneirados)] = _razao(erros, peneirados)
+    return celulas.reshape(linhas, colunas), n / len(peneirados)
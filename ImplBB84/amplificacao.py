@@ -0,0 +1,101 @@
+import numpy as np
+from scipy.fft import next_fast_len
+
+from reconciliacao import entropia_binaria
+
+
+def comprimento_seguro(n, taxa_erro, bits_vazados, epsilon=1e-10):
+    """
+    Calcula quantos bits secretos podem ser extraídos de uma chave reconciliada
+
+    Usa o limite assintótico do BB84, n·(1 - h(QBER)), descontando os bits
+    revelados na reconciliação e a margem 2·log2(1/ε) do lema do hash residual.
+
+    Args:
+        n (int): Tamanho da chave reconciliada
+        taxa_erro (float): Taxa de erro medida
+        bits_vazados (float): Bits revelados no canal clássico durante a reconciliação
+        epsilon (float): Parâmetro de segurança da amplificação
+
+    Returns:
+        int: Tamanho da chave final (zero se nada puder ser extraído)
+    """
+    m = n * (1 - float(entropia_binaria(taxa_erro))) - bits_vazados - 2 * np.log2(1 / epsilon)
+    return max(0, int(np.floor(m)))
+
+
+def hash_toeplitz(semente, blocos, m):
+    """
+    Multiplica uma matriz de Toeplitz m×n por vários blocos de bits, em GF(2)
+
+    A matriz T[i, j] = semente[i - j + n - 1] torna o produto T·x igual a um
+    trecho da convolução entre a semente e x, calculada por FFT em
+    O((n + m)·log(n + m)) em vez de O(n·m). A convolução circular de
+    comprimento n + m - 1 basta: o trecho usado não recebe termos circulares.
+
+    Args:
+        semente (np.ndarray): Vetor de n + m - 1 bits que define a matriz
+        blocos (np.ndarray): Matriz (blocos, n) de bits
+        m (int): Número de bits de saída por bloco
+
+    Returns:
+        np.ndarray: Matriz (blocos, m) de bits uint8
+    """
+    blocos = np.atleast_2d(blocos)
+    n = blocos.shape[1]
+    tamanho_fft = next_fast_len(n + m - 1, real=True)
+
+    espectro = np.fft.rfft(semente, tamanho_fft) * np.fft.rfft(blocos, tamanho_fft, axis=1)
+    convolucao = np.fft.irfft(espectro, tamanho_fft, axis=1)[:, n - 1:n - 1 + m]
+    return (np.rint(convolucao).astype(np.int64) & 1).astype(np.uint8)
+
+
+def amplificacao_privacidade(chave, taxa_erro, bits_vazados, epsilon=1e-10, tamanho_bloco=None, seed=None):
+    """
+    Comprime a chave reconciliada com hashing de Toeplitz
+
+    A chave é dividida em blocos de `tamanho_bloco` bits; todos os blocos
+    completos são comprimidos de uma só vez com a mesma matriz, e os bits
+    vazados são repartidos entre os blocos proporcionalmente ao tamanho.
+
+    Args:
+        chave (np.ndarray): Chave reconciliada
+        taxa_erro (float): Taxa de erro medida
+        bits_vazados (float): Bits revelados durante a reconciliação
+        epsilon (float): Parâmetro de segurança por bloco
+        tamanho_bloco (int | None): Bits por bloco; None usa a chave inteira
+        seed (int | None): Semente pública da matriz de Toeplitz
+
+    Returns:
+        dict: Chave final e estatísticas da amplificação
+    """
+    chave = np.asarray(chave, dtype=np.uint8)
+    n = len(chave)
+    tamanho_bloco = min(tamanho_bloco or n, n) or 1
+    rng = np.random.default_rng(seed)
+
+    n_blocos = n // tamanho_bloco
+    resto = n - n_blocos * tamanho_bloco
+    vazados_por_bit = bits_vazados / n if n > 0 else 0.0
+
+    partes = []
+    m = comprimento_seguro(tamanho_bloco, taxa_erro, vazados_por_bit * tamanho_bloco, epsilon)
+    if n_blocos and m:
+        semente = rng.integers(0, 2, tamanho_bloco + m - 1, dtype=np.uint8)
+        blocos = chave[:n_blocos * tamanho_bloco].reshape(n_blocos, tamanho_bloco)
+        partes.append(hash_toeplitz(semente, blocos, m).reshape(-1))
+
+    # O bloco incompleto do final usa sua própria matriz
+    m_resto = comprimento_seguro(resto, taxa_erro, vazados_por_bit * resto, epsilon)
+    if resto and m_resto:
+        semente = rng.integers(0, 2, resto + m_resto - 1, dtype=np.uint8)
+        partes.append(hash_toeplitz(semente, chave[-resto:], m_resto).reshape(-1))
+
+    chave_final = np.concatenate(partes) if partes else np.zeros(0, dtype=np.uint8)
+    return {
+        'chave_final': chave_final,
+        'tamanho_final': len(chave_final),
+        'tamanho_bloco': tamanho_bloco,
+        'blocos': n_blocos + (1 if resto else 0),
+        'taxa_compressao': len(chave_final) / n if n > 0 else 0.0
+    }
@@ -2,17 +2,521 @@ import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
 import plotly.graph_objects as go
-from main import bb84_protocolo
+from main import BACKENDS
+from execucao import CANCELADA, CONCLUIDA, EXECUTANDO, FALHOU, PENDENTE, tamanho_bloco
+from fila import VAZAO_INICIAL, FilaSimulacoes
+from agregacao import evolucao, mapa_erros
+from varredura import VarreduraBB84, podar_cache
+from plotly.colors import hex_to_rgb, qualitative
+from plotly.subplots import make_subplots
+from concurrent.futures import ProcessPoolExecutor
 from qiskit import QuantumCircuit
 from qiskit.visualization import plot_histogram
 import time
 import io
+import os
+import secrets
+import threading
 from PIL import Image
 import matplotlib.animation as animation
 from matplotlib.animation import FuncAnimation
+from matplotlib.colors import ListedColormap
+from matplotlib.figure import Figure
 
 st.set_page_config(layout="wide", page_title="Protocolo de Distribuição de Chaves Quânticas BB84")
 
+# Cores de cada esquema da barra lateral (os fundos são sempre brancos)
+TEMAS = {
+    "Preto e Branco": {
+        'primary_color': "#000000",
+        'secondary_color': "#333333",
+        'accent_color': "#555555",
+        'correct_color': "#008000",
+        'error_color': "#C00000",
+    },
+    "Azul e Cinza": {
+        'primary_color': "#1E3A8A",
+        'secondary_color': "#2563EB",
+        'accent_color': "#93C5FD",
+        'correct_color': "#047857",
+        'error_color': "#DC2626",
+    },
+    "Vermelho e Preto": {
+        'primary_color': "#770000",
+        'secondary_color': "#AA0000",
+        'accent_color': "#FFAAAA",
+        'correct_color': "#008800",
+        'error_color': "#000000",
+    },
+}
+
+# Limites dos caches; acima deles as entradas mais antigas são descartadas. Uma
+# simulação de 10^7 qubits ocupa cerca de 6 MB empacotada, daí o limite baixo
+MAX_SIMULACOES_CACHE = 8
+MAX_FIGURAS_CACHE = 128
+
+# Maior número de qubits aceito pela interface; cada backend é limitado
+# também ao que simula em TEMPO_MAXIMO_SIMULACAO segundos na vazão inicial
+# de `fila.VAZAO_INICIAL` (o 'aer' fica em 900 mil qubits)
+MAX_QUBITS = 10_000_000
+TEMPO_MAXIMO_SIMULACAO = 900
+
+# Acima desta estimativa, em segundos, a simulação vai sempre para segundo
+# plano, em vez de bloquear a página até terminar
+TEMPO_MAXIMO_PRIMEIRO_PLANO = 30
+
+# Intervalo entre as atualizações da página enquanto há simulações em segundo plano, em segundos
+INTERVALO_ATUALIZACAO = 0.5
+
+# Fila de simulações compartilhada pelas sessões: simulações executadas ao
+# mesmo tempo, pedidos aguardando e simulações simultâneas por sessão (a
+# principal e a de comparação)
+WORKERS_FILA = max(1, (os.cpu_count() or 2) // 2)
+CAPACIDADE_FILA = 32
+LIMITE_POR_SESSAO = 2
+
+# Pontos de varredura guardados para todas as sessões (cerca de 1 KB cada);
+# acima do limite os mais antigos são descartados
+MAX_PONTOS_VARREDURA = 10_000
+
+
+@st.cache_resource
+def fila_compartilhada():
+    """
+    Cria a fila de simulações, única para o processo e todas as sessões
+
+    Returns:
+        FilaSimulacoes: Fila com `WORKERS_FILA` workers
+    """
+    return FilaSimulacoes(WORKERS_FILA, CAPACIDADE_FILA, LIMITE_POR_SESSAO)
+
+
+@st.cache_resource
+def trava_matplotlib():
+    """
+    Cria a trava do Matplotlib, única para o processo e todas as sessões
+
+    Os rcParams e o pyplot são globais ao processo; uma trava criada no
+    corpo do script seria outra a cada execução e não protegeria nada.
+
+    Returns:
+        threading.Lock: Trava compartilhada
+    """
+    return threading.Lock()
+
+
+@st.cache_resource
+def pool_varredura():
+    """
+    Cria o pool de processos das varreduras, único para o processo e todas as sessões
+
+    Os processos são criados uma vez e reaproveitados, sem pagar a
+    importação do Qiskit a cada varredura. O contexto padrão é mantido: com
+    'spawn', cada processo reexecutaria este script como módulo principal.
+
+    Returns:
+        ProcessPoolExecutor: Pool com `WORKERS_FILA` processos
+    """
+    return ProcessPoolExecutor(WORKERS_FILA)
+
+
+@st.cache_resource
+def pontos_varredura():
+    """
+    Cria o cache de pontos de varredura, compartilhado por todas as sessões
+
+    Returns:
+        dict: Linhas de `VarreduraBB84`, indexadas por `varredura.chave_ponto`
+    """
+    return {}
+
+
+@st.cache_resource
+def varreduras_por_sessao():
+    """
+    Registra a varredura mais recente de cada sessão, para que a poda do cache preserve seus pontos
+
+    Returns:
+        dict: Identificador da sessão -> `VarreduraBB84`
+    """
+    return {}
+
+
+@st.cache_resource(max_entries=MAX_SIMULACOES_CACHE, show_spinner=False)
+def simular(n_bits, erro_canal, presenca_eve, seed, backend="aer", _sessao=None):
+    """
+    Executa o BB84 uma única vez por combinação de parâmetros e semente
+
+    O Streamlit reexecuta o script a cada interação; com o cache, as
+    reexecuções e as outras sessões com os mesmos parâmetros reaproveitam o
+    resultado em vez de simular de novo. O resultado é compartilhado sem
+    cópia (`cache_resource`): com milhões de qubits, copiar os arrays a cada
+    leitura custaria mais do que a própria página. Ele fica empacotado, com
+    um oitavo da memória; as figuras e agregações que desempacotam os
+    arrays também estão em cache. A simulação passa pela fila
+    compartilhada, em um único bloco, o que dá o mesmo resultado de
+    `bb84_protocolo` com a mesma semente.
+
+    Args:
+        n_bits (int): Número de qubits a serem transmitidos
+        erro_canal (float): Taxa de erro do canal quântico
+        presenca_eve (bool): Se True, simula a presença de um espião
+        seed (int): Semente da simulação
+        backend (str): Backend de `bb84_protocolo`
+        _sessao (str | None): Sessão que pede a simulação (fora da chave do cache)
+
+    Returns:
+        ResultadoEmpacotado: Bits, bases e medições da execução
+
+    Raises:
+        RuntimeError: Se a fila recusar o pedido ou a simulação não for concluída
+    """
+    execucao = iniciar_execucao((n_bits, erro_canal, presenca_eve, seed, backend, n_bits), _sessao)
+    execucao.aguardar()
+    if execucao.estado == FALHOU:
+        raise execucao.erro
+    if execucao.estado != CONCLUIDA:
+        raise RuntimeError("A simulação foi cancelada")
+    return execucao.resultado
+
+
+def iniciar_execucao(parametros, sessao):
+    """
+    Coloca na fila compartilhada a simulação descrita por `parametros`
+
+    Args:
+        parametros (tuple): (n_bits, erro_canal, presenca_eve, seed, backend, chunk_size)
+        sessao (str): Sessão que pede a simulação
+
+    Returns:
+        ExecucaoBB84: Execução na fila ou já em andamento
+
+    Raises:
+        RuntimeError: Se a sessão atingiu seu limite ou a fila está cheia
+    """
+    n_bits, erro_canal, presenca_eve, seed, backend, chunk_size = parametros
+    return fila_compartilhada().submeter(sessao, n_bits=n_bits, erro_canal=erro_canal, presenca_eve=presenca_eve,
+                                         backend=backend, seed=seed, chunk_size=chunk_size, empacotado=True)
+
+
+def _estilo_matplotlib(cores):
+    """
+    Parâmetros do matplotlib que combinam os gráficos com o esquema de cores
+
+    Args:
+        cores (dict): Cores de um dos `TEMAS`
+
+    Returns:
+        dict: rcParams a aplicar
+    """
+    primaria = cores['primary_color']
+    return {
+        'axes.edgecolor': primaria,
+        'axes.labelcolor': primaria,
+        'xtick.color': primaria,
+        'ytick.color': primaria,
+        'axes.titlecolor': primaria,
+        'figure.facecolor': 'white',
+        'axes.facecolor': 'white',
+        'lines.color': primaria,
+        'patch.edgecolor': primaria,
+        'grid.color': '#DDDDDD',
+    }
+
+
+def _png(fig):
+    """
+    Converte uma figura em PNG, com as mesmas opções de `st.pyplot`
+
+    Args:
+        fig (Figure): Figura do matplotlib
+
+    Returns:
+        bytes: Imagem PNG
+    """
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight', dpi=200)
+    return buf.getvalue()
+
+
+def _desenhar_bits_alice(resultado, parametros, cores):
+    alice_bits = resultado['alice_bits']
+    fig = Figure(figsize=(10, 2))
+    ax = fig.subplots()
+    ax.imshow([alice_bits[:20]], cmap='binary', aspect='auto')
+    ax.set_yticks([])
+    ax.set_xticks(range(min(20, len(alice_bits))))
+    ax.set_xticklabels(alice_bits[:20])
+    ax.set_title("Primeiros 20 bits aleatórios de Alice")
+    return fig
+
+
+def _desenhar_bases(resultado, parametros, cores):
+    alice_bases = resultado['alice_bases']
+    bob_bases = resultado['bob_bases']
+    custom_cmap = ListedColormap([cores['primary_color'], cores['secondary_color']])
+
+    fig = Figure(figsize=(10, 3))
+    ax1, ax2 = fig.subplots(2, 1)
+    ax1.imshow([alice_bases[:20]], cmap=custom_cmap, aspect='auto', vmin=0, vmax=1)
+    ax1.set_yticks([])
+    ax1.set_xticks(range(min(20, len(alice_bases))))
+    ax1.set_xticklabels(['C' if b == 0 else 'H' for b in alice_bases[:20]])
+    ax1.set_title("Bases de Alice (C = Computacional, H = Hadamard)")
+
+    ax2.imshow([bob_bases[:20]], cmap=custom_cmap, aspect='auto', vmin=0, vmax=1)
+    ax2.set_yticks([])
+    ax2.set_xticks(range(min(20, len(bob_bases))))
+    ax2.set_xticklabels(['C' if b == 0 else 'H' for b in bob_bases[:20]])
+    ax2.set_title("Bases de Bob (C = Computacional, H = Hadamard)")
+
+    fig.tight_layout()
+    return fig
+
+
+def _desenhar_transmissao(resultado, parametros, cores):
+    presenca_eve = parametros[2]
+    primary_color = cores['primary_color']
+    secondary_color = cores['secondary_color']
+
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    if presenca_eve:
+        ax.plot([0, 1, 2], [0, 0, 0], 'ko', markersize=15, color=primary_color)
+        ax.text(0, 0.2, "Alice", fontsize=12, ha='center', color=primary_color)
+        ax.text(1, 0.2, "Eve", fontsize=12, ha='center', color=cores['error_color'])
+        ax.text(2, 0.2, "Bob", fontsize=12, ha='center', color=primary_color)
+        ax.set_xlim(-0.5, 2.5)
+        ax.set_ylim(-0.5, 0.5)
+
+        # Qubits em diferentes posições para simular o movimento
+        ax.plot([0.3], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
+        ax.plot([0.6], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
+        ax.plot([1.3], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
+        ax.plot([1.6], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
+
+        # Adicionar setas para indicar o fluxo
+        ax.annotate("", xy=(0.9, 0), xytext=(0.1, 0),
+                    arrowprops=dict(arrowstyle="->", color=secondary_color))
+        ax.annotate("", xy=(1.9, 0), xytext=(1.1, 0),
+                    arrowprops=dict(arrowstyle="->", color=secondary_color))
+    else:
+        ax.plot([0, 1], [0, 0], 'ko', markersize=15, color=primary_color)
+        ax.text(0, 0.2, "Alice", fontsize=12, ha='center', color=primary_color)
+        ax.text(1, 0.2, "Bob", fontsize=12, ha='center', color=primary_color)
+        ax.set_xlim(-0.5, 1.5)
+        ax.set_ylim(-0.5, 0.5)
+
+        # Qubits em diferentes posições para simular o movimento
+        ax.plot([0.25], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
+        ax.plot([0.5], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
+        ax.plot([0.75], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
+
+        # Adicionar seta para indicar o fluxo
+        ax.annotate("", xy=(0.9, 0), xytext=(0.1, 0),
+                    arrowprops=dict(arrowstyle="->", color=secondary_color))
+
+    ax.set_title("Transmissão de qubits")
+    ax.axis('off')
+    return fig
+
+
+def _desenhar_reconciliacao(resultado, parametros, cores):
+    alice_bases = resultado['alice_bases']
+    bob_bases = resultado['bob_bases']
+    mesma_base = resultado['mesma_base']
+    primary_color = cores['primary_color']
+
+    # Show first 20 bits
+    display_len = min(20, len(mesma_base))
+    cmap = ListedColormap([cores['accent_color'], '#AAFFAA'])
+
+    fig = Figure(figsize=(10, 3))
+    ax = fig.subplots()
+    ax.imshow([mesma_base[:display_len]], cmap=cmap, aspect='auto', vmin=0, vmax=1)
+    ax.set_yticks([])
+
+    # Add Alice's and Bob's bases on top and bottom
+    for i in range(display_len):
+        ax.text(i, -0.5, 'C' if alice_bases[i] == 0 else 'H',
+                ha='center', va='center', fontsize=9, color=primary_color)
+        ax.text(i, 1.5, 'C' if bob_bases[i] == 0 else 'H',
+                ha='center', va='center', fontsize=9, color=primary_color)
+
+        # Mark matches
+        if mesma_base[i]:
+            ax.text(i, 0, '✓', ha='center', va='center', color=cores['correct_color'], fontsize=12)
+        else:
+            ax.text(i, 0, '✗', ha='center', va='center', color=cores['error_color'], fontsize=12)
+
+    ax.text(-1, -0.5, "Alice:", ha='right', va='center', fontsize=10, color=primary_color)
+    ax.text(-1, 1.5, "Bob:", ha='right', va='center', fontsize=10, color=primary_color)
+    ax.set_title("Comparação de Bases (Primeiros 20 bits)")
+    ax.set_xlim(-1.5, display_len-0.5)
+    ax.set_ylim(-1, 2)
+    return fig
+
+
+def _desenhar_peneiramento(resultado, parametros, cores):
+    alice_chave = resultado['alice_chave']
+    bob_chave = resultado['bob_chave']
+
+    # Visualization of sifted keys
+    display_len = min(20, len(alice_chave))
+    if display_len == 0:
+        return None
+
+    fig = Figure(figsize=(10, 2))
+    ax1, ax2 = fig.subplots(2, 1)
+
+    ax1.imshow([alice_chave[:display_len]], cmap='binary', aspect='auto')
+    ax1.set_yticks([])
+    ax1.set_xticks(range(display_len))
+    ax1.set_xticklabels(alice_chave[:display_len])
+    ax1.set_title("Chave peneirada de Alice (primeiros bits)")
+
+    ax2.imshow([bob_chave[:display_len]], cmap='binary', aspect='auto')
+    ax2.set_yticks([])
+    ax2.set_xticks(range(display_len))
+    ax2.set_xticklabels(bob_chave[:display_len])
+    ax2.set_title("Chave peneirada de Bob (primeiros bits)")
+
+    fig.tight_layout()
+    return fig
+
+
+def _desenhar_taxa_erro(resultado, parametros, cores):
+    taxa_erro = resultado['taxa_erro']
+    erro_canal = parametros[1]
+
+    # Calculate expected error rates
+    expected_error = erro_canal
+    expected_with_eve = 0.25 + erro_canal - (0.25 * erro_canal)  # Adjusted for combined probabilities
+    error_color = cores['error_color']
+
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    bars = ax.bar(['Taxa de Erro Real', 'Esperada (Sem Eve)', 'Esperada (Com Eve)'],
+                  [taxa_erro, expected_error, expected_with_eve],
+                  color=[cores['primary_color'], cores['correct_color'], error_color])
+
+    # Threshold line for detecting Eve
+    ax.axhline(y=0.15, color=error_color, linestyle='--', alpha=0.7)
+    ax.text(2.5, 0.15, 'Limiar para detectar Eve', va='bottom', ha='right', color=error_color)
+
+    ax.set_ylim(0, max(taxa_erro, expected_with_eve) * 1.2)
+    ax.set_ylabel('Taxa de Erro')
+    ax.set_title('Análise da Taxa de Erro')
+
+    # Add actual values as text
+    for bar in bars:
+        height = bar.get_height()
+        ax.annotate(f'{height:.3f}',
+                    xy=(bar.get_x() + bar.get_width() / 2, height),
+                    xytext=(0, 3),  # 3 points vertical offset
+                    textcoords="offset points",
+                    ha='center', va='bottom')
+    return fig
+
+
+# Figura de cada etapa da aba "Visualização do Protocolo"
+_DESENHOS_ETAPAS = {
+    1: _desenhar_bits_alice,
+    2: _desenhar_bases,
+    3: _desenhar_transmissao,
+    4: _desenhar_reconciliacao,
+    5: _desenhar_peneiramento,
+    6: _desenhar_taxa_erro,
+}
+
+
+@st.cache_data(max_entries=MAX_FIGURAS_CACHE, show_spinner=False)
+def figura_etapa(etapa, parametros, tema, _resultado):
+    """
+    Desenha a figura de uma etapa do protocolo e a devolve em PNG
+
+    A figura depende só do resultado (isto é, dos parâmetros e da semente) e
+    do esquema de cores, que formam a chave do cache; reexecuções do script
+    devolvem os bytes já codificados sem redesenhar nada. O resultado em si
+    fica fora da chave (o prefixo `_` faz o Streamlit ignorá-lo no hash).
+
+    Args:
+        etapa (int): Etapa do protocolo, de 1 a 6
+        parametros (tuple): (n_bits, erro_canal, presenca_eve, seed, backend, chunk_size) da simulação
+        tema (str): Nome do esquema de cores em `TEMAS`
+        _resultado (ResultadoBB84): Resultado da simulação descrita por `parametros`
+
+    Returns:
+        bytes | None: Imagem PNG, ou None se não há o que desenhar
+    """
+    cores = TEMAS[tema]
+    with trava_matplotlib(), plt.style.context('default'), plt.rc_context(_estilo_matplotlib(cores)):
+        fig = _DESENHOS_ETAPAS[etapa](_resultado, parametros, cores)
+        return _png(fig) if fig is not None else None
+
+
+@st.cache_data(max_entries=MAX_FIGURAS_CACHE, show_spinner=False)
+def agregados(parametros, janela, _resultado):
+    """
+    Agrega a simulação para os gráficos de evolução, com tamanho independente de n_bits
+
+    Args:
+        parametros (tuple): (n_bits, erro_canal, presenca_eve, seed, backend, chunk_size) da simulação
+        janela (int): Largura da janela da densidade de erros, em qubits
+        _resultado (ResultadoBB84): Resultado da simulação descrita por `parametros`
+
+    Returns:
+        tuple: (séries de `agregacao.evolucao`, (mapa de `agregacao.mapa_erros`, qubits por célula))
+    """
+    return evolucao(_resultado, janela=janela), mapa_erros(_resultado)
+
+
+def _circuito_exemplo(nome):
+    """
+    Monta um dos circuitos de exemplo da aba "Circuitos Quânticos"
+
+    Args:
+        nome (str): 'bit0_computacional', 'bit1_computacional', 'bit0_hadamard', 'bit1_hadamard' ou 'eve'
+
+    Returns:
+        QuantumCircuit: Circuito de um qubit
+    """
+    qc = QuantumCircuit(1, 1)
+    if nome == 'eve':
+        qc.barrier()
+        qc.measure(0, 0)
+        qc.barrier()
+        qc.x(0)
+        qc.barrier()
+        return qc
+    if nome.startswith('bit1'):
+        qc.x(0)
+    if nome.endswith('hadamard'):
+        qc.h(0)
+    qc.measure(0, 0)
+    return qc
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def imagem_circuito(nome):
+    """
+    Desenha um circuito de exemplo uma única vez por processo
+
+    Os circuitos são fixos, então a imagem é compartilhada por todas as
+    sessões sem cópia.
+
+    Args:
+        nome (str): Circuito, como em `_circuito_exemplo`
+
+    Returns:
+        bytes: Imagem PNG do circuito
+    """
+    with trava_matplotlib():
+        fig = _circuito_exemplo(nome).draw(output='mpl')
+        png = _png(fig)
+        plt.close(fig)
+    return png
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -288,19 +792,64 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Identificador da sessão na fila compartilhada
+if 'id_sessao' not in st.session_state:
+    st.session_state.id_sessao = secrets.token_hex(8)
+id_sessao = st.session_state.id_sessao
+
 # Protocol parameters sidebar
 with st.sidebar:
     st.markdown("### Parâmetros do Protocolo")
-    n_bits = st.slider("Número de qubits", min_value=10, max_value=1000, value=100, step=10)
+    backend = st.selectbox("Backend de simulação", list(BACKENDS), index=list(BACKENDS).index("aer"),
+                           help="'numpy' simula milhões de qubits por segundo; os backends Aer executam os circuitos")
+    max_qubits = int(min(MAX_QUBITS, VAZAO_INICIAL[backend] * TEMPO_MAXIMO_SIMULACAO))
+    # O valor fica no session_state para que trocar para um backend mais lento
+    # o traga para dentro do novo limite
+    st.session_state.n_bits = min(st.session_state.get('n_bits', 100), max_qubits)
+    n_bits = st.number_input("Número de qubits", min_value=10, max_value=max_qubits, step=1000, key='n_bits',
+                             help=f"Até {max_qubits:,} qubits com o backend '{backend}'")
     erro_canal = st.slider("Taxa de erro do canal", min_value=0.0, max_value=0.2, value=0.05, step=0.01)
     presenca_eve = st.checkbox("Simular Eve (espião)", value=False)
+    tempo_estimado = n_bits / fila_compartilhada().estado()['vazao'][backend]
+    forcar_segundo_plano = tempo_estimado > TEMPO_MAXIMO_PRIMEIRO_PLANO
+    segundo_plano = st.checkbox("Executar em segundo plano", value=False, disabled=forcar_segundo_plano,
+                                help="A página continua respondendo, com progresso parcial e opção de cancelar")
+    segundo_plano = segundo_plano or forcar_segundo_plano
+    if tempo_estimado > 10:
+        st.caption(f"Tempo estimado com o backend '{backend}': {tempo_estimado:,.0f} s"
+                   + (" (executada em segundo plano)" if forcar_segundo_plano else ""))
     
+    semente = st.number_input("Semente (opcional)", min_value=0, max_value=2**32 - 1, value=None, step=1,
+                              help="Com a mesma semente e os mesmos parâmetros, a simulação é reproduzida "
+                                   "a partir do cache")
+
     if st.button("Executar Simulação", type="primary"):
-        with st.spinner("Executando simulação..."):
-            resultado = bb84_protocolo(n_bits=n_bits, erro_canal=erro_canal, presenca_eve=presenca_eve)
-            st.session_state.resultado = resultado
-            st.session_state.simulation_run = True
-    
+        seed = int(semente) if semente is not None else secrets.randbits(32)
+        try:
+            if segundo_plano:
+                parametros_execucao = (n_bits, erro_canal, presenca_eve, seed, backend, tamanho_bloco(n_bits))
+                if st.session_state.get('execucao') is not None:
+                    fila_compartilhada().cancelar(id_sessao, st.session_state.execucao)
+                    st.session_state.execucao = None
+                st.session_state.execucao = iniciar_execucao(parametros_execucao, id_sessao)
+                st.session_state.parametros_execucao = parametros_execucao
+            else:
+                parametros_execucao = (n_bits, erro_canal, presenca_eve, seed, backend, None)
+                with st.spinner("Executando simulação..."):
+                    resultado = simular(*parametros_execucao[:5], _sessao=id_sessao)
+                    st.session_state.parametros = parametros_execucao
+                    st.session_state.resultado = resultado
+                    st.session_state.simulation_run = True
+        except RuntimeError as erro:
+            st.error(str(erro))
+
+    if 'parametros' in st.session_state:
+        st.caption(f"Última simulação: semente {st.session_state.parametros[3]}")
+
+    estado_fila = fila_compartilhada().estado()
+    st.caption(f"Fila compartilhada: {estado_fila['executando']} de {estado_fila['workers']} workers ocupados, "
+               f"{estado_fila['na_fila']} simulações aguardando")
+
     # Opções de cores para os gráficos        
     st.markdown("---")
     st.markdown("### Opções de Visualização")
@@ -308,79 +857,29 @@ with st.sidebar:
         st.session_state.color_theme = "Preto e Branco"
     
     color_theme = st.radio("Esquema de cores:", 
-                           ["Preto e Branco", "Azul e Cinza", "Vermelho e Preto"],
+                           list(TEMAS),
                            index=0)
     st.session_state.color_theme = color_theme
     
     # Definindo as cores com base na escolha (mantendo fundos brancos)
-    if color_theme == "Preto e Branco":
-        st.session_state.primary_color = "#000000"
-        st.session_state.secondary_color = "#333333"
-        st.session_state.accent_color = "#555555"
-        st.session_state.correct_color = "#008000"
-        st.session_state.error_color = "#C00000"
-        
-        # Aplicar variáveis CSS
-        st.markdown("""
-        <style>
-            :root {
-                --primary-color: #000000;
-                --secondary-color: #333333;
-                --accent-color: #555555;
-                --correct-color: #008000;
-                --error-color: #C00000;
-            }
-            .stButton>button[data-baseweb="button"] {
-                background-color: #000000 !important;
-            }
-        </style>
-        """, unsafe_allow_html=True)
-        
-    elif color_theme == "Azul e Cinza":
-        st.session_state.primary_color = "#1E3A8A"
-        st.session_state.secondary_color = "#2563EB"
-        st.session_state.accent_color = "#93C5FD"
-        st.session_state.correct_color = "#047857"
-        st.session_state.error_color = "#DC2626"
-        
-        # Aplicar variáveis CSS
-        st.markdown("""
-        <style>
-            :root {
-                --primary-color: #1E3A8A;
-                --secondary-color: #2563EB;
-                --accent-color: #93C5FD;
-                --correct-color: #047857;
-                --error-color: #DC2626;
-            }
-            .stButton>button[data-baseweb="button"] {
-                background-color: #1E3A8A !important;
-            }
-        </style>
-        """, unsafe_allow_html=True)
-        
-    else:  # Vermelho e Preto
-        st.session_state.primary_color = "#770000"
-        st.session_state.secondary_color = "#AA0000"
-        st.session_state.accent_color = "#FFAAAA"
-        st.session_state.correct_color = "#008800"
-        st.session_state.error_color = "#000000"
-        
-        # Aplicar variáveis CSS
-        st.markdown("""
-        <style>
-            :root {
-                --primary-color: #770000;
-                --secondary-color: #AA0000;
-                --accent-color: #FFAAAA;
-                --correct-color: #008800;
-                --error-color: #000000;
-            }
-            .stButton>button[data-baseweb="button"] {
-                background-color: #770000 !important;
-            }
-        </style>
-        """, unsafe_allow_html=True)
+    cores = TEMAS[color_theme]
+    st.session_state.update(cores)
+
+    # Aplicar variáveis CSS
+    st.markdown(f"""
+    <style>
+        :root {{
+            --primary-color: {cores['primary_color']};
+            --secondary-color: {cores['secondary_color']};
+            --accent-color: {cores['accent_color']};
+            --correct-color: {cores['correct_color']};
+            --error-color: {cores['error_color']};
+        }}
+        .stButton>button[data-baseweb="button"] {{
+            background-color: {cores['primary_color']} !important;
+        }}
+    </style>
+    """, unsafe_allow_html=True)
             
     st.markdown("---")
     st.markdown("### Etapas do Protocolo")
@@ -392,21 +891,78 @@ with st.sidebar:
                    "6. Estimativa de Erro"]
     selected_step = st.radio("Navegar para etapa:", step_options)
 
-# Configurar o estilo do matplotlib para combinar com o tema
-plt.style.use('default')  # Resetar para o padrão primeiro
-plt.rcParams['axes.edgecolor'] = st.session_state.get('primary_color', '#000000')
-plt.rcParams['axes.labelcolor'] = st.session_state.get('primary_color', '#000000')
-plt.rcParams['xtick.color'] = st.session_state.get('primary_color', '#000000')
-plt.rcParams['ytick.color'] = st.session_state.get('primary_color', '#000000')
-plt.rcParams['axes.titlecolor'] = st.session_state.get('primary_color', '#000000')
-plt.rcParams['figure.facecolor'] = 'white'
-plt.rcParams['axes.facecolor'] = 'white'
-plt.rcParams['lines.color'] = st.session_state.get('primary_color', '#000000')
-plt.rcParams['patch.edgecolor'] = st.session_state.get('primary_color', '#000000')
-plt.rcParams['grid.color'] = '#DDDDDD'
+# Se algo exibido como em andamento estava ativo ao desenhar a página, ela é
+# reexecutada ao fim do script; decidir só ao fim deixaria de mostrar o que
+# terminou entre o desenho e a verificação
+atualizar_pagina = False
+
+# Simulação em segundo plano: progresso parcial enquanto executa, resultado ao terminar
+execucao = st.session_state.get('execucao')
+if execucao is not None:
+    progresso = execucao.progresso()
+    posicao = fila_compartilhada().posicao(execucao)
+    atualizar_pagina = execucao.ativa
+    if execucao.ativa and progresso['estado'] == PENDENTE and posicao:
+        espera = fila_compartilhada().espera_estimada(execucao)
+        st.info(f"Simulação na fila compartilhada: posição {posicao}, início estimado em {espera:.0f} s")
+        if st.button("Cancelar simulação"):
+            fila_compartilhada().cancelar(id_sessao, execucao)
+            st.session_state.execucao = None
+            st.rerun()
+    elif execucao.ativa:
+        st.progress(progresso['fracao'],
+                    text=f"Simulando em segundo plano: {progresso['qubits_processados']:,} de "
+                         f"{execucao.n_bits:,} qubits ({progresso['tempo']:.1f} s)")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Qubits processados", f"{progresso['qubits_processados']:,}")
+        col2.metric("Taxa de erro parcial", f"{progresso['taxa_erro']:.4f}")
+        col3.metric("Chave peneirada parcial", f"{progresso['tamanho_chave']:,}")
+
+        historico = execucao.historico()
+        if historico:
+            fig = go.Figure(go.Scatter(
+                x=[ponto['qubits_processados'] for ponto in historico],
+                y=[ponto['taxa_erro'] for ponto in historico],
+                mode='lines+markers',
+                line=dict(color=st.session_state.get('primary_color', '#000000'))
+            ))
+            fig.update_layout(
+                title="Taxa de erro acumulada",
+                xaxis_title="Qubits processados",
+                yaxis_title="Taxa de erro",
+                height=250,
+                margin=dict(t=40, b=40),
+                font=dict(color=st.session_state.get('primary_color', '#000000')),
+                paper_bgcolor='white',
+                plot_bgcolor='white'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+        if st.button("Cancelar simulação"):
+            # Com outras sessões aguardando a mesma simulação, ela continua para elas
+            fila_compartilhada().cancelar(id_sessao, execucao)
+            st.session_state.execucao = None
+            st.rerun()
+    else:
+        if execucao.estado == CONCLUIDA:
+            st.session_state.parametros = st.session_state.parametros_execucao
+            st.session_state.resultado = execucao.resultado
+            st.session_state.simulation_run = True
+            st.success(f"Simulação em segundo plano concluída em {progresso['tempo']:.1f} s")
+        elif execucao.estado == CANCELADA:
+            st.warning(f"Simulação cancelada após {progresso['qubits_processados']:,} qubits")
+        elif execucao.estado == FALHOU:
+            st.error(f"A simulação falhou: {execucao.erro}")
+        st.session_state.execucao = None
 
 # Main content
-tab1, tab2, tab3 = st.tabs(["Visualização do Protocolo", "Circuitos Quânticos", "Análise de Resultados"])
+if st.session_state.get('simulation_run'):
+    parametros = st.session_state.parametros
+    n_bits_sim, erro_canal_sim, presenca_eve_sim, seed_sim, backend_sim, chunk_size_sim = parametros
+    resultado = st.session_state.resultado
+
+tab1, tab2, tab3, tab4 = st.tabs(["Visualização do Protocolo", "Circuitos Quânticos", "Análise de Resultados",
+                                  "Painel de Varredura"])
 
 with tab1:
     # Protocol Visualization
@@ -428,14 +984,7 @@ with tab1:
             
         with col2:
             if 'simulation_run' in st.session_state and st.session_state.simulation_run:
-                alice_bits = st.session_state.resultado['alice_bits']
-                fig, ax = plt.subplots(figsize=(10, 2))
-                ax.imshow([alice_bits[:20]], cmap='binary', aspect='auto')
-                ax.set_yticks([])
-                ax.set_xticks(range(20))
-                ax.set_xticklabels(alice_bits[:20])
-                ax.set_title("Primeiros 20 bits aleatórios de Alice")
-                st.pyplot(fig)
+                st.image(figura_etapa(1, parametros, color_theme, resultado))
             else:
                 st.info("Execute a simulação para visualizar os bits aleatórios de Alice")
     
@@ -455,29 +1004,7 @@ with tab1:
             
         with col2:
             if 'simulation_run' in st.session_state and st.session_state.simulation_run:
-                alice_bases = np.random.randint(0, 2, n_bits)  # We're recreating this for visualization
-                bob_bases = np.random.randint(0, 2, n_bits)
-                
-                # Usar cores do tema
-                primary_color = st.session_state.get('primary_color', '#000000')
-                secondary_color = st.session_state.get('secondary_color', '#333333')
-                custom_cmap = plt.cm.colors.ListedColormap([primary_color, secondary_color])
-                
-                fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 3))
-                ax1.imshow([alice_bases[:20]], cmap=custom_cmap, aspect='auto', vmin=0, vmax=1)
-                ax1.set_yticks([])
-                ax1.set_xticks(range(20))
-                ax1.set_xticklabels(['C' if b == 0 else 'H' for b in alice_bases[:20]])
-                ax1.set_title("Bases de Alice (C = Computacional, H = Hadamard)")
-                
-                ax2.imshow([bob_bases[:20]], cmap=custom_cmap, aspect='auto', vmin=0, vmax=1)
-                ax2.set_yticks([])
-                ax2.set_xticks(range(20))
-                ax2.set_xticklabels(['C' if b == 0 else 'H' for b in bob_bases[:20]])
-                ax2.set_title("Bases de Bob (C = Computacional, H = Hadamard)")
-                
-                fig.tight_layout()
-                st.pyplot(fig)
+                st.image(figura_etapa(2, parametros, color_theme, resultado))
             else:
                 st.info("Execute a simulação para visualizar a seleção de bases")
     
@@ -502,54 +1029,10 @@ with tab1:
                 st.markdown("### Visualização da Transmissão Quântica")
                 
                 # Substituir a animação por uma visualização estática
-                fig, ax = plt.subplots(figsize=(8, 4))
-                
-                # Usar cores do tema
-                primary_color = st.session_state.get('primary_color', '#000000')
-                secondary_color = st.session_state.get('secondary_color', '#333333')
-                accent_color = st.session_state.get('accent_color', '#777777')
-                
-                if presenca_eve:
-                    ax.plot([0, 1, 2], [0, 0, 0], 'ko', markersize=15, color=primary_color)
-                    ax.text(0, 0.2, "Alice", fontsize=12, ha='center', color=primary_color)
-                    ax.text(1, 0.2, "Eve", fontsize=12, ha='center', color=st.session_state.get('error_color', '#C00000'))
-                    ax.text(2, 0.2, "Bob", fontsize=12, ha='center', color=primary_color)
-                    ax.set_xlim(-0.5, 2.5)
-                    ax.set_ylim(-0.5, 0.5)
-                    
-                    # Qubits em diferentes posições para simular o movimento
-                    ax.plot([0.3], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
-                    ax.plot([0.6], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
-                    ax.plot([1.3], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
-                    ax.plot([1.6], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
-                    
-                    # Adicionar setas para indicar o fluxo
-                    ax.annotate("", xy=(0.9, 0), xytext=(0.1, 0), 
-                                arrowprops=dict(arrowstyle="->", color=secondary_color))
-                    ax.annotate("", xy=(1.9, 0), xytext=(1.1, 0), 
-                                arrowprops=dict(arrowstyle="->", color=secondary_color))
-                else:
-                    ax.plot([0, 1], [0, 0], 'ko', markersize=15, color=primary_color)
-                    ax.text(0, 0.2, "Alice", fontsize=12, ha='center', color=primary_color)
-                    ax.text(1, 0.2, "Bob", fontsize=12, ha='center', color=primary_color)
-                    ax.set_xlim(-0.5, 1.5)
-                    ax.set_ylim(-0.5, 0.5)
-                    
-                    # Qubits em diferentes posições para simular o movimento
-                    ax.plot([0.25], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
-                    ax.plot([0.5], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
-                    ax.plot([0.75], [0], 'bo', markersize=10, alpha=0.6, color=secondary_color)
-                    
-                    # Adicionar seta para indicar o fluxo
-                    ax.annotate("", xy=(0.9, 0), xytext=(0.1, 0), 
-                               arrowprops=dict(arrowstyle="->", color=secondary_color))
-                
-                ax.set_title("Transmissão de qubits")
-                ax.axis('off')
-                st.pyplot(fig)
+                st.image(figura_etapa(3, parametros, color_theme, resultado))
                 
                 # Adicionar explicação
-                if presenca_eve:
+                if presenca_eve_sim:
                     st.markdown("""
                     <p>A figura mostra como Eve intercepta os qubits enviados por Alice, 
                     mede-os e envia novos qubits para Bob. Esta intervenção perturba os 
@@ -576,50 +1059,12 @@ with tab1:
             
         with col2:
             if 'simulation_run' in st.session_state and st.session_state.simulation_run:
-                alice_bases = np.random.randint(0, 2, n_bits)
-                bob_bases = np.random.randint(0, 2, n_bits)
-                mesma_base = alice_bases == bob_bases
-                
                 # Visualization of basis comparison
-                fig, ax = plt.subplots(figsize=(10, 3))
-                
-                # Show first 20 bits
-                display_len = 20
-                # Usar cores do tema
-                primary_color = st.session_state.get('primary_color', '#000000')
-                accent_color = st.session_state.get('accent_color', '#777777')
-                correct_color = st.session_state.get('correct_color', '#008000')
-                error_color = st.session_state.get('error_color', '#C00000')
-                
-                cmap = plt.cm.colors.ListedColormap([accent_color, '#AAFFAA'])
-                
-                ax.imshow([mesma_base[:display_len]], cmap=cmap, aspect='auto', vmin=0, vmax=1)
-                ax.set_yticks([])
-                
-                # Add Alice's and Bob's bases on top and bottom
-                for i in range(display_len):
-                    ax.text(i, -0.5, 'C' if alice_bases[i] == 0 else 'H', 
-                           ha='center', va='center', fontsize=9, color=primary_color)
-                    ax.text(i, 1.5, 'C' if bob_bases[i] == 0 else 'H', 
-                           ha='center', va='center', fontsize=9, color=primary_color)
-                    
-                    # Mark matches
-                    if mesma_base[i]:
-                        ax.text(i, 0, '✓', ha='center', va='center', color=correct_color, fontsize=12)
-                    else:
-                        ax.text(i, 0, '✗', ha='center', va='center', color=error_color, fontsize=12)
-                
-                ax.text(-1, -0.5, "Alice:", ha='right', va='center', fontsize=10, color=primary_color)
-                ax.text(-1, 1.5, "Bob:", ha='right', va='center', fontsize=10, color=primary_color)
-                ax.set_title("Comparação de Bases (Primeiros 20 bits)")
-                ax.set_xlim(-1.5, display_len-0.5)
-                ax.set_ylim(-1, 2)
-                
-                st.pyplot(fig)
+                st.image(figura_etapa(4, parametros, color_theme, resultado))
                 
                 # Display statistics
-                match_rate = np.sum(mesma_base) / len(mesma_base) * 100
-                st.markdown(f"<p>Taxa de correspondência de bases: <span class='highlight'>{match_rate:.1f}%</span> ({np.sum(mesma_base)} de {len(mesma_base)} posições)</p>", unsafe_allow_html=True)
+                match_rate = resultado['tamanho_chave'] / n_bits_sim * 100
+                st.markdown(f"<p>Taxa de correspondência de bases: <span class='highlight'>{match_rate:.1f}%</span> ({resultado['tamanho_chave']} de {n_bits_sim} posições)</p>", unsafe_allow_html=True)
             else:
                 st.info("Execute a simulação para visualizar a reconciliação de bases")
     
@@ -636,33 +1081,14 @@ with tab1:
             
         with col2:
             if 'simulation_run' in st.session_state and st.session_state.simulation_run:
-                # Get actual results from simulation
-                alice_chave = st.session_state.resultado['alice_chave']
-                bob_chave = st.session_state.resultado['bob_chave']
-                
                 # Visualization of sifted keys
-                display_len = min(20, len(alice_chave))
+                imagem = figura_etapa(5, parametros, color_theme, resultado)
                 
-                if display_len > 0:
-                    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 2))
-                    
-                    ax1.imshow([alice_chave[:display_len]], cmap='binary', aspect='auto')
-                    ax1.set_yticks([])
-                    ax1.set_xticks(range(display_len))
-                    ax1.set_xticklabels(alice_chave[:display_len])
-                    ax1.set_title("Chave peneirada de Alice (primeiros bits)")
-                    
-                    ax2.imshow([bob_chave[:display_len]], cmap='binary', aspect='auto')
-                    ax2.set_yticks([])
-                    ax2.set_xticks(range(display_len))
-                    ax2.set_xticklabels(bob_chave[:display_len])
-                    ax2.set_title("Chave peneirada de Bob (primeiros bits)")
-                    
-                    fig.tight_layout()
-                    st.pyplot(fig)
+                if imagem is not None:
+                    st.image(imagem)
                     
                     # Display statistics
-                    key_len = len(alice_chave)
+                    key_len = resultado['tamanho_chave']
                     st.markdown(f"<p>Tamanho da chave peneirada: <span class='highlight'>{key_len}</span> bits</p>", unsafe_allow_html=True)
                 else:
                     st.warning("Nenhuma base correspondente foi encontrada nesta simulação. Por favor, execute novamente.")
@@ -686,52 +1112,15 @@ with tab1:
             
         with col2:
             if 'simulation_run' in st.session_state and st.session_state.simulation_run:
-                # Get actual results from simulation
-                alice_chave = st.session_state.resultado['alice_chave']
-                bob_chave = st.session_state.resultado['bob_chave']
-                taxa_erro = st.session_state.resultado['taxa_erro']
-                
-                # Calculate expected error rates
-                expected_error = erro_canal
-                expected_with_eve = 0.25 + erro_canal - (0.25 * erro_canal)  # Adjusted for combined probabilities
+                taxa_erro = resultado['taxa_erro']
                 
                 # Create error rate visualization
-                fig, ax = plt.subplots(figsize=(8, 4))
-                
-                # Usar cores do tema
-                primary_color = st.session_state.get('primary_color', '#000000')
-                secondary_color = st.session_state.get('secondary_color', '#333333')
-                accent_color = st.session_state.get('accent_color', '#777777')
-                correct_color = st.session_state.get('correct_color', '#008000')
-                error_color = st.session_state.get('error_color', '#C00000')
-                
-                bars = ax.bar(['Taxa de Erro Real', 'Esperada (Sem Eve)', 'Esperada (Com Eve)'], 
-                       [taxa_erro, expected_error, expected_with_eve],
-                       color=[primary_color, correct_color, error_color])
-                
-                # Threshold line for detecting Eve
-                ax.axhline(y=0.15, color=error_color, linestyle='--', alpha=0.7)
-                ax.text(2.5, 0.15, 'Limiar para detectar Eve', va='bottom', ha='right', color=error_color)
-                
-                ax.set_ylim(0, max(taxa_erro, expected_with_eve) * 1.2)
-                ax.set_ylabel('Taxa de Erro')
-                ax.set_title('Análise da Taxa de Erro')
-                
-                # Add actual values as text
-                for bar in bars:
-                    height = bar.get_height()
-                    ax.annotate(f'{height:.3f}',
-                                xy=(bar.get_x() + bar.get_width() / 2, height),
-                                xytext=(0, 3),  # 3 points vertical offset
-                                textcoords="offset points",
-                                ha='center', va='bottom')
-                
-                st.pyplot(fig)
+                st.image(figura_etapa(6, parametros, color_theme, resultado))
                 
                 # Determine if Eve is detected
                 eve_detected = taxa_erro > 0.15
                 
-                if presenca_eve:
+                if presenca_eve_sim:
                     if eve_detected:
                         st.markdown("<p class='danger'>⚠️ Alta taxa de erro detectada! A presença de Eve está confirmada.</p>", unsafe_allow_html=True)
                     else:
@@ -758,63 +1147,20 @@ with tab2:
     
     with col1:
         st.markdown("### Bit 0, Base Computacional")
-        qc0 = QuantumCircuit(1, 1)
-        qc0.measure(0, 0)
-        # Corrige o erro convertendo a figura para bytes
-        fig = qc0.draw(output='mpl')
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png')
-        buf.seek(0)
-        st.image(buf)
+        st.image(imagem_circuito('bit0_computacional'))
         
         st.markdown("### Bit 1, Base Computacional")
-        qc1 = QuantumCircuit(1, 1)
-        qc1.x(0)
-        qc1.measure(0, 0)
-        # Corrige o erro convertendo a figura para bytes
-        fig = qc1.draw(output='mpl')
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png')
-        buf.seek(0)
-        st.image(buf)
+        st.image(imagem_circuito('bit1_computacional'))
     
     with col2:
         st.markdown("### Bit 0, Base Hadamard")
-        qc2 = QuantumCircuit(1, 1)
-        qc2.h(0)
-        qc2.measure(0, 0)
-        # Corrige o erro convertendo a figura para bytes
-        fig = qc2.draw(output='mpl')
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png')
-        buf.seek(0)
-        st.image(buf)
+        st.image(imagem_circuito('bit0_hadamard'))
         
         st.markdown("### Bit 1, Base Hadamard")
-        qc3 = QuantumCircuit(1, 1)
-        qc3.x(0)
-        qc3.h(0)
-        qc3.measure(0, 0)
-        # Corrige o erro convertendo a figura para bytes
-        fig = qc3.draw(output='mpl')
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png')
-        buf.seek(0)
-        st.image(buf)
+        st.image(imagem_circuito('bit1_hadamard'))
     
     st.markdown("### Circuito de Intervenção de Eve")
-    qc_eve = QuantumCircuit(1, 1)
-    qc_eve.barrier()
-    qc_eve.measure(0, 0)
-    qc_eve.barrier()
-    qc_eve.x(0)
-    qc_eve.barrier()
-    # Corrige o erro convertendo a figura para bytes
-    fig = qc_eve.draw(output='mpl')
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png')
-    buf.seek(0)
-    st.image(buf)
+    st.image(imagem_circuito('eve'))
 
 with tab3:
     # Results Analysis
@@ -826,19 +1172,17 @@ with tab3:
         with col1:
             st.markdown("<h3>Estatísticas da Chave</h3>", unsafe_allow_html=True)
             
-            resultado = st.session_state.resultado
-            
             # Create a metrics display
-            st.metric("Total de bits transmitidos", n_bits)
+            st.metric("Total de bits transmitidos", n_bits_sim)
             st.metric("Tamanho da chave peneirada", resultado['tamanho_chave'])
             st.metric("Taxa de erro", f"{resultado['taxa_erro']:.4f}")
             
             # Key Utilization Rate
-            key_util = resultado['tamanho_chave'] / n_bits * 100
+            key_util = resultado['tamanho_chave'] / n_bits_sim * 100
             st.metric("Taxa de utilização da chave", f"{key_util:.1f}%")
             
             # Calculate bit mismatch
-            bit_agreement = np.mean(resultado['alice_chave'] == resultado['bob_chave']) * 100
+            bit_agreement = (1 - resultado['taxa_erro']) * 100
             st.metric("Concordância de bits", f"{bit_agreement:.1f}%")
             
         with col2:
@@ -880,62 +1224,145 @@ with tab3:
             st.markdown(f"<h4 style='color:{color}'>{safety_level}</h4>", unsafe_allow_html=True)
             st.markdown(f"<p>{desc}</p>", unsafe_allow_html=True)
             
-            if presenca_eve:
+            if presenca_eve_sim:
                 st.markdown("<p class='danger'>⚠️ A simulação incluiu um espião (Eve)</p>", unsafe_allow_html=True)
             else:
                 st.markdown("<p class='success'>✓ A simulação foi executada sem espião</p>", unsafe_allow_html=True)
         
-        # Add comparison section
-        st.markdown("<h3>Comparação: Com vs. Sem Eve</h3>", unsafe_allow_html=True)
+        # Evolução ao longo da transmissão, agregada no servidor
+        st.markdown("<h3>Evolução ao Longo da Transmissão</h3>", unsafe_allow_html=True)
         
-        # Run both simulations for comparison if not already done
-        if not hasattr(st.session_state, 'comparison_done'):
-            resultado_sem_eve = bb84_protocolo(n_bits=n_bits, erro_canal=erro_canal, presenca_eve=False)
-            resultado_com_eve = bb84_protocolo(n_bits=n_bits, erro_canal=erro_canal, presenca_eve=True)
-            
-            st.session_state.resultado_sem_eve = resultado_sem_eve
-            st.session_state.resultado_com_eve = resultado_com_eve
-            st.session_state.comparison_done = True
+        opcoes_janela = [0.005, 0.01, 0.02, 0.05, 0.1]
+        fracao_janela = st.select_slider("Janela da densidade de erros (fração dos qubits)", options=opcoes_janela,
+                                         value=0.02, format_func=lambda fracao: f"{fracao:.1%}")
+        serie, (mapa, qubits_por_celula) = agregados(parametros, max(1, int(fracao_janela * n_bits_sim)), resultado)
         
-        # Create comparison charts
-        fig = go.Figure()
-        
-        # Cores do tema
         primary_color = st.session_state.get('primary_color', '#000000')
         secondary_color = st.session_state.get('secondary_color', '#333333')
+        accent_color = st.session_state.get('accent_color', '#777777')
+        error_color = st.session_state.get('error_color', '#C00000')
         
-        fig.add_trace(go.Bar(
-            x=['Taxa de Erro', 'Tamanho da Chave', 'Concordância de Bits'],
-            y=[st.session_state.resultado_sem_eve['taxa_erro'], 
-               st.session_state.resultado_sem_eve['tamanho_chave']/n_bits, 
-               1 - st.session_state.resultado_sem_eve['taxa_erro']],
-            name='Sem Eve',
-            marker_color=primary_color
-        ))
+        fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+                            subplot_titles=("Taxa de erro", "Fração peneirada"))
+        fig.add_trace(go.Scattergl(x=serie['qubits'], y=serie['taxa_erro_intervalo'], mode='markers',
+                                   marker=dict(size=3, color=accent_color), name='Por intervalo'), row=1, col=1)
+        fig.add_trace(go.Scattergl(x=serie['qubits'], y=serie['densidade_erros'], mode='lines',
+                                   line=dict(color=secondary_color),
+                                   name=f"Janela de {serie['janela']:,} qubits"), row=1, col=1)
+        fig.add_trace(go.Scattergl(x=serie['qubits'], y=serie['taxa_erro_acumulada'], mode='lines',
+                                   line=dict(color=primary_color, width=3), name='Acumulada'), row=1, col=1)
+        fig.add_hline(y=0.15, line_dash='dash', line_color=error_color, row=1, col=1)
+        fig.add_trace(go.Scattergl(x=serie['qubits'], y=serie['fracao_peneirada'], mode='lines',
+                                   line=dict(color=primary_color), name='Fração peneirada'), row=2, col=1)
+        fig.update_xaxes(title_text="Qubits transmitidos", row=2, col=1)
+        fig.update_layout(
+            height=500,
+            font=dict(color=primary_color),
+            paper_bgcolor='white',
+            plot_bgcolor='white'
+        )
+        st.plotly_chart(fig, use_container_width=True)
         
-        fig.add_trace(go.Bar(
-            x=['Taxa de Erro', 'Tamanho da Chave', 'Concordância de Bits'],
-            y=[st.session_state.resultado_com_eve['taxa_erro'], 
-               st.session_state.resultado_com_eve['tamanho_chave']/n_bits, 
-               1 - st.session_state.resultado_com_eve['taxa_erro']],
-            name='Com Eve',
-            marker_color=secondary_color
+        fig = go.Figure(go.Heatmap(
+            z=mapa,
+            y=np.arange(mapa.shape[0]) * mapa.shape[1] * qubits_por_celula,
+            colorscale=[[0, 'white'], [1, error_color]],
+            colorbar=dict(title='Taxa de erro'),
+            hovertemplate='Qubit inicial da linha: %{y:,.0f}<br>Coluna: %{x}<br>Taxa de erro: %{z:.3f}<extra></extra>'
         ))
-        
         fig.update_layout(
-            title='Impacto de Eve no Protocolo BB84',
-            xaxis_title='Métricas',
-            yaxis_title='Valor (normalizado)',
-            barmode='group',
-            bargap=0.15,
-            bargroupgap=0.1,
+            title=f"Mapa de erros ({qubits_por_celula:,.0f} qubits por célula, lido linha a linha)",
+            yaxis=dict(autorange='reversed', title='Qubit inicial da linha'),
+            xaxis=dict(showticklabels=False),
+            height=350,
             font=dict(color=primary_color),
             paper_bgcolor='white',
             plot_bgcolor='white'
         )
-        
         st.plotly_chart(fig, use_container_width=True)
         
+        # Add comparison section
+        st.markdown("<h3>Comparação: Com vs. Sem Eve</h3>", unsafe_allow_html=True)
+        
+        # The main run is one side of the comparison; the other one differs only in Eve
+        parametros_comparacao = (n_bits_sim, erro_canal_sim, not presenca_eve_sim, seed_sim, backend_sim,
+                                 chunk_size_sim)
+        resultado_comparacao = None
+        comparacao = None
+        try:
+            if chunk_size_sim is None:
+                if st.session_state.get('comparacao') is not None:
+                    fila_compartilhada().cancelar(id_sessao, st.session_state.comparacao[1])
+                    st.session_state.comparacao = None
+                with st.spinner("Executando simulação de comparação..."):
+                    resultado_comparacao = simular(*parametros_comparacao[:5], _sessao=id_sessao)
+            else:
+                # Simulações em segundo plano também são comparadas em segundo plano
+                comparacao = st.session_state.get('comparacao')
+                if comparacao is None or comparacao[0] != parametros_comparacao:
+                    if comparacao is not None:
+                        fila_compartilhada().cancelar(id_sessao, comparacao[1])
+                        st.session_state.comparacao = None
+                    comparacao = (parametros_comparacao, iniciar_execucao(parametros_comparacao, id_sessao))
+                    st.session_state.comparacao = comparacao
+        except RuntimeError as erro:
+            st.warning(f"Comparação indisponível: {erro}")
+            comparacao = None
+
+        if comparacao is not None:
+            if comparacao[1].estado == CONCLUIDA:
+                resultado_comparacao = comparacao[1].resultado
+            elif comparacao[1].ativa:
+                atualizar_pagina = True
+                st.progress(comparacao[1].progresso()['fracao'], text="Executando simulação de comparação...")
+            else:
+                st.warning("A simulação de comparação não foi concluída")
+
+        if presenca_eve_sim:
+            resultado_sem_eve, resultado_com_eve = resultado_comparacao, resultado
+        else:
+            resultado_sem_eve, resultado_com_eve = resultado, resultado_comparacao
+        
+        if resultado_comparacao is not None:
+            # Create comparison charts
+            fig = go.Figure()
+        
+            # Cores do tema
+            primary_color = st.session_state.get('primary_color', '#000000')
+            secondary_color = st.session_state.get('secondary_color', '#333333')
+        
+            fig.add_trace(go.Bar(
+                x=['Taxa de Erro', 'Tamanho da Chave', 'Concordância de Bits'],
+                y=[resultado_sem_eve['taxa_erro'], 
+                   resultado_sem_eve['tamanho_chave']/n_bits_sim, 
+                   1 - resultado_sem_eve['taxa_erro']],
+                name='Sem Eve',
+                marker_color=primary_color
+            ))
+        
+            fig.add_trace(go.Bar(
+                x=['Taxa de Erro', 'Tamanho da Chave', 'Concordância de Bits'],
+                y=[resultado_com_eve['taxa_erro'], 
+                   resultado_com_eve['tamanho_chave']/n_bits_sim, 
+                   1 - resultado_com_eve['taxa_erro']],
+                name='Com Eve',
+                marker_color=secondary_color
+            ))
+        
+            fig.update_layout(
+                title='Impacto de Eve no Protocolo BB84',
+                xaxis_title='Métricas',
+                yaxis_title='Valor (normalizado)',
+                barmode='group',
+                bargap=0.15,
+                bargroupgap=0.1,
+                font=dict(color=primary_color),
+                paper_bgcolor='white',
+                plot_bgcolor='white'
+            )
+        
+            st.plotly_chart(fig, use_container_width=True)
+        
         st.markdown("""
         <div class='section'>
             <p>Observações principais:</p>
@@ -951,6 +1378,122 @@ with tab3:
     else:
         st.info("Execute a simulação para ver a análise de resultados")
 
+with tab4:
+    st.markdown("<h2 class='sub-header'>Painel de Varredura</h2>", unsafe_allow_html=True)
+    st.markdown("""
+    <div class='section'>
+        <p>Varredura Monte Carlo da taxa de erro do canal contra a fração dos qubits interceptados por Eve.
+        Cada ponto é repetido com sementes independentes e exibido com seu intervalo de confiança de 95%;
+        os pontos aparecem à medida que os processos terminam, e pontos já calculados (nesta ou em outra
+        sessão) não são recalculados.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        faixa_erro = st.slider("Taxa de erro do canal", 0.0, 0.5, (0.0, 0.2), 0.01, key='varredura_faixa')
+        pontos_erro = st.slider("Pontos de taxa de erro", 2, 41, 11, key='varredura_pontos')
+    with col2:
+        fracoes_eve = st.multiselect("Fração interceptada por Eve", [0.0, 0.1, 0.25, 0.5, 0.75, 1.0],
+                                     default=[0.0, 0.25, 0.5, 1.0], format_func=lambda f: f"{f:.0%}",
+                                     key='varredura_fracoes')
+        repeticoes_varredura = st.slider("Repetições por ponto", 2, 50, 10, key='varredura_repeticoes')
+    with col3:
+        n_bits_varredura = st.select_slider("Qubits por repetição", [1_000, 10_000, 100_000, 1_000_000],
+                                            value=10_000, format_func=lambda n: f"{n:,}".replace(',', '.'),
+                                            key='varredura_n_bits')
+        seed_varredura = int(st.number_input("Semente da varredura", min_value=0, value=42, step=1,
+                                             key='varredura_seed'))
+
+    # A grade atual só consulta o cache; nada é calculado até o botão
+    cache_varredura = pontos_varredura()
+    grade = VarreduraBB84(np.linspace(*faixa_erro, pontos_erro), sorted(fracoes_eve), n_bits=n_bits_varredura,
+                          repeticoes=repeticoes_varredura, backend="numpy", seed=seed_varredura,
+                          cache=cache_varredura, executor=pool_varredura())
+    varredura = st.session_state.get('varredura')
+    faltantes = grade.faltantes()
+
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        if st.button(f"Calcular {faltantes} pontos", disabled=faltantes == 0 or not fracoes_eve,
+                     key='varredura_iniciar'):
+            if varredura is not None and varredura.ativa:
+                varredura.cancelar()
+            # Só descarta pontos que nenhuma varredura em andamento (desta ou de outra sessão) usa
+            registro = varreduras_por_sessao()
+            em_uso = set(grade.chaves)
+            for sessao, outra in list(registro.items()):
+                if outra.ativa:
+                    em_uso.update(outra.chaves)
+                else:
+                    registro.pop(sessao, None)
+            podar_cache(cache_varredura, MAX_PONTOS_VARREDURA - faltantes, em_uso)
+            varredura = grade.iniciar()
+            st.session_state.varredura = varredura
+            registro[id_sessao] = varredura
+        if varredura is not None and varredura.ativa and st.button("Cancelar varredura", key='varredura_cancelar'):
+            varredura.cancelar()
+    with col2:
+        if varredura is not None:
+            progresso = varredura.progresso()
+            if progresso['estado'] in (PENDENTE, EXECUTANDO):
+                atualizar_pagina = True
+                st.progress(progresso['fracao'], text=f"{progresso['calculados']} pontos calculados, "
+                                                      f"{progresso['reaproveitados']} do cache "
+                                                      f"de {progresso['total']} ({progresso['tempo']:.1f} s)")
+            elif varredura.estado == FALHOU:
+                st.error(f"A varredura falhou: {varredura.erro}")
+            elif varredura.estado == CANCELADA:
+                st.warning(f"Varredura cancelada após {progresso['calculados']} pontos")
+            else:
+                st.caption(f"Última varredura: {progresso['calculados']} pontos calculados e "
+                           f"{progresso['reaproveitados']} reaproveitados em {progresso['tempo']:.1f} s")
+
+    tabela_varredura = grade.tabela()
+    if tabela_varredura:
+        primary_color = st.session_state.get('primary_color', '#000000')
+        figuras = {
+            'taxa_erro': go.Figure(),
+            'taxa_chave': go.Figure(),
+        }
+        for i, fracao in enumerate(sorted(fracoes_eve)):
+            linhas = [linha for linha in tabela_varredura if linha['fracao_eve'] == round(fracao, 6)]
+            if not linhas:
+                continue
+            cor = qualitative.Plotly[i % len(qualitative.Plotly)]
+            x = [linha['erro_canal'] for linha in linhas]
+            for metrica, figura in figuras.items():
+                # Faixa do intervalo de confiança: contorno superior e volta pelo inferior
+                figura.add_trace(go.Scatter(
+                    x=x + x[::-1],
+                    y=([linha[f'{metrica}_ic_sup'] for linha in linhas]
+                       + [linha[f'{metrica}_ic_inf'] for linha in linhas][::-1]),
+                    fill='toself', fillcolor=f"rgba{(*hex_to_rgb(cor), 0.2)}", line=dict(width=0),
+                    hoverinfo='skip', showlegend=False, legendgroup=str(fracao)
+                ))
+                figura.add_trace(go.Scatter(
+                    x=x, y=[linha[f'{metrica}_media'] for linha in linhas], mode='lines+markers',
+                    name=f"Eve intercepta {fracao:.0%}", line=dict(color=cor), legendgroup=str(fracao)
+                ))
+
+        figuras['taxa_erro'].update_layout(title='Taxa de Erro (QBER) da Chave Peneirada',
+                                           yaxis_title='Taxa de erro')
+        figuras['taxa_chave'].update_layout(title='Taxa de Chave Secreta Assintótica (1 - 2·h(QBER))',
+                                            yaxis_title='Bits seguros por qubit transmitido')
+        col1, col2 = st.columns(2)
+        for coluna, figura in zip((col1, col2), figuras.values()):
+            figura.update_layout(
+                xaxis_title='Taxa de erro do canal',
+                font=dict(color=primary_color),
+                paper_bgcolor='white',
+                plot_bgcolor='white'
+            )
+            with coluna:
+                st.plotly_chart(figura, use_container_width=True)
+        st.caption(f"{len(tabela_varredura)} de {len(set(grade.chaves))} pontos da grade disponíveis")
+    else:
+        st.info("Nenhum ponto desta grade foi calculado ainda")
+
 st.markdown("""
 <div class='section'>
     <h3>Fundamentos do Protocolo BB84</h3>
@@ -962,4 +1505,8 @@ st.markdown("""
     </ul>
     <p>Esses princípios garantem que qualquer tentativa de espionagem introduzirá erros detectáveis na transmissão.</p>
 </div>
-""", unsafe_allow_html=True) 
\ No newline at end of file
+""", unsafe_allow_html=True) 
+# Enquanto houver simulações em segundo plano, reexecuta a página para atualizar o progresso
+if atualizar_pagina:
+    time.sleep(INTERVALO_ATUALIZACAO)
+    st.rerun()
@@ -0,0 +1,129 @@
+import numpy as np
+
+from reconciliacao import entropia_binaria
+
+
+def qber_esperada(erro_canal, presenca_eve=False):
+    """
+    Calcula a taxa de erro esperada na chave peneirada para o canal de `bb84_protocolo`
+
+    O bit flip do canal só afeta qubits preparados na base computacional
+    (metade dos casos), e a interceptação completa de Eve erra metade das
+    bases, produzindo um bit aleatório em Bob nesses casos.
+
+    Args:
+        erro_canal (float | np.ndarray): Taxa de erro do canal quântico
+        presenca_eve (bool): Se True, considera interceptação e reenvio em todos os qubits
+
+    Returns:
+        float | np.ndarray: Taxa de erro esperada
+    """
+    erro_canal = np.asarray(erro_canal, dtype=float)
+    if presenca_eve:
+        return 0.25 + erro_canal / 4
+    return erro_canal / 2
+
+
+def comprimento_chave_finita(tamanho_bloco, taxa_erro, fracao_amostra, eps_sec=1e-10,
+                             eps_cor=1e-15, f_ec=1.16):
+    """
+    Calcula o comprimento de chave segura de um bloco finito (Tomamichel et al., 2012)
+
+    ℓ = n·[1 - h(Q + μ)] - f·n·h(Q) - log2(8 / (ε_cor·ε_sec²)), com k = p·N bits
+    sacrificados na estimativa, n = N - k bits de chave e
+    μ = sqrt((n + k)/(n·k) · (k + 1)/k · ln(2/ε_sec)) a flutuação estatística.
+    Todos os argumentos numéricos aceitam vetores e seguem as regras de
+    broadcasting do NumPy, de modo que uma grade inteira é uma única chamada.
+
+    Args:
+        tamanho_bloco (float | np.ndarray): Bits peneirados no bloco (N)
+        taxa_erro (float | np.ndarray): Taxa de erro medida na amostra (Q)
+        fracao_amostra (float | np.ndarray): Fração do bloco usada na estimativa (p)
+        eps_sec (float): Parâmetro de sigilo
+        eps_cor (float): Parâmetro de correção
+        f_ec (float): Eficiência da correção de erros em relação ao limite de Shannon
+
+    Returns:
+        np.ndarray: Comprimento da chave segura em bits (zero quando negativo)
+    """
+    tamanho_bloco = np.asarray(tamanho_bloco, dtype=float)
+    taxa_erro = np.asarray(taxa_erro, dtype=float)
+    fracao_amostra = np.asarray(fracao_amostra, dtype=float)
+
+    k = np.floor(fracao_amostra * tamanho_bloco)
+    n = tamanho_bloco - k
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mu = np.sqrt((n + k) / (n * k) * (k + 1) / k * np.log(2 / eps_sec))
+    mu = np.where((n > 0) & (k > 0), mu, np.inf)
+
+    comprimento = (n * (1 - entropia_binaria(np.minimum(taxa_erro + mu, 0.5)))
+                   - f_ec * n * entropia_binaria(taxa_erro)
+                   - np.log2(8 / (eps_cor * eps_sec ** 2)))
+    return np.maximum(np.floor(comprimento), 0.0)
+
+
+def otimizar_parametros(taxa_erro, tamanhos_bloco=None, fracoes=None, **kwargs):
+    """
+    Escolhe a fração de amostragem ótima para cada tamanho de bloco e taxa de erro
+
+    A grade (taxa de erro × tamanho de bloco × fração) é avaliada de uma vez
+    com broadcasting e o máximo é tomado ao longo do eixo das frações.
+
+    Args:
+        taxa_erro (float | np.ndarray): Taxas de erro a considerar
+        tamanhos_bloco (np.ndarray | None): Tamanhos de bloco (padrão: 10^3 a 10^10)
+        fracoes (np.ndarray | None): Frações de amostragem candidatas (padrão: 0.1% a 50%)
+        **kwargs: Parâmetros repassados a `comprimento_chave_finita`
+
+    Returns:
+        dict: Fração ótima, comprimento e taxa de chave (ℓ/N) para cada (taxa de erro, bloco)
+    """
+    if tamanhos_bloco is None:
+        tamanhos_bloco = np.logspace(3, 10, 71)
+    if fracoes is None:
+        fracoes = np.logspace(-3, np.log10(0.5), 200)
+
+    taxa_erro = np.atleast_1d(np.asarray(taxa_erro, dtype=float))
+    tamanhos_bloco = np.asarray(tamanhos_bloco, dtype=float)
+    fracoes = np.asarray(fracoes, dtype=float)
+
+    comprimentos = comprimento_chave_finita(tamanhos_bloco[None, :, None], taxa_erro[:, None, None],
+                                            fracoes[None, None, :], **kwargs)
+    melhor = np.argmax(comprimentos, axis=2)
+    comprimento = np.take_along_axis(comprimentos, melhor[..., None], axis=2)[..., 0]
+
+    return {
+        'taxa_erro': taxa_erro,
+        'tamanhos_bloco': tamanhos_bloco,
+        'fracao_otima': fracoes[melhor],
+        'comprimento': comprimento,
+        'taxa_chave': np.divide(comprimento, tamanhos_bloco[None, :], out=np.zeros_like(comprimento, dtype=float),
+                                where=tamanhos_bloco[None, :] > 0)
+    }
+
+
+def analise_resultado(resultado, fracao_amostra=None, **kwargs):
+    """
+    Aplica a análise de chave finita a um resultado de `bb84_protocolo`
+
+    Args:
+        resultado (dict): Resultado com 'tamanho_chave' e 'taxa_erro'
+        fracao_amostra (float | None): Fração de amostragem; None escolhe a ótima
+        **kwargs: Parâmetros repassados a `comprimento_chave_finita`
+
+    Returns:
+        dict: Fração de amostragem usada, comprimento seguro e taxa de chave
+    """
+    tamanho_bloco = resultado['tamanho_chave']
+    taxa_erro = resultado['taxa_erro']
+
+    if fracao_amostra is None:
+        otimo = otimizar_parametros(taxa_erro, tamanhos_bloco=[tamanho_bloco], **kwargs)
+        fracao_amostra = float(otimo['fracao_otima'][0, 0])
+
+    comprimento = float(comprimento_chave_finita(tamanho_bloco, taxa_erro, fracao_amostra, **kwargs))
+    return {
+        'fracao_amostra': fracao_amostra,
+        'comprimento': comprimento,
+        'taxa_chave': comprimento / tamanho_bloco if tamanho_bloco > 0 else 0.0
+    }
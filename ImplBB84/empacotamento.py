@@ -0,0 +1,150 @@
+import numpy as np
+
+# Número de bits ligados em cada valor de byte, usado quando np.bitwise_count não existe
+_BITS_POR_BYTE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def empacotar(bits):
+    """
+    Empacota um vetor de bits (0/1) em bytes, 8 bits por byte
+
+    Args:
+        bits (np.ndarray): Vetor de bits
+
+    Returns:
+        np.ndarray: Vetor uint8 empacotado (o último byte é completado com zeros)
+    """
+    return np.packbits(np.asarray(bits, dtype=np.uint8))
+
+
+def desempacotar(pacote, n_bits):
+    """
+    Recupera os `n_bits` primeiros bits de um vetor empacotado
+
+    Args:
+        pacote (np.ndarray): Vetor uint8 empacotado
+        n_bits (int): Número de bits válidos
+
+    Returns:
+        np.ndarray: Vetor uint8 de bits (0/1)
+    """
+    return np.unpackbits(pacote, count=n_bits)
+
+
+def _palavras(pacote):
+    """
+    Vê um vetor empacotado como palavras de 64 bits, completando com zeros
+
+    Args:
+        pacote (np.ndarray): Vetor uint8 empacotado
+
+    Returns:
+        np.ndarray: Vetor uint64
+    """
+    resto = len(pacote) % 8
+    if resto:
+        pacote = np.concatenate([pacote, np.zeros(8 - resto, dtype=np.uint8)])
+    return pacote.view(np.uint64)
+
+
+def popcount(pacote):
+    """
+    Conta os bits ligados de um vetor empacotado
+
+    Args:
+        pacote (np.ndarray): Vetor uint8 empacotado
+
+    Returns:
+        int: Número de bits iguais a 1
+    """
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(_palavras(pacote)).sum(dtype=np.int64))
+    return int(_BITS_POR_BYTE[pacote].sum(dtype=np.int64))
+
+
+def mascara_peneiramento(alice_bases, bob_bases, n_bits):
+    """
+    Calcula a máscara empacotada das posições em que as bases coincidem
+
+    Args:
+        alice_bases (np.ndarray): Bases de Alice empacotadas
+        bob_bases (np.ndarray): Bases de Bob empacotadas
+        n_bits (int): Número de posições válidas
+
+    Returns:
+        np.ndarray: Máscara uint8 empacotada, com os bits de preenchimento zerados
+    """
+    mascara = ~(alice_bases ^ bob_bases)
+    resto = n_bits % 8
+    if resto:
+        mascara[-1] &= np.uint8((0xFF << (8 - resto)) & 0xFF)
+    return mascara
+
+
+def contar_erros(alice_bits, bob_resultados, mascara):
+    """
+    Conta as divergências entre Alice e Bob nas posições da máscara
+
+    Args:
+        alice_bits (np.ndarray): Bits de Alice empacotados
+        bob_resultados (np.ndarray): Resultados de Bob empacotados
+        mascara (np.ndarray): Máscara empacotada das posições consideradas
+
+    Returns:
+        int: Número de bits divergentes
+    """
+    return popcount((alice_bits ^ bob_resultados) & mascara)
+
+
+def peneirar(bits, mascara, n_bits):
+    """
+    Extrai e reempacota os bits das posições selecionadas pela máscara
+
+    Args:
+        bits (np.ndarray): Bits empacotados
+        mascara (np.ndarray): Máscara empacotada
+        n_bits (int): Número de posições válidas
+
+    Returns:
+        np.ndarray: Bits selecionados, empacotados
+    """
+    return empacotar(desempacotar(bits, n_bits)[desempacotar(mascara, n_bits).astype(bool)])
+
+
+def resultado_empacotado(alice_bits, alice_bases, bob_bases, bob_resultados):
+    """
+    Monta o dicionário de resultados do BB84 com bits e bases empacotados
+
+    O peneiramento e a taxa de erro são calculados diretamente sobre as
+    máscaras empacotadas, com contagem de bits por palavra.
+
+    Args:
+        alice_bits (np.ndarray): Bits de Alice
+        alice_bases (np.ndarray): Bases de Alice
+        bob_bases (np.ndarray): Bases de Bob
+        bob_resultados (np.ndarray): Resultados das medições de Bob
+
+    Returns:
+        dict: Dicionário com resultados empacotados e estatísticas
+    """
+    n_bits = len(alice_bits)
+    alice_bits = empacotar(alice_bits)
+    alice_bases = empacotar(alice_bases)
+    bob_bases = empacotar(bob_bases)
+    bob_resultados = empacotar(bob_resultados)
+
+    mascara = mascara_peneiramento(alice_bases, bob_bases, n_bits)
+    tamanho_chave = popcount(mascara)
+    erros = contar_erros(alice_bits, bob_resultados, mascara)
+
+    return {
+        'n_bits': n_bits,
+        'alice_bits': alice_bits,
+        'alice_bases': alice_bases,
+        'bob_bases': bob_bases,
+        'bob_resultados': bob_resultados,
+        'alice_chave': peneirar(alice_bits, mascara, n_bits),
+        'bob_chave': peneirar(bob_resultados, mascara, n_bits),
+        'taxa_erro': erros / tamanho_chave if tamanho_chave > 0 else 0,
+        'tamanho_chave': tamanho_chave
+    }
@@ -0,0 +1,153 @@
+import numpy as np
+
+from main import bb84_stream, fluxos_independentes
+
+
+def estimar_qber_amostrado(alice_chave, bob_chave, fracao=0.1, seed=None):
+    """
+    Estima a taxa de erro revelando apenas uma amostra aleatória da chave peneirada
+
+    Os bits amostrados são comparados publicamente e descartados; o restante
+    segue como chave.
+
+    Args:
+        alice_chave (np.ndarray): Chave peneirada de Alice
+        bob_chave (np.ndarray): Chave peneirada de Bob
+        fracao (float): Fração dos bits sacrificados na estimativa
+        seed (int | None): Semente da escolha da amostra
+
+    Returns:
+        dict: Taxa de erro estimada, bits sacrificados e chaves restantes
+    """
+    alice_chave = np.asarray(alice_chave)
+    bob_chave = np.asarray(bob_chave)
+    rng = np.random.default_rng(seed)
+
+    amostra = rng.random(len(alice_chave)) < fracao
+    bits_sacrificados = int(np.sum(amostra))
+    erros = int(np.sum(alice_chave[amostra] != bob_chave[amostra]))
+
+    return {
+        'taxa_erro_estimada': erros / bits_sacrificados if bits_sacrificados > 0 else 0,
+        'bits_sacrificados': bits_sacrificados,
+        'alice_chave': alice_chave[~amostra],
+        'bob_chave': bob_chave[~amostra],
+        'tamanho_chave': len(alice_chave) - bits_sacrificados
+    }
+
+
+def limiares_sprt(p0, p1, alfa=0.01, beta=0.01):
+    """
+    Calcula os incrementos e os limiares de decisão do teste sequencial de Wald
+
+    Args:
+        p0 (float): Taxa de erro aceitável (hipótese nula: sem espião)
+        p1 (float): Taxa de erro de alarme (hipótese alternativa: espião)
+        alfa (float): Probabilidade de abortar uma sessão legítima
+        beta (float): Probabilidade de não detectar uma sessão atacada
+
+    Returns:
+        tuple: (incremento por erro, incremento por acerto, limiar de aceitação, limiar de aborto)
+    """
+    incremento_erro = np.log(p1 / p0)
+    incremento_acerto = np.log((1 - p1) / (1 - p0))
+    limiar_aceitacao = np.log(beta / (1 - alfa))
+    limiar_aborto = np.log((1 - beta) / alfa)
+    return incremento_erro, incremento_acerto, limiar_aceitacao, limiar_aborto
+
+
+def bb84_com_aborto(n_bits=1_000_000, erro_canal=0.05, presenca_eve=False, chunk_size=10_000,
+                    fracao_amostra=0.1, p0=0.05, p1=0.15, alfa=0.01, beta=0.01,
+                    backend="numpy", seed=None):
+    """
+    Executa o BB84 em blocos e aborta assim que a taxa de erro excede o limiar
+
+    A cada bloco uma fração dos bits peneirados é revelada e alimenta um
+    teste sequencial da razão de probabilidades (SPRT) entre p0 e p1. A razão
+    de verossimilhança de todos os bits de um bloco é obtida com uma soma
+    acumulada; ao cruzar o limiar superior a sessão é abortada, e ao cruzar o
+    inferior o teste aceita p0 e a transmissão segue até o fim.
+
+    Os bits amostrados são revelados em ordem e só até a decisão: os
+    sorteados depois do cruzamento voltam à chave, e os blocos seguintes não
+    são mais amostrados. `taxa_erro_estimada` vem, portanto, apenas dos bits
+    revelados ao teste; uma estimativa para a amplificação de privacidade
+    pode ser tirada da chave final com `estimar_qber_amostrado`.
+
+    Args:
+        n_bits (int): Número máximo de qubits a transmitir
+        erro_canal (float): Taxa de erro do canal quântico
+        presenca_eve (bool): Se True, simula a presença de um espião
+        chunk_size (int): Qubits por bloco (granularidade do aborto)
+        fracao_amostra (float): Fração dos bits peneirados revelada no teste
+        p0 (float): Taxa de erro aceitável
+        p1 (float): Taxa de erro que indica espionagem
+        alfa (float): Probabilidade de falso alarme
+        beta (float): Probabilidade de não detecção
+        backend (str): Backend de `bb84_protocolo`
+        seed (int | None): Semente da simulação e da escolha das amostras
+
+    Returns:
+        dict: Decisão do teste, qubits efetivamente transmitidos, bits revelados ao teste e chave restante
+    """
+    incremento_erro, incremento_acerto, limiar_aceitacao, limiar_aborto = limiares_sprt(p0, p1, alfa, beta)
+    rng, rng_protocolo = fluxos_independentes(seed, 2)
+
+    estatistica = 0.0
+    decidido = False
+    erros_amostra = 0
+    bits_sacrificados = 0
+    qubits_transmitidos = 0
+    abortado = False
+    alice_partes = []
+    bob_partes = []
+
+    for bloco in bb84_stream(n_bits=n_bits, chunk_size=chunk_size, erro_canal=erro_canal,
+                             presenca_eve=presenca_eve, backend=backend, rng=rng_protocolo):
+        qubits_transmitidos = bloco['qubits_processados']
+        alice_chave = bloco['alice_chave']
+        bob_chave = bloco['bob_chave']
+
+        if decidido:
+            # O teste já aceitou p0: nada mais precisa ser revelado
+            alice_partes.append(alice_chave)
+            bob_partes.append(bob_chave)
+            continue
+
+        amostrados = np.flatnonzero(rng.random(len(alice_chave)) < fracao_amostra)
+        erros = alice_chave[amostrados] != bob_chave[amostrados]
+        if len(erros):
+            # Log da razão de verossimilhança após cada bit amostrado
+            acumulado = estatistica + np.cumsum(np.where(erros, incremento_erro, incremento_acerto))
+            cruzamentos = np.flatnonzero((acumulado >= limiar_aborto) | (acumulado <= limiar_aceitacao))
+            if len(cruzamentos):
+                # Só os bits até o cruzamento chegam a ser revelados
+                decidido = True
+                abortado = bool(acumulado[cruzamentos[0]] >= limiar_aborto)
+                amostrados = amostrados[:cruzamentos[0] + 1]
+                erros = erros[:cruzamentos[0] + 1]
+            else:
+                estatistica = float(acumulado[-1])
+
+        bits_sacrificados += len(erros)
+        erros_amostra += int(np.sum(erros))
+        if abortado:
+            break
+
+        mantidos = np.ones(len(alice_chave), dtype=bool)
+        mantidos[amostrados] = False
+        alice_partes.append(alice_chave[mantidos])
+        bob_partes.append(bob_chave[mantidos])
+
+    alice_chave = np.concatenate(alice_partes) if alice_partes and not abortado else np.array([], dtype=int)
+    bob_chave = np.concatenate(bob_partes) if bob_partes and not abortado else np.array([], dtype=int)
+
+    return {
+        'abortado': abortado,
+        'qubits_transmitidos': qubits_transmitidos,
+        'bits_sacrificados': bits_sacrificados,
+        'taxa_erro_estimada': erros_amostra / bits_sacrificados if bits_sacrificados > 0 else 0,
+        'alice_chave': alice_chave,
+        'bob_chave': bob_chave,
+        'tamanho_chave': len(alice_chave)
+    }
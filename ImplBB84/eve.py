@@ -0,0 +1,142 @@
+import numpy as np
+
+from reconciliacao import entropia_binaria
+
+# Probabilidade de acerto de uma medição na base de Breidbart (cos²(π/8))
+ACERTO_BREIDBART = np.cos(np.pi / 8) ** 2
+
+
+def interceptar_reenviar(fracao=1.0):
+    """
+    Cria o modelo de interceptação e reenvio nas bases do BB84
+
+    Eve intercepta cada qubit com probabilidade `fracao`, mede em uma base
+    aleatória e reenvia o estado obtido. Com a base errada, o qubit que chega
+    a Bob na base de Alice vira uma moeda justa, e Eve nada aprende após o
+    anúncio das bases; com a base certa, nada muda e Eve conhece o bit.
+
+    Args:
+        fracao (float): Fração dos qubits interceptados
+
+    Returns:
+        callable: Modelo `(alice_bits, alice_bases, rng) -> dict`
+    """
+    def modelo(alice_bits, alice_bases, rng):
+        n = len(alice_bits)
+        interceptado = rng.random(n) < fracao
+        base_errada = interceptado & (rng.random(n) < 0.5)
+
+        # Bit medido por Eve: correto na base certa, aleatório na errada
+        bit_eve = np.where(base_errada, rng.random(n) < 0.5, alice_bits).astype(alice_bits.dtype)
+        return {
+            'erro': base_errada & (rng.random(n) < 0.5),
+            'palpite': np.where(interceptado, bit_eve, rng.random(n) < 0.5).astype(alice_bits.dtype),
+            'informacao': (interceptado & ~base_errada).astype(float)
+        }
+    return modelo
+
+
+def breidbart(fracao=1.0):
+    """
+    Cria o modelo de ataque na base intermediária de Breidbart
+
+    Eve mede na base a π/8 das duas bases do BB84, acertando o bit de Alice
+    com probabilidade cos²(π/8) ≈ 0,854 qualquer que seja a base, e reenvia o
+    estado de Breidbart correspondente. Bob reproduz o bit de Eve com a mesma
+    probabilidade, o que induz 25% de erro com interceptação total.
+
+    Args:
+        fracao (float): Fração dos qubits interceptados
+
+    Returns:
+        callable: Modelo `(alice_bits, alice_bases, rng) -> dict`
+    """
+    def modelo(alice_bits, alice_bases, rng):
+        n = len(alice_bits)
+        interceptado = rng.random(n) < fracao
+        erro_eve = interceptado & (rng.random(n) >= ACERTO_BREIDBART)
+        erro_bob = interceptado & (rng.random(n) >= ACERTO_BREIDBART)
+        informacao = 1 - float(entropia_binaria(1 - ACERTO_BREIDBART))
+        return {
+            'erro': erro_eve ^ erro_bob,
+            'palpite': np.where(interceptado, alice_bits ^ erro_eve, rng.random(n) < 0.5).astype(alice_bits.dtype),
+            'informacao': np.where(interceptado, informacao, 0.0)
+        }
+    return modelo
+
+
+def clonagem_fase_covariante(perturbacao=None):
+    """
+    Cria o modelo aproximado de clonagem ótima covariante de fase
+
+    Eve clona cada qubit com um clonador assimétrico que induz taxa de erro
+    D em Bob e guarda o clone até o anúncio das bases. Para essa perturbação
+    a fidelidade ótima do clone de Eve é 1/2 + sqrt(D·(1 - D)), que define
+    tanto sua probabilidade de acerto quanto sua informação,
+    1 - h(1/2 + sqrt(D·(1 - D))) bits por qubit. Erros de Bob e de Eve são
+    tratados como independentes.
+
+    Args:
+        perturbacao (float | None): Taxa de erro induzida D; None usa o ponto
+            simétrico (1 - 1/√2)/2 ≈ 0,146, em que Bob e Eve têm a mesma fidelidade
+
+    Returns:
+        callable: Modelo `(alice_bits, alice_bases, rng) -> dict`
+    """
+    if perturbacao is None:
+        perturbacao = (1 - 1 / np.sqrt(2)) / 2
+    acerto_eve = 0.5 + np.sqrt(perturbacao * (1 - perturbacao))
+    informacao = 1 - float(entropia_binaria(acerto_eve))
+
+    def modelo(alice_bits, alice_bases, rng):
+        n = len(alice_bits)
+        erro_eve = rng.random(n) >= acerto_eve
+        return {
+            'erro': rng.random(n) < perturbacao,
+            'palpite': (alice_bits ^ erro_eve).astype(alice_bits.dtype),
+            'informacao': np.full(n, informacao)
+        }
+    return modelo
+
+
+def comparar_ataques(modelos, n_bits=1_000_000, erro_canal=0.0, seed=None):
+    """
+    Avalia vários modelos de Eve sobre o mesmo lote de qubits peneirados
+
+    Bits, bases e erros do canal são sorteados uma única vez e entregues a
+    todos os modelos; cada modelo recebe um gerador filho próprio para o
+    seu sorteio interno, de modo que as diferenças entre as linhas vêm só
+    dos ataques.
+
+    Args:
+        modelos (dict): Nome -> modelo de Eve
+        n_bits (int): Número de qubits transmitidos
+        erro_canal (float): Taxa de erro do canal quântico
+        seed (int | None): Semente da simulação
+
+    Returns:
+        list: Uma linha por modelo com a taxa de erro induzida, a taxa de
+            acerto e a informação média de Eve por bit peneirado
+    """
+    semente_lote, *sementes_modelos = np.random.SeedSequence(seed).spawn(1 + len(modelos))
+    rng = np.random.default_rng(semente_lote)
+
+    # Apenas as posições peneiradas importam, então Bob mede na base de Alice
+    n_peneirados = rng.binomial(n_bits, 0.5)
+    alice_bits = rng.integers(0, 2, n_peneirados)
+    alice_bases = rng.integers(0, 2, n_peneirados)
+    erros_canal = (rng.random(n_peneirados) < erro_canal) & (alice_bases == 0)
+
+    tabela = []
+    for (nome, modelo), semente in zip(modelos.items(), sementes_modelos):
+        ataque = modelo(alice_bits, alice_bases, np.random.default_rng(semente))
+        erros = ataque['erro'] ^ erros_canal
+
+        tabela.append({
+            'modelo': nome,
+            'tamanho_chave': n_peneirados,
+            'taxa_erro': float(np.mean(erros)) if n_peneirados else 0.0,
+            'acerto_eve': float(np.mean(ataque['palpite'] == alice_bits)) if n_peneirados else 0.0,
+            'informacao_eve': float(np.mean(ataque['informacao'])) if n_peneirados else 0.0
+        })
+    return tabela
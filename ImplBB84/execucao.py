@@ -0,0 +1,187 @@
+import threading
+import time
+
+from main import bb84_stream
+from resultado import ResultadoBB84
+
+# Número aproximado de blocos em que uma execução é dividida; cada bloco é
+# um ponto de progresso
+BLOCOS_POR_EXECUCAO = 100
+
+# Estados de uma execução
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDA = 'concluida'
+CANCELADA = 'cancelada'
+FALHOU = 'falhou'
+
+
+def tamanho_bloco(n_bits, blocos=BLOCOS_POR_EXECUCAO):
+    """
+    Escolhe o tamanho de bloco que divide `n_bits` em cerca de `blocos` partes
+
+    Args:
+        n_bits (int): Total de qubits
+        blocos (int): Número desejado de blocos
+
+    Returns:
+        int: Qubits por bloco
+    """
+    return max(1, -(-n_bits // blocos))
+
+
+class ExecucaoBB84:
+    """
+    Execução do BB84 em segundo plano, com progresso parcial e cancelamento
+
+    A simulação é consumida de `bb84_stream` bloco a bloco; após cada bloco,
+    os contadores acumulados (qubits processados, taxa de erro, tamanho da
+    chave peneirada) ficam disponíveis em `progresso()` e `historico()`,
+    que podem ser consultados de outra thread a qualquer momento. Os
+    backends fazem o trabalho pesado em NumPy ou no Aer, que liberam o GIL,
+    então a thread não congela quem a acompanha. `iniciar()` cria uma thread
+    própria; `executar()` roda na thread de quem chama, como nos workers de
+    `fila.FilaSimulacoes`.
+
+    Args:
+        n_bits (int): Número de qubits a serem transmitidos
+        erro_canal (float): Taxa de erro do canal quântico
+        presenca_eve (bool): Se True, simula a presença de um espião
+        backend (str): Backend de `bb84_protocolo`
+        seed (int | None): Semente da execução
+        chunk_size (int | None): Qubits por bloco (None usa `tamanho_bloco(n_bits)`)
+        manter_arrays (bool): Se True, junta os blocos em um `ResultadoBB84` ao final
+        empacotado (bool): Se True, guarda o resultado final empacotado
+            (`resultado.ResultadoEmpacotado`), com um oitavo da memória
+    """
+
+    def __init__(self, n_bits, erro_canal=0.05, presenca_eve=False, backend="numpy", seed=None,
+                 chunk_size=None, manter_arrays=True, empacotado=False):
+        if n_bits <= 0:
+            raise ValueError("n_bits deve ser positivo")
+        self.n_bits = n_bits
+        self.erro_canal = erro_canal
+        self.presenca_eve = presenca_eve
+        self.backend = backend
+        self.seed = seed
+        self.chunk_size = chunk_size or tamanho_bloco(n_bits)
+        self.manter_arrays = manter_arrays
+        self.empacotado = empacotado
+
+        self.estado = PENDENTE
+        self.resultado = None
+        self.erro = None
+        self._inicio = None
+        self._fim = None
+        self._progresso = {'qubits_processados': 0, 'tamanho_chave': 0, 'erros': 0, 'taxa_erro': 0}
+        self._historico = []
+        self._cancelar = threading.Event()
+        self._terminada = threading.Event()
+        self._trava = threading.Lock()
+
+    def iniciar(self):
+        """
+        Inicia a simulação em uma thread própria
+
+        Returns:
+            ExecucaoBB84: A própria execução
+        """
+        threading.Thread(target=self.executar, daemon=True, name="ExecucaoBB84").start()
+        return self
+
+    def executar(self):
+        """
+        Executa a simulação na thread atual, até o fim ou o cancelamento
+
+        Returns:
+            ExecucaoBB84: A própria execução
+        """
+        if self._cancelar.is_set():
+            return self
+        self._inicio = time.perf_counter()
+        self.estado = EXECUTANDO
+        self._executar()
+        return self
+
+    def cancelar(self):
+        """
+        Pede a interrupção da simulação, que para ao fim do bloco atual
+
+        Uma execução que ainda não começou é cancelada na hora.
+        """
+        self._cancelar.set()
+        if self.estado == PENDENTE:
+            self.estado = CANCELADA
+            self._terminada.set()
+
+    def aguardar(self, timeout=None):
+        """
+        Bloqueia até a simulação terminar
+
+        Args:
+            timeout (float | None): Tempo máximo de espera, em segundos
+
+        Returns:
+            bool: True se a simulação terminou
+        """
+        return self._terminada.wait(timeout)
+
+    @property
+    def ativa(self):
+        return self.estado in (PENDENTE, EXECUTANDO)
+
+    def progresso(self):
+        """
+        Retrata o estado atual da simulação
+
+        Returns:
+            dict: Estado, fração concluída, contadores acumulados e tempo decorrido
+        """
+        with self._trava:
+            progresso = dict(self._progresso)
+        fim = self._fim if self._fim is not None else time.perf_counter()
+        progresso['estado'] = self.estado
+        progresso['fracao'] = progresso['qubits_processados'] / self.n_bits
+        progresso['tempo'] = fim - self._inicio if self._inicio is not None else 0.0
+        return progresso
+
+    def historico(self):
+        """
+        Lista os contadores acumulados após cada bloco
+
+        Returns:
+            list: Um dict por bloco, com 'qubits_processados', 'taxa_erro' e 'tamanho_chave'
+        """
+        with self._trava:
+            return list(self._historico)
+
+    def _executar(self):
+        blocos = []
+        try:
+            for parcial in bb84_stream(n_bits=self.n_bits, chunk_size=self.chunk_size,
+                                       erro_canal=self.erro_canal, presenca_eve=self.presenca_eve,
+                                       backend=self.backend, seed=self.seed):
+                if self.manter_arrays:
+                    blocos.append(parcial['bloco'])
+                ponto = {
+                    'qubits_processados': parcial['qubits_processados'],
+                    'taxa_erro': parcial['taxa_erro'],
+                    'tamanho_chave': parcial['tamanho_chave_total'],
+                }
+                with self._trava:
+                    self._progresso = {**ponto, 'erros': parcial['erros_total']}
+                    self._historico.append(ponto)
+                if self._cancelar.is_set():
+                    self.estado = CANCELADA
+                    return
+            if self.manter_arrays:
+                self.resultado = ResultadoBB84.concatenar(blocos)
+                if self.empacotado:
+                    self.resultado = self.resultado.empacotar()
+            self.estado = CONCLUIDA
+        except Exception as erro:
+            self.erro = erro
+            self.estado = FALHOU
+        finally:
+            self._fim = time.perf_counter()
+            self._terminada.set()
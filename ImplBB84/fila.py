@@ -0,0 +1,207 @@
+import heapq
+import threading
+from collections import deque
+
+from execucao import CONCLUIDA, ExecucaoBB84
+
+# Vazão inicial de cada backend, em qubits por segundo, usada na estimativa de
+# espera até que execuções concluídas forneçam medidas reais (valores da ordem
+# dos medidos por QuantumBenchmarks/benchmark_bb84.py)
+VAZAO_INICIAL = {
+    'aer': 1_000,
+    'aer_lote': 8_000,
+    'aer_modelos': 100_000,
+    'numpy': 10_000_000,
+}
+
+# Peso de cada execução concluída na média móvel da vazão por backend
+PESO_VAZAO = 0.3
+
+
+class FilaSimulacoes:
+    """
+    Pool de workers com fila limitada, compartilhado por todas as sessões do processo
+
+    Cada worker é uma thread que retira a próxima simulação da fila (em
+    ordem de chegada) e a executa com `ExecucaoBB84.executar`. Pedidos com
+    parâmetros idênticos a uma simulação ainda na fila ou em execução
+    recebem a mesma `ExecucaoBB84`, sem custo adicional; o cancelamento só
+    interrompe a simulação quando nenhuma outra sessão a aguarda. A
+    espera estimada é calculada com a vazão observada de cada backend.
+
+    Args:
+        workers (int): Simulações executadas ao mesmo tempo
+        capacidade (int): Máximo de simulações aguardando na fila
+        limite_por_sessao (int): Máximo de simulações de uma sessão na fila ou em execução
+    """
+
+    def __init__(self, workers=2, capacidade=16, limite_por_sessao=2):
+        if workers <= 0 or capacidade <= 0 or limite_por_sessao <= 0:
+            raise ValueError("workers, capacidade e limite_por_sessao devem ser positivos")
+        self.workers = workers
+        self.capacidade = capacidade
+        self.limite_por_sessao = limite_por_sessao
+
+        self._fila = deque()
+        self._executando = []
+        self._execucoes = {}
+        self._inscritos = {}
+        self._vazao = dict(VAZAO_INICIAL)
+        self._condicao = threading.Condition()
+        for i in range(workers):
+            threading.Thread(target=self._trabalhar, daemon=True, name=f"FilaSimulacoes-{i}").start()
+
+    def submeter(self, sessao, **parametros):
+        """
+        Coloca uma simulação na fila, ou reaproveita uma idêntica já em andamento
+
+        Args:
+            sessao (str): Identificador da sessão que pede a simulação
+            **parametros: Argumentos de `ExecucaoBB84`
+
+        Returns:
+            ExecucaoBB84: Execução a acompanhar
+
+        Raises:
+            RuntimeError: Se a sessão atingiu seu limite ou a fila está cheia
+        """
+        chave = tuple(sorted(parametros.items()))
+        with self._condicao:
+            if chave in self._execucoes:
+                self._inscritos[chave].add(sessao)
+                return self._execucoes[chave]
+            if self.em_andamento(sessao) >= self.limite_por_sessao:
+                raise RuntimeError(f"Limite de {self.limite_por_sessao} simulações simultâneas por sessão atingido")
+            if len(self._fila) >= self.capacidade:
+                raise RuntimeError("A fila de simulações está cheia; tente novamente em instantes")
+
+            execucao = ExecucaoBB84(**parametros)
+            self._execucoes[chave] = execucao
+            self._inscritos[chave] = {sessao}
+            self._fila.append(chave)
+            self._condicao.notify()
+            return execucao
+
+    def cancelar(self, sessao, execucao):
+        """
+        Retira o interesse da sessão em uma simulação, cancelando-a se ninguém mais a aguarda
+
+        Args:
+            sessao (str): Identificador da sessão
+            execucao (ExecucaoBB84): Execução devolvida por `submeter`
+        """
+        with self._condicao:
+            chave = self._chave(execucao)
+            if chave is None:
+                return
+            self._inscritos[chave].discard(sessao)
+            if self._inscritos[chave]:
+                return
+            if chave in self._fila:
+                self._fila.remove(chave)
+            del self._execucoes[chave]
+            del self._inscritos[chave]
+        execucao.cancelar()
+
+    def em_andamento(self, sessao):
+        """
+        Conta as simulações que a sessão aguarda, na fila ou em execução
+
+        Args:
+            sessao (str): Identificador da sessão
+
+        Returns:
+            int: Número de simulações
+        """
+        with self._condicao:
+            return sum(sessao in inscritos for inscritos in self._inscritos.values())
+
+    def posicao(self, execucao):
+        """
+        Informa a posição de uma simulação na fila
+
+        Args:
+            execucao (ExecucaoBB84): Execução devolvida por `submeter`
+
+        Returns:
+            int | None: 0 se está em execução, 1 ou mais se aguarda na fila, None se já saiu da fila
+        """
+        with self._condicao:
+            if execucao in self._executando:
+                return 0
+            chave = self._chave(execucao)
+            if chave is None or chave not in self._fila:
+                return None
+            return self._fila.index(chave) + 1
+
+    def espera_estimada(self, execucao):
+        """
+        Estima em quantos segundos uma simulação da fila começa a executar
+
+        Distribui as simulações à frente entre os workers, na ordem da fila,
+        com a duração prevista pela vazão média de cada backend; os workers
+        ocupados ficam livres quando terminar o que falta da simulação atual.
+
+        Args:
+            execucao (ExecucaoBB84): Execução devolvida por `submeter`
+
+        Returns:
+            float: Segundos até o início (0 se já está em execução ou fora da fila)
+        """
+        with self._condicao:
+            livres = [self._duracao(atual) * (1 - atual.progresso()['fracao']) for atual in self._executando]
+            livres += [0.0] * (self.workers - len(livres))
+            heapq.heapify(livres)
+            for chave in self._fila:
+                inicio = heapq.heappop(livres)
+                if self._execucoes[chave] is execucao:
+                    return inicio
+                heapq.heappush(livres, inicio + self._duracao(self._execucoes[chave]))
+            return 0.0
+
+    def estado(self):
+        """
+        Resume a ocupação da fila
+
+        Returns:
+            dict: Workers, simulações em execução e na fila, capacidade e vazão média por backend
+        """
+        with self._condicao:
+            return {
+                'workers': self.workers,
+                'executando': len(self._executando),
+                'na_fila': len(self._fila),
+                'capacidade': self.capacidade,
+                'vazao': dict(self._vazao),
+            }
+
+    def _chave(self, execucao):
+        for chave, candidata in self._execucoes.items():
+            if candidata is execucao:
+                return chave
+        return None
+
+    def _duracao(self, execucao):
+        return execucao.n_bits / self._vazao.get(execucao.backend, min(VAZAO_INICIAL.values()))
+
+    def _trabalhar(self):
+        while True:
+            with self._condicao:
+                while not self._fila:
+                    self._condicao.wait()
+                chave = self._fila.popleft()
+                execucao = self._execucoes[chave]
+                self._executando.append(execucao)
+
+            execucao.executar()
+
+            with self._condicao:
+                self._executando.remove(execucao)
+                if self._execucoes.get(chave) is execucao:
+                    del self._execucoes[chave]
+                    del self._inscritos[chave]
+                progresso = execucao.progresso()
+                if execucao.estado == CONCLUIDA and progresso['tempo'] > 0:
+                    vazao = execucao.n_bits / progresso['tempo']
+                    anterior = self._vazao.get(execucao.backend, vazao)
+                    self._vazao[execucao.backend] = (1 - PESO_VAZAO) * anterior + PESO_VAZAO * vazao
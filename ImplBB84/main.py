@@ -1,100 +1,620 @@
+import time
 import qiskit_aer
 from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
 import numpy as np
+from empacotamento import resultado_empacotado
+from perfil import Perfilador, etapa
+from resultado import ResultadoBB84, ResumoBB84
+from ruido import TIPOS_RUIDO, qber_ruido
+from simulador import compilar, metodo_simulacao, simulador_compartilhado
 
-def bb84_protocolo(n_bits=100, erro_canal=0.05, presenca_eve=False):
+# Maior semente aceita pelo `seed_simulator` do Aer
+_SEMENTE_MAXIMA_AER = 2 ** 31
+
+
+def gerador(rng=None, seed=None):
     """
-    Simula o protocolo BB84 para Distribuição de Chaves Quânticas
+    Normaliza a fonte de aleatoriedade de uma simulação
 
     Args:
-        n_bits (int): Número de qubits a serem transmitidos
+        rng (np.random.Generator | None): Gerador a usar diretamente
+        seed (int | np.random.SeedSequence | None): Semente de um novo gerador
+            quando `rng` é None (None usa entropia do sistema)
+
+    Returns:
+        np.random.Generator: Gerador da simulação
+    """
+    return rng if rng is not None else np.random.default_rng(seed)
+
+
+def fluxos_independentes(seed, n):
+    """
+    Cria geradores independentes e reprodutíveis para execuções paralelas
+
+    Cada gerador vem de um filho de `np.random.SeedSequence(seed)`, de modo
+    que os fluxos não se sobrepõem e a sequência de cada um depende apenas
+    da semente raiz e da sua posição, não da ordem de execução.
+
+    Args:
+        seed (int | np.random.SeedSequence | None): Semente raiz
+        n (int): Número de fluxos
+
+    Returns:
+        list: `n` instâncias de np.random.Generator
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [np.random.default_rng(filho) for filho in seed.spawn(n)]
+
+
+def _medir_aer(alice_bits, alice_bases, bob_bases, erro_canal, presenca_eve, ruido=None, rng=None):
+    """
+    Executa um circuito (ou dois, com Eve) no AerSimulator para cada qubit
+
+    O circuito de Eve roda sem o NoiseModel de propósito: nos backends em
+    lote ela mede no meio do circuito, e o ruído do canal (na porta `id`)
+    só vem depois dela, enquanto o erro de leitura corrompe apenas o bit
+    registrado, não o estado que segue para Bob. Como aqui Eve reenvia a
+    partir do bit registrado, aplicar o erro de leitura à sua medição
+    acrescentaria erros que os outros backends não têm.
+
+    Args:
+        alice_bits (np.ndarray): Bits de Alice
+        alice_bases (np.ndarray): Bases de Alice (0 = computacional, 1 = Hadamard)
+        bob_bases (np.ndarray): Bases de medição de Bob
         erro_canal (float): Taxa de erro do canal quântico
         presenca_eve (bool): Se True, simula a presença de um espião
+        ruido (tuple | None): (tipo, p) do NoiseModel que substitui o bit flip do canal
+        rng (np.random.Generator | None): Fonte de aleatoriedade da simulação
 
     Returns:
-        dict: Dicionário com resultados e estatísticas
+        np.ndarray: Resultados das medições de Bob
     """
-    # Alice gera bits aleatórios para a mensagem e escolha de bases
-    alice_bits = np.random.randint(0, 2, n_bits)
-    alice_bases = np.random.randint(0, 2, n_bits)
+    n_bits = len(alice_bits)
+    rng = gerador(rng)
 
-    # Bob escolhe bases aleatórias para medição
-    bob_bases = np.random.randint(0, 2, n_bits)
+    # Sorteios de Eve, do canal e das sementes do Aer feitos antes do laço
+    eve_bases = rng.integers(0, 2, n_bits) if presenca_eve else None
+    erros = rng.random(n_bits) < erro_canal
+    sementes = rng.integers(0, _SEMENTE_MAXIMA_AER, (n_bits, 2)).tolist()
 
     # Lista para armazenar os resultados da medição de Bob
     bob_resultados = []
 
-    # Simulador quântico
-    simulator = AerSimulator()
-
     # Para cada bit, Alice prepara um qubit e Bob mede
     for i in range(n_bits):
-        qc = QuantumCircuit(1, 1)
+        with etapa('construcao_circuito'):
+            qc = QuantumCircuit(1, 1)
 
-        # Alice codifica seu bit
-        if alice_bits[i] == 1:
-            qc.x(0)  # Aplica porta X se o bit for 1
+            # Alice codifica seu bit
+            if alice_bits[i] == 1:
+                qc.x(0)  # Aplica porta X se o bit for 1
 
-        # Se Alice usar a base Hadamard
-        if alice_bases[i] == 1:
-            qc.h(0)  # Aplica porta Hadamard
+            # Se Alice usar a base Hadamard
+            if alice_bases[i] == 1:
+                qc.h(0)  # Aplica porta Hadamard
 
         # Simulação de espião (Eve)
         if presenca_eve:
-            # Eve mede em uma base aleatória e reenvia
-            eve_base = np.random.randint(0, 2)
-            eve_qc = qc.copy()  # Cria uma cópia do circuito para medição de Eve
+            with etapa('eve'):
+                # Eve mede em uma base aleatória e reenvia
+                eve_base = eve_bases[i]
+                eve_qc = qc.copy()  # Cria uma cópia do circuito para medição de Eve
 
-            # Eve aplica H gate se sua base for 1 (Hadamard)
-            if eve_base == 1:
-                eve_qc.h(0)
+                # Eve aplica H gate se sua base for 1 (Hadamard)
+                if eve_base == 1:
+                    eve_qc.h(0)
 
-            # Eve mede o circuito
-            eve_qc.measure(0, 0)
-            resultado = simulator.run(eve_qc, shots=1).result().get_counts(eve_qc)
-            bit_medido = int(list(resultado.keys())[0])
+                # Eve mede o circuito
+                eve_qc.measure(0, 0)
+                # Sem ruído: o bit medido é o estado colapsado que segue para Bob (ver docstring)
+                simulator, eve_qc = compilar(eve_qc)
+                resultado = simulator.run(eve_qc, shots=1, seed_simulator=sementes[i][0]).result().get_counts()
+                bit_medido = int(list(resultado.keys())[0])
 
-            # Eve prepara um novo circuito baseado no que mediu
-            new_qc = QuantumCircuit(1, 1)
-            if bit_medido == 1:
-                new_qc.x(0)
+                # Eve prepara um novo circuito baseado no que mediu
+                new_qc = QuantumCircuit(1, 1)
+                if bit_medido == 1:
+                    new_qc.x(0)
 
-            # Se Eve usou base Hadamard, aplica H gate novamente
-            if eve_base == 1:
-                new_qc.h(0)
+                # Se Eve usou base Hadamard, aplica H gate novamente
+                if eve_base == 1:
+                    new_qc.h(0)
 
-            qc = new_qc  # Substitui o circuito original pelo novo preparado por Eve
+                qc = new_qc  # Substitui o circuito original pelo novo preparado por Eve
 
         # Simulação de erro no canal
-        if np.random.random() < erro_canal:
-            qc.x(0)  # Bit flip com probabilidade erro_canal
+        with etapa('canal'):
+            if ruido is not None:
+                qc.id(0)  # O NoiseModel do Aer aplica o ruído nesta porta
+            elif erros[i]:
+                qc.x(0)  # Bit flip com probabilidade erro_canal
 
         # Bob mede na sua base escolhida
-        if bob_bases[i] == 1:  # Base Hadamard
-            qc.h(0)
+        with etapa('construcao_circuito'):
+            if bob_bases[i] == 1:  # Base Hadamard
+                qc.h(0)
 
-        qc.measure(0, 0)
+            qc.measure(0, 0)
 
         # Executa o circuito e obtém resultados
-        resultado = simulator.run(qc, shots=1).result().get_counts(qc)
+        with etapa('execucao_aer'):
+            simulator, qc = compilar(qc, ruido)
+            resultado = simulator.run(qc, shots=1, seed_simulator=sementes[i][1]).result().get_counts()
 
         # Armazena o resultado de Bob
         bit_medido = int(list(resultado.keys())[0])
         bob_resultados.append(bit_medido)
 
     # Converte para numpy array para facilitar operações
-    bob_resultados = np.array(bob_resultados)
+    return np.array(bob_resultados)
+
+
+def _medir_numpy(alice_bits, alice_bases, bob_bases, erro_canal, presenca_eve, rng=None):
+    """
+    Calcula as medições de Bob com operações vetorizadas, sem executar circuitos
+
+    Reproduz a mesma física dos circuitos de `_medir_aer`: a medição é
+    determinística quando a base de medição coincide com a base em que o
+    qubit foi preparado e é uma moeda justa caso contrário.
+
+    Args:
+        alice_bits (np.ndarray): Bits de Alice
+        alice_bases (np.ndarray): Bases de Alice (0 = computacional, 1 = Hadamard)
+        bob_bases (np.ndarray): Bases de medição de Bob
+        erro_canal (float): Taxa de erro do canal quântico
+        presenca_eve (bool): Se True, simula a presença de um espião
+        rng (np.random.Generator | None): Fonte de aleatoriedade da simulação
+
+    Returns:
+        np.ndarray: Resultados das medições de Bob
+    """
+    n_bits = len(alice_bits)
+    rng = gerador(rng)
+
+    # Estado que viaja pelo canal: bit codificado e base de preparação
+    bits_enviados = alice_bits
+    bases_enviadas = alice_bases
+
+    # Eve mede em uma base aleatória e reenvia o que mediu na mesma base
+    if presenca_eve:
+        with etapa('eve'):
+            eve_bases = rng.integers(0, 2, n_bits)
+            eve_moeda = rng.integers(0, 2, n_bits)
+            bits_enviados = np.where(eve_bases == alice_bases, alice_bits, eve_moeda)
+            bases_enviadas = eve_bases
+
+    # A porta X do canal só inverte estados da base computacional;
+    # em |+⟩ e |-⟩ ela introduz apenas uma fase global
+    with etapa('canal'):
+        erros = rng.random(n_bits) < erro_canal
+        bits_enviados = bits_enviados ^ (erros & (bases_enviadas == 0))
+
+    # Bob obtém o bit enviado se medir na base de preparação, senão um bit aleatório
+    with etapa('medicao_bob'):
+        bob_moeda = rng.integers(0, 2, n_bits)
+        return np.where(bob_bases == bases_enviadas, bits_enviados, bob_moeda)
+
+
+# Número de qubits BB84 independentes empacotados em cada circuito do lote
+LARGURA_LOTE = 64
+
+
+def _montar_qubit(qc, q, bit, base_alice, base_eve, erro, base_bob, clbit_eve, clbit_bob, ruidoso=False):
+    """
+    Adiciona ao circuito a jornada completa de um qubit BB84, de Alice até Bob
+
+    A interceptação de Eve é uma medição no meio do circuito: após medir, o
+    qubit colapsa no estado que ela obteve e basta desfazer a rotação da sua
+    base para reenviá-lo, sem precisar de outro job.
+
+    Args:
+        qc (QuantumCircuit): Circuito de destino
+        q (int): Índice do qubit no circuito
+        bit (int): Bit de Alice
+        base_alice (int): Base de Alice (0 = computacional, 1 = Hadamard)
+        base_eve (int | None): Base de Eve, ou None se não houver espião
+        erro (bool): Se True, o canal aplica um bit flip
+        base_bob (int): Base de medição de Bob
+        clbit_eve (int): Bit clássico que guarda a medição de Eve
+        clbit_bob (int): Bit clássico que guarda a medição de Bob
+        ruidoso (bool): Se True, marca o canal com uma porta `id`, onde o
+            NoiseModel do simulador aplica o ruído
+    """
+    # Alice codifica seu bit na base escolhida
+    if bit == 1:
+        qc.x(q)
+    if base_alice == 1:
+        qc.h(q)
+
+    # Eve mede na sua base e reenvia o estado colapsado nessa mesma base
+    if base_eve is not None:
+        if base_eve == 1:
+            qc.h(q)
+        qc.measure(q, clbit_eve)
+        if base_eve == 1:
+            qc.h(q)
+
+    # Simulação de erro no canal
+    if ruidoso:
+        qc.id(q)
+    if erro:
+        qc.x(q)
+
+    # Bob mede na sua base escolhida
+    if base_bob == 1:
+        qc.h(q)
+    qc.measure(q, clbit_bob)
+
+
+def _medir_aer_lote(alice_bits, alice_bases, bob_bases, erro_canal, presenca_eve, ruido=None, rng=None):
+    """
+    Executa todos os qubits no AerSimulator em uma única chamada de `run`
+
+    Os qubits são empacotados em circuitos largos de até `LARGURA_LOTE` qubits
+    independentes, com a interceptação de Eve feita no próprio circuito.
+
+    Args:
+        alice_bits (np.ndarray): Bits de Alice
+        alice_bases (np.ndarray): Bases de Alice (0 = computacional, 1 = Hadamard)
+        bob_bases (np.ndarray): Bases de medição de Bob
+        erro_canal (float): Taxa de erro do canal quântico
+        presenca_eve (bool): Se True, simula a presença de um espião
+        ruido (tuple | None): (tipo, p) do NoiseModel que substitui o bit flip do canal
+        rng (np.random.Generator | None): Fonte de aleatoriedade da simulação
+
+    Returns:
+        np.ndarray: Resultados das medições de Bob
+    """
+    n_bits = len(alice_bits)
+    if n_bits == 0:
+        return np.array([], dtype=int)
+    rng = gerador(rng)
+
+    # Sorteios de Eve e do canal feitos de uma vez, antes de montar os circuitos
+    with etapa('sorteios'):
+        eve_bases = rng.integers(0, 2, n_bits) if presenca_eve else None
+        erros = np.zeros(n_bits, dtype=bool) if ruido is not None else rng.random(n_bits) < erro_canal
+        semente = int(rng.integers(0, _SEMENTE_MAXIMA_AER))
+
+    with etapa('construcao_circuito'):
+        circuitos = []
+        for inicio in range(0, n_bits, LARGURA_LOTE):
+            largura = min(LARGURA_LOTE, n_bits - inicio)
+            # Bits clássicos [0, largura) guardam Eve e [largura, 2*largura) guardam Bob
+            qc = QuantumCircuit(largura, 2 * largura)
+            for q in range(largura):
+                i = inicio + q
+                _montar_qubit(qc, q, alice_bits[i], alice_bases[i],
+                              eve_bases[i] if presenca_eve else None,
+                              erros[i], bob_bases[i], q, largura + q, ruido is not None)
+            circuitos.append(qc)
+
+    with etapa('execucao_aer'):
+        simulator = simulador_compartilhado(metodo_simulacao(circuitos, ruido), ruido)
+        resultado = simulator.run(circuitos, shots=1, memory=True, seed_simulator=semente).result()
+
+    # Cada memória é uma string com o bit clássico de maior índice à esquerda;
+    # os resultados de Bob são os `largura` primeiros caracteres, invertidos
+    with etapa('leitura_resultados'):
+        bob_resultados = []
+        for indice, qc in enumerate(circuitos):
+            largura = qc.num_qubits
+            memoria = resultado.get_memory(indice)[0]
+            bob_resultados.append(np.frombuffer(memoria[:largura].encode(), dtype=np.uint8)[::-1])
+
+        return (np.concatenate(bob_resultados) - ord('0')).astype(int)
+
+
+def _modelo_compilado(assinatura, ruido=None):
+    """
+    Monta o circuito-modelo de uma assinatura e o obtém do cache de compilação
+
+    Args:
+        assinatura (tuple): (bit, base_alice, base_eve, erro, base_bob), com
+            base_eve None quando não há espião
+        ruido (tuple | None): (tipo, p) do NoiseModel do canal
+
+    Returns:
+        tuple: (simulador compartilhado, circuito transpilado)
+    """
+    bit, base_alice, base_eve, erro, base_bob = assinatura
+    # Bit clássico 0 guarda Eve e o último guarda Bob
+    qc = QuantumCircuit(1, 1 if base_eve is None else 2)
+    _montar_qubit(qc, 0, bit, base_alice, base_eve, erro, base_bob, 0, qc.num_clbits - 1, ruido is not None)
+    return compilar(qc, ruido)
+
+
+def _medir_aer_modelos(alice_bits, alice_bases, bob_bases, erro_canal, presenca_eve, ruido=None, rng=None):
+    """
+    Executa cada circuito distinto uma única vez, com um shot por qubit
+
+    Cada qubit usa um de poucos circuitos possíveis (bit, base de Alice, base
+    de Eve, erro do canal e base de Bob). Os qubits são agrupados por essa
+    assinatura, cada modelo roda com `shots` igual ao tamanho do grupo e os
+    resultados de cada shot voltam para a posição original do qubit. Com um
+    NoiseModel o erro deixa de fazer parte da assinatura: o Aer aplica o
+    ruído a cada shot e sobram no máximo 16 modelos, ou 8 sem Eve.
+
+    Args:
+        alice_bits (np.ndarray): Bits de Alice
+        alice_bases (np.ndarray): Bases de Alice (0 = computacional, 1 = Hadamard)
+        bob_bases (np.ndarray): Bases de medição de Bob
+        erro_canal (float): Taxa de erro do canal quântico
+        presenca_eve (bool): Se True, simula a presença de um espião
+        ruido (tuple | None): (tipo, p) do NoiseModel que substitui o bit flip do canal
+        rng (np.random.Generator | None): Fonte de aleatoriedade da simulação
+
+    Returns:
+        np.ndarray: Resultados das medições de Bob
+    """
+    n_bits = len(alice_bits)
+    rng = gerador(rng)
+
+    # Sorteios de Eve e do canal feitos de uma vez
+    with etapa('sorteios'):
+        eve_bases = rng.integers(0, 2, n_bits) if presenca_eve else np.zeros(n_bits, dtype=int)
+        if ruido is not None:
+            erros = np.zeros(n_bits, dtype=int)
+        else:
+            erros = (rng.random(n_bits) < erro_canal).astype(int)
+
+        # Código inteiro da assinatura de cada qubit
+        codigos = alice_bits + 2 * alice_bases + 4 * eve_bases + 8 * erros + 16 * bob_bases
+
+    bob_resultados = np.zeros(n_bits, dtype=int)
+    modelos = np.unique(codigos).tolist()
+    sementes = rng.integers(0, _SEMENTE_MAXIMA_AER, len(modelos)).tolist()
+    for codigo, semente in zip(modelos, sementes):
+        indices = np.flatnonzero(codigos == codigo)
+        assinatura = (codigo & 1, (codigo >> 1) & 1,
+                      (codigo >> 2) & 1 if presenca_eve else None,
+                      (codigo >> 3) & 1, (codigo >> 4) & 1)
+        simulator, qc = _modelo_compilado(assinatura, ruido)
+
+        with etapa('execucao_aer'):
+            memoria = simulator.run(qc, shots=len(indices), memory=True,
+                                    seed_simulator=semente).result().get_memory(0)
+
+        # O bit de Bob é o primeiro caractere de cada memória (maior índice clássico)
+        with etapa('leitura_resultados'):
+            caracteres = np.frombuffer(''.join(memoria).encode(), dtype=np.uint8)
+            bob_resultados[indices] = caracteres.reshape(len(indices), -1)[:, 0] - ord('0')
+
+    return bob_resultados
+
+
+def _medir_numpy_ataque(alice_bits, alice_bases, bob_bases, erro_canal, modelo_eve, rng=None):
+    """
+    Calcula as medições de Bob sob um modelo de ataque de Eve (ver `eve`)
 
-    # Determina quais bits mantêm (onde as bases coincidem)
-    mesma_base = alice_bases == bob_bases
+    O modelo informa, para o lote inteiro, se o qubit que chega a Bob
+    resulta no bit errado quando medido na base de Alice; nas demais bases o
+    resultado de Bob é uma moeda justa.
 
-    # Bits da chave peneirada (sifted key)
-    alice_chave = alice_bits[mesma_base]
-    bob_chave = bob_resultados[mesma_base]
+    Args:
+        alice_bits (np.ndarray): Bits de Alice
+        alice_bases (np.ndarray): Bases de Alice (0 = computacional, 1 = Hadamard)
+        bob_bases (np.ndarray): Bases de medição de Bob
+        erro_canal (float): Taxa de erro do canal quântico
+        modelo_eve (callable): Modelo `(alice_bits, alice_bases, rng) -> dict`
+        rng (np.random.Generator | None): Fonte de aleatoriedade da simulação
+
+    Returns:
+        tuple: Resultados das medições de Bob e o dicionário devolvido pelo modelo
+    """
+    n_bits = len(alice_bits)
+    rng = gerador(rng)
+    with etapa('eve'):
+        ataque = modelo_eve(alice_bits, alice_bases, rng)
+
+    # O bit flip do canal só afeta estados da base computacional
+    with etapa('canal'):
+        erros = rng.random(n_bits) < erro_canal
+        bits_recebidos = alice_bits ^ ataque['erro'] ^ (erros & (alice_bases == 0))
+
+    with etapa('medicao_bob'):
+        bob_moeda = rng.integers(0, 2, n_bits)
+        return np.where(bob_bases == alice_bases, bits_recebidos, bob_moeda), ataque
+
+
+# Backends disponíveis para obter as medições de Bob
+BACKENDS = {
+    'aer': _medir_aer,
+    'aer_lote': _medir_aer_lote,
+    'aer_modelos': _medir_aer_modelos,
+    'numpy': _medir_numpy,
+}
+
+
+def medir_vazao(backend, n_bits=1000, erro_canal=0.05, presenca_eve=False, ruido=None):
+    """
+    Mede a vazão de um backend em qubits por segundo
+
+    Args:
+        backend (str): Nome do backend em `BACKENDS`
+        n_bits (int): Número de qubits a serem transmitidos
+        erro_canal (float): Taxa de erro do canal quântico
+        presenca_eve (bool): Se True, simula a presença de um espião
+        ruido (str | None): Tipo de ruído do NoiseModel (ver `bb84_protocolo`)
+
+    Returns:
+        float: Qubits processados por segundo
+    """
+    inicio = time.perf_counter()
+    bb84_protocolo(n_bits=n_bits, erro_canal=erro_canal, presenca_eve=presenca_eve, backend=backend, ruido=ruido)
+    return n_bits / (time.perf_counter() - inicio)
+
+
+def comparar_ruidos(n_bits=100_000, erro_canal=0.05, backend="aer_modelos", tipos=TIPOS_RUIDO):
+    """
+    Mede vazão e taxa de erro do BB84 sem espião para cada tipo de ruído do canal
+
+    A primeira linha usa o bit flip sorteado em Python, como referência. Uma
+    execução curta antes de cada medida deixa os circuitos compilados em cache.
 
-    # Verifica taxa de erro
-    taxa_erro = np.sum(alice_chave != bob_chave) / len(alice_chave) if len(alice_chave) > 0 else 0
+    Args:
+        n_bits (int): Número de qubits por medida
+        erro_canal (float): Parâmetro de todos os ruídos
+        backend (str): Backend Aer usado nas medidas
+        tipos (tuple): Tipos de ruído a comparar
+
+    Returns:
+        list: Uma linha por ruído com qubits por segundo e taxas de erro medida e teórica
+    """
+    tabela = []
+    for tipo in (None, *tipos):
+        bb84_protocolo(n_bits=1000, erro_canal=erro_canal, backend=backend, ruido=tipo)
+
+        inicio = time.perf_counter()
+        resultado = bb84_protocolo(n_bits=n_bits, erro_canal=erro_canal, backend=backend, ruido=tipo)
+        duracao = time.perf_counter() - inicio
+
+        tabela.append({
+            'ruido': tipo or 'bit_flip_python',
+            'qubits_por_segundo': n_bits / duracao,
+            'taxa_erro': float(resultado['taxa_erro']),
+            'taxa_erro_teorica': qber_ruido(tipo or 'bit_flip', erro_canal)
+        })
+    return tabela
+
+
+def bb84_protocolo(n_bits=100, erro_canal=0.05, presenca_eve=None, backend="aer", empacotado=False, eve=None,
+                   perfil=False, trace=None, ruido=None, manter_arrays=True, objeto=False, seed=None, rng=None):
+    """
+    Simula o protocolo BB84 para Distribuição de Chaves Quânticas
+
+    Args:
+        n_bits (int): Número de qubits a serem transmitidos
+        erro_canal (float): Taxa de erro do canal quântico
+        presenca_eve (bool | None): Se True, simula a presença de um espião;
+            None equivale a True quando `eve` é dado e a False caso contrário
+        backend (str): Uma das chaves de `BACKENDS`: 'aer' executa um circuito
+            por qubit no AerSimulator; 'aer_lote' junta todos os qubits em
+            circuitos largos de uma única execução; 'aer_modelos' executa uma
+            vez cada combinação distinta de preparação e medição; 'numpy'
+            calcula as mesmas medições de forma vetorizada
+        empacotado (bool): Se True, devolve bits, bases e chaves empacotados
+            em bytes (ver `empacotamento.resultado_empacotado`)
+        eve (callable | None): Modelo de ataque do módulo `eve`; substitui o
+            espião de `presenca_eve`, que não pode ser False, e exige o backend 'numpy'
+        perfil (bool | Perfilador): Se True (ou um `perfil.Perfilador`), mede
+            tempo, chamadas e pico de memória de cada etapa e devolve o
+            resumo na chave 'perfil'
+        trace (str | None): Caminho de um arquivo JSON no formato Trace Event
+            do Chrome com os eventos do perfil; implica `perfil=True`
+        ruido (str | None): Um dos `ruido.TIPOS_RUIDO` ('bit_flip', 'phase_flip',
+            'depolarizante', 'amortecimento', 'leitura'), aplicado por um
+            NoiseModel do Aer com parâmetro `erro_canal` em vez do bit flip
+            sorteado em Python; exige um backend Aer
+        manter_arrays (bool): Se False, descarta todos os arrays e devolve um
+            `resultado.ResumoBB84` com contagens, taxa de erro e tamanho da chave
+        objeto (bool): Se True, devolve um `resultado.ResultadoBB84`, que
+            guarda bits e bases em uint8 e calcula chaves e taxa de erro sob demanda
+        seed (int | np.random.SeedSequence | None): Semente da simulação; a
+            mesma semente reproduz bits, bases, Eve, canal e medições do Aer
+        rng (np.random.Generator | None): Gerador a usar no lugar de `seed`,
+            por exemplo um dos fluxos de `fluxos_independentes`
+
+    Returns:
+        dict | ResultadoBB84 | ResumoBB84: Resultados e estatísticas
+
+    Raises:
+        ValueError: Se os parâmetros forem incompatíveis entre si, por
+            exemplo `eve` com `presenca_eve=False`
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {backend!r}. Opções: {', '.join(BACKENDS)}")
+    if eve is not None:
+        if backend != 'numpy':
+            raise ValueError("Modelos de Eve só são suportados no backend 'numpy'")
+        if presenca_eve is not None and not presenca_eve:
+            raise ValueError("eve exige presenca_eve=True (ou None)")
+    presenca_eve = eve is not None if presenca_eve is None else presenca_eve
+    if ruido is not None:
+        if ruido not in TIPOS_RUIDO:
+            raise ValueError(f"Ruído desconhecido: {ruido!r}. Opções: {', '.join(TIPOS_RUIDO)}")
+        if backend == 'numpy':
+            raise ValueError("O ruído por NoiseModel exige um backend Aer")
+        ruido = (ruido, float(erro_canal))
+    if empacotado and (objeto or not manter_arrays):
+        raise ValueError("empacotado não pode ser combinado com objeto ou manter_arrays=False")
+
+    formato = 'empacotado' if empacotado else 'resumo' if not manter_arrays else 'objeto' if objeto else 'dict'
+    rng = gerador(rng, seed)
+    if not perfil and trace is None:
+        return _executar_protocolo(n_bits, erro_canal, presenca_eve, backend, formato, eve, ruido, rng)
+
+    perfilador = perfil if isinstance(perfil, Perfilador) else Perfilador()
+    with perfilador, perfilador.etapa('bb84_protocolo'):
+        resultado = _executar_protocolo(n_bits, erro_canal, presenca_eve, backend, formato, eve, ruido, rng)
+
+    if trace is not None:
+        perfilador.salvar_trace(trace)
+    if isinstance(resultado, dict):
+        return {**resultado, 'perfil': perfilador.resumo()}
+    resultado.extras['perfil'] = perfilador.resumo()
+    return resultado
+
+
+def _executar_protocolo(n_bits, erro_canal, presenca_eve, backend, formato, eve, ruido, rng):
+    """
+    Executa as etapas do BB84 (ver `bb84_protocolo`), marcando-as para o perfilador
+
+    `formato` é 'dict', 'empacotado', 'objeto' ou 'resumo'.
+
+    Returns:
+        dict | ResultadoBB84 | ResumoBB84: Resultados e estatísticas
+    """
+    # Alice gera bits aleatórios para a mensagem e escolha de bases
+    with etapa('geracao_aleatoria'):
+        alice_bits = rng.integers(0, 2, n_bits)
+        alice_bases = rng.integers(0, 2, n_bits)
+
+        # Bob escolhe bases aleatórias para medição
+        bob_bases = rng.integers(0, 2, n_bits)
+
+    # Qubits transmitidos e medidos por Bob
+    with etapa('medicao'):
+        if ruido is not None:
+            bob_resultados = BACKENDS[backend](alice_bits, alice_bases, bob_bases, erro_canal, presenca_eve,
+                                               ruido, rng=rng)
+        elif eve is None:
+            bob_resultados = BACKENDS[backend](alice_bits, alice_bases, bob_bases, erro_canal, presenca_eve,
+                                               rng=rng)
+        else:
+            bob_resultados, ataque = _medir_numpy_ataque(alice_bits, alice_bases, bob_bases, erro_canal, eve, rng)
+
+    with etapa('peneiramento'):
+        # Determina quais bits mantêm (onde as bases coincidem)
+        mesma_base = alice_bases == bob_bases
+
+        # O que Eve sabe sobre a chave peneirada
+        estatisticas_eve = {}
+        if eve is not None:
+            peneirados = max(int(np.sum(mesma_base)), 1)
+            estatisticas_eve = {
+                'acerto_eve': np.sum(ataque['palpite'][mesma_base] == alice_bits[mesma_base]) / peneirados,
+                'informacao_eve': np.sum(ataque['informacao'][mesma_base]) / peneirados
+            }
+
+        if formato == 'empacotado':
+            return {**resultado_empacotado(alice_bits, alice_bases, bob_bases, bob_resultados), **estatisticas_eve}
+        if formato == 'objeto':
+            return ResultadoBB84(alice_bits, alice_bases, bob_bases, bob_resultados, estatisticas_eve)
+        if formato == 'resumo':
+            # Contagens direto das máscaras, sem materializar as chaves
+            tamanho_chave = int(np.count_nonzero(mesma_base))
+            erros = int(np.count_nonzero((alice_bits != bob_resultados) & mesma_base))
+            return ResumoBB84(n_bits, tamanho_chave, erros, erros / tamanho_chave if tamanho_chave > 0 else 0,
+                              estatisticas_eve)
+
+        # Bits da chave peneirada (sifted key)
+        alice_chave = alice_bits[mesma_base]
+        bob_chave = bob_resultados[mesma_base]
+
+        # Verifica taxa de erro
+        taxa_erro = np.sum(alice_chave != bob_chave) / len(alice_chave) if len(alice_chave) > 0 else 0
 
     return {
         'alice_bits': alice_bits,
@@ -102,13 +622,149 @@ def bb84_protocolo(n_bits=100, erro_canal=0.05, presenca_eve=False):
         'alice_chave': alice_chave,
         'bob_chave': bob_chave,
         'taxa_erro': taxa_erro,
-        'tamanho_chave': len(alice_chave)
+        'tamanho_chave': len(alice_chave),
+        **estatisticas_eve
     }
 
-# Executa simulação sem espião
-resultado_sem_eve = bb84_protocolo(n_bits=1000, erro_canal=0.05, presenca_eve=False)
-print(f"Sem espião: Taxa de erro: {resultado_sem_eve['taxa_erro']:.4f}, Tamanho da chave: {resultado_sem_eve['tamanho_chave']}")
 
-# Executa simulação com espião
-resultado_com_eve = bb84_protocolo(n_bits=1000, erro_canal=0.05, presenca_eve=True)
-print(f"Com espião: Taxa de erro: {resultado_com_eve['taxa_erro']:.4f}, Tamanho da chave: {resultado_com_eve['tamanho_chave']}")
\ No newline at end of file
+def bb84_stream(n_bits=None, chunk_size=100_000, erro_canal=0.05, presenca_eve=None, backend="numpy", eve=None,
+                seed=None, rng=None):
+    """
+    Gera a chave BB84 em blocos de tamanho fixo, com memória constante
+
+    Cada bloco de qubits é simulado com `bb84_protocolo` e descartado assim
+    que sua chave peneirada é entregue; apenas os contadores acumulados
+    sobrevivem entre blocos. O resultado completo do bloco também é
+    entregue, em 'bloco', para quem quiser guardar bits e bases (ver
+    `ResultadoBB84.concatenar`).
+
+    Args:
+        n_bits (int | None): Total de qubits a transmitir; None gera blocos indefinidamente
+        chunk_size (int): Número de qubits por bloco
+        erro_canal (float): Taxa de erro do canal quântico
+        presenca_eve (bool | None): Se True, simula a presença de um espião;
+            None segue `eve` (ver `bb84_protocolo`)
+        backend (str): Backend usado em cada bloco (ver `BACKENDS`)
+        eve (callable | None): Modelo de ataque do módulo `eve`
+        seed (int | np.random.SeedSequence | None): Semente da sessão inteira
+        rng (np.random.Generator | None): Gerador a usar no lugar de `seed`
+
+    Yields:
+        dict: Chave peneirada do bloco e estatísticas acumuladas da sessão
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size deve ser positivo")
+
+    rng = gerador(rng, seed)
+    qubits_processados = 0
+    tamanho_chave_total = 0
+    erros_total = 0
+
+    while n_bits is None or qubits_processados < n_bits:
+        tamanho_bloco = chunk_size if n_bits is None else min(chunk_size, n_bits - qubits_processados)
+        bloco = bb84_protocolo(n_bits=tamanho_bloco, erro_canal=erro_canal,
+                               presenca_eve=presenca_eve, backend=backend, eve=eve, objeto=True, rng=rng)
+
+        qubits_processados += tamanho_bloco
+        tamanho_chave_total += bloco.tamanho_chave
+        erros_total += bloco.erros
+
+        yield {
+            'alice_chave': bloco.alice_chave,
+            'bob_chave': bloco.bob_chave,
+            'taxa_erro_bloco': bloco.taxa_erro,
+            'bloco': bloco,
+            'qubits_processados': qubits_processados,
+            'tamanho_chave_total': tamanho_chave_total,
+            'erros_total': erros_total,
+            'taxa_erro': erros_total / tamanho_chave_total if tamanho_chave_total > 0 else 0
+        }
+
+
+def _formatar_texto(tabela):
+    """
+    Formata as linhas de uma varredura como no exemplo original do módulo
+
+    Args:
+        tabela (list): Linhas devolvidas por `varredura.varrer_parametros`
+
+    Returns:
+        str: Uma linha de texto por ponto da grade
+    """
+    linhas = []
+    for linha in tabela:
+        texto = (f"{'Com' if linha['presenca_eve'] else 'Sem'} espião "
+                 f"(n_bits={linha['n_bits']}, erro_canal={linha['erro_canal']}): "
+                 f"Taxa de erro: {linha['taxa_erro_media']:.4f}, "
+                 f"Tamanho da chave: {linha['tamanho_chave_media']:.0f}")
+        if linha['repeticoes'] > 1:
+            texto += (f" (IC 95% da taxa de erro: [{linha['taxa_erro_ic_inf']:.4f}, "
+                      f"{linha['taxa_erro_ic_sup']:.4f}], {linha['repeticoes']} repetições)")
+        linhas.append(texto)
+    return '\n'.join(linhas) + '\n'
+
+
+def executar_cli(argv=None):
+    """
+    Ponto de entrada da linha de comando: executa uma varredura e imprime ou grava o resultado
+
+    Sem argumentos, reproduz os exemplos de 1000 qubits com e sem espião no
+    backend 'aer'.
+
+    Args:
+        argv (list | None): Argumentos da linha de comando (None usa sys.argv)
+
+    Returns:
+        list: Linhas da varredura
+    """
+    import argparse
+    import csv
+    import io
+    import json
+    import sys
+
+    # Importado aqui porque `varredura` importa este módulo
+    from varredura import varrer_parametros
+
+    parser = argparse.ArgumentParser(description="Simulação do protocolo BB84 em lote")
+    parser.add_argument('--n-bits', type=int, nargs='+', default=[1000],
+                        help="Número(s) de qubits transmitidos")
+    parser.add_argument('--erro-canal', type=float, nargs='+', default=[0.05],
+                        help="Taxa(s) de erro do canal quântico")
+    parser.add_argument('--eve', choices=['sem', 'com', 'ambos'], default='ambos',
+                        help="Simula sem espião, com espião ou os dois casos")
+    parser.add_argument('--repeticoes', type=int, default=1, help="Repetições por ponto da grade")
+    parser.add_argument('--backend', choices=list(BACKENDS), default='aer', help="Backend de simulação")
+    parser.add_argument('--seed', type=int, default=None, help="Semente raiz da varredura")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Número de processos (padrão: todos os núcleos)")
+    parser.add_argument('--formato', choices=['texto', 'json', 'csv'], default='texto', help="Formato da saída")
+    parser.add_argument('--saida', default=None, help="Arquivo de saída (padrão: saída padrão)")
+    args = parser.parse_args(argv)
+
+    presenca_eve = {'sem': (False,), 'com': (True,), 'ambos': (False, True)}[args.eve]
+    tabela = varrer_parametros(n_bits=args.n_bits, erro_canal=args.erro_canal, presenca_eve=presenca_eve,
+                               repeticoes=args.repeticoes, backend=args.backend, seed=args.seed,
+                               max_workers=args.workers)
+
+    if args.formato == 'json':
+        texto = json.dumps(tabela, indent=2) + '\n'
+    elif args.formato == 'csv':
+        buffer = io.StringIO()
+        escritor = csv.DictWriter(buffer, fieldnames=list(tabela[0]) if tabela else [])
+        escritor.writeheader()
+        escritor.writerows(tabela)
+        texto = buffer.getvalue()
+    else:
+        texto = _formatar_texto(tabela)
+
+    if args.saida:
+        with open(args.saida, 'w', newline='') as arquivo:
+            arquivo.write(texto)
+    else:
+        sys.stdout.write(texto)
+    return tabela
+
+
+if __name__ == '__main__':
+    executar_cli()
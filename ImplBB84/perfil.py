@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# Perfilador que recebe as etapas registradas no contexto atual
+_perfilador_ativo = ContextVar('perfilador_ativo', default=None)
+
+# tracemalloc.reset_peak só existe a partir do Python 3.9; sem ele o pico de
+# cada etapa é o maior pico desde o início do rastreamento (um limite superior)
+_ZERA_PICO = hasattr(tracemalloc, 'reset_peak')
+
+
+class Perfilador:
+    """
+    Registra tempo de parede, número de chamadas e pico de memória por etapa
+
+    Enquanto o perfilador está ativo (`with perfilador:`), cada bloco
+    `with etapa(nome):` executado no mesmo contexto é cronometrado com
+    `perf_counter_ns` e, se `memoria` for True, tem seu pico de alocação
+    medido com `tracemalloc`. Etapas podem ser aninhadas; o tempo e o pico de
+    uma etapa incluem os das etapas internas. No Python 3.8, sem
+    `tracemalloc.reset_peak`, o pico de uma etapa pode incluir alocações
+    anteriores a ela.
+
+    Args:
+        memoria (bool): Se True, mede o pico de alocação de cada etapa
+    """
+
+    def __init__(self, memoria=True):
+        self.memoria = memoria
+        self.eventos = []
+        self._inicio_ns = time.perf_counter_ns()
+        self._pilha = []
+        self._tokens = []
+        self._iniciou_tracemalloc = False
+
+    def __enter__(self):
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+        self._tokens.append(_perfilador_ativo.set(self))
+        return self
+
+    def __exit__(self, *exc):
+        _perfilador_ativo.reset(self._tokens.pop())
+        if self._iniciou_tracemalloc and not self._tokens:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+        return False
+
+    @contextmanager
+    def etapa(self, nome):
+        """
+        Cronometra um bloco de código como uma etapa do protocolo
+
+        Args:
+            nome (str): Nome da etapa
+        """
+        medir_memoria = self.memoria and tracemalloc.is_tracing()
+        if medir_memoria:
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+            if _ZERA_PICO:
+                tracemalloc.reset_peak()
+        # [memória no início, maior pico absoluto das etapas internas]
+        quadro = [memoria_inicial if medir_memoria else 0, 0]
+        self._pilha.append(quadro)
+        inicio = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            fim = time.perf_counter_ns()
+            self._pilha.pop()
+            pico = 0
+            if medir_memoria:
+                # reset_peak das etapas internas apaga o pico anterior a elas
+                pico_absoluto = max(tracemalloc.get_traced_memory()[1], quadro[1])
+                pico = pico_absoluto - quadro[0]
+                if self._pilha:
+                    self._pilha[-1][1] = max(self._pilha[-1][1], pico_absoluto)
+            self.eventos.append((nome, inicio, fim - inicio, pico, threading.get_ident()))
+
+    def resumo(self):
+        """
+        Agrega os eventos registrados por etapa
+
+        Returns:
+            dict: Para cada etapa, número de chamadas, tempo total em
+                nanossegundos e maior pico de alocação em bytes
+        """
+        resumo = {}
+        for nome, _, duracao, pico, _ in self.eventos:
+            entrada = resumo.setdefault(nome, {'chamadas': 0, 'tempo_ns': 0, 'pico_memoria': 0})
+            entrada['chamadas'] += 1
+            entrada['tempo_ns'] += duracao
+            entrada['pico_memoria'] = max(entrada['pico_memoria'], pico)
+        return resumo
+
+    def chrome_trace(self):
+        """
+        Converte os eventos para o formato Trace Event do Chrome
+
+        O resultado pode ser aberto em chrome://tracing ou no Perfetto.
+
+        Returns:
+            dict: Documento com a lista `traceEvents` (tempos em microssegundos)
+        """
+        pid = os.getpid()
+        return {
+            'traceEvents': [
+                {
+                    'name': nome,
+                    'ph': 'X',
+                    'ts': (inicio - self._inicio_ns) / 1000,
+                    'dur': duracao / 1000,
+                    'pid': pid,
+                    'tid': tid,
+                    'args': {'pico_memoria': pico}
+                }
+                for nome, inicio, duracao, pico, tid in self.eventos
+            ],
+            'displayTimeUnit': 'ms'
+        }
+
+    def salvar_trace(self, caminho):
+        """
+        Grava os eventos em um arquivo JSON no formato Trace Event do Chrome
+
+        Args:
+            caminho (str): Caminho do arquivo de saída
+        """
+        with open(caminho, 'w') as arquivo:
+            json.dump(self.chrome_trace(), arquivo)
+
+
+def etapa(nome):
+    """
+    Cronometra um bloco no perfilador ativo, se houver algum
+
+    Sem perfilador ativo o custo é o de um `nullcontext`, o que permite
+    deixar as etapas permanentemente marcadas no código do protocolo.
+
+    Args:
+        nome (str): Nome da etapa
+
+    Returns:
+        contextmanager: Gerenciador de contexto da etapa
+    """
+    perfilador = _perfilador_ativo.get()
+    return nullcontext() if perfilador is None else perfilador.etapa(nome)
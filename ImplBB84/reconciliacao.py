@@ -0,0 +1,355 @@
+import time
+
+import numpy as np
+
+
+def entropia_binaria(p):
+    """
+    Calcula a entropia binária h(p) em bits
+
+    Args:
+        p (float | np.ndarray): Probabilidade
+
+    Returns:
+        float | np.ndarray: h(p), com h(0) = h(1) = 0
+    """
+    p = np.asarray(p, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        h = -p * np.log2(p) - (1 - p) * np.log2(1 - p)
+    return np.where((p <= 0) | (p >= 1), 0.0, h)
+
+
+def _prefixo_paridade(bits):
+    """
+    Calcula as paridades acumuladas de um vetor de bits
+
+    A paridade de qualquer intervalo [i, j) é `prefixo[j] ^ prefixo[i]`, o que
+    permite obter as paridades de milhares de blocos com uma única indexação.
+
+    Args:
+        bits (np.ndarray): Vetor uint8 de bits
+
+    Returns:
+        np.ndarray: Vetor de tamanho len(bits) + 1 com prefixo[0] = 0
+    """
+    prefixo = np.zeros(len(bits) + 1, dtype=np.uint8)
+    np.bitwise_xor.accumulate(bits, out=prefixo[1:])
+    return prefixo
+
+
+def cascade(alice_chave, bob_chave, taxa_erro, passos=4, seed=None):
+    """
+    Reconcilia as chaves peneiradas com o protocolo Cascade
+
+    Em cada passo as chaves são embaralhadas com uma permutação pública e
+    divididas em blocos (o tamanho dobra a cada passo). Todas as paridades de
+    blocos e todas as buscas binárias de um passo são feitas em lote: cada
+    nível da busca binária é uma única troca de mensagens no canal clássico.
+    Depois de cada correção, os passos anteriores são reverificados até que
+    nenhum bloco tenha paridade divergente.
+
+    Args:
+        alice_chave (np.ndarray): Chave peneirada de Alice
+        bob_chave (np.ndarray): Chave peneirada de Bob
+        taxa_erro (float): Taxa de erro estimada, usada para o tamanho do primeiro bloco
+        passos (int): Número de passos do Cascade
+        seed (int | None): Semente das permutações públicas
+
+    Returns:
+        dict: Chave corrigida de Bob e estatísticas da reconciliação
+    """
+    alice = np.asarray(alice_chave, dtype=np.uint8)
+    bob = np.asarray(bob_chave, dtype=np.uint8).copy()
+    n = len(alice)
+    rng = np.random.default_rng(seed)
+
+    erros_iniciais = int(np.sum(alice != bob))
+    limite_shannon = n * float(entropia_binaria(taxa_erro))
+
+    # Tamanho inicial de bloco sugerido por Brassard e Salvail: ~0.73 / QBER
+    q = max(taxa_erro, 1.0 / max(n, 1))
+    tamanho_inicial = max(1, int(np.ceil(0.73 / q)))
+
+    permutacoes = []
+    prefixos_alice = []
+    blocos = []
+    bits_vazados = 0
+    rodadas = 0
+
+    def corrigir_passo(j):
+        """Localiza e corrige, em lote, um erro em cada bloco divergente do passo j."""
+        nonlocal bits_vazados, rodadas
+        permutacao = permutacoes[j]
+        prefixo_alice = prefixos_alice[j]
+        inicios, fins = blocos[j]
+
+        prefixo_bob = _prefixo_paridade(bob[permutacao])
+        divergentes = (prefixo_alice[fins] ^ prefixo_alice[inicios]) != (prefixo_bob[fins] ^ prefixo_bob[inicios])
+        inicio, fim = inicios[divergentes], fins[divergentes]
+
+        # Busca binária simultânea em todos os blocos divergentes
+        while np.any(fim - inicio > 1):
+            ativos = fim - inicio > 1
+            meio = (inicio + fim) // 2
+            esquerda = (prefixo_alice[meio] ^ prefixo_alice[inicio]) != (prefixo_bob[meio] ^ prefixo_bob[inicio])
+            fim = np.where(ativos & esquerda, meio, fim)
+            inicio = np.where(ativos & ~esquerda, meio, inicio)
+            bits_vazados += int(np.sum(ativos))
+            rodadas += 1
+
+        bob[permutacao[inicio]] ^= 1
+        return len(inicio)
+
+    for i in range(passos):
+        permutacao = rng.permutation(n)
+        tamanho_bloco = min(tamanho_inicial * 2 ** i, max(n, 1))
+        inicios = np.arange(0, n, tamanho_bloco)
+        fins = np.minimum(inicios + tamanho_bloco, n)
+
+        permutacoes.append(permutacao)
+        prefixos_alice.append(_prefixo_paridade(alice[permutacao]))
+        blocos.append((inicios, fins))
+
+        # Alice anuncia as paridades de todos os blocos do passo de uma vez
+        bits_vazados += len(inicios)
+        rodadas += 1
+
+        # Cada correção pode revelar blocos divergentes em passos anteriores
+        corrigidos = corrigir_passo(i)
+        while corrigidos and i > 0:
+            corrigidos = sum(corrigir_passo(j) for j in range(i + 1))
+
+    return {
+        'chave_corrigida': bob,
+        'erros_iniciais': erros_iniciais,
+        'erros_restantes': int(np.sum(alice != bob)),
+        'bits_vazados': bits_vazados,
+        'limite_shannon': limite_shannon,
+        'eficiencia': bits_vazados / limite_shannon if limite_shannon > 0 else float('inf'),
+        'rodadas': rodadas
+    }
+
+
+# Taxas de código LDPC disponíveis e a maior QBER que cada uma corrige com
+# quadros de 4096 bits (taxa de falha de quadro <= 5% com `decodificar_min_sum`;
+# medida em 1000 quadros, nenhum limiar passa de 2%)
+LIMIARES_LDPC = (
+    (0.9, 0.003),
+    (0.85, 0.008),
+    (0.8, 0.014),
+    (0.75, 0.020),
+    (0.7, 0.026),
+    (0.65, 0.036),
+    (0.6, 0.046),
+    (0.5, 0.068),
+    (0.4, 0.098),
+    (0.3, 0.128),
+)
+
+# Matrizes de verificação já construídas, indexadas por (n, m, grau_coluna, seed)
+_matrizes_ldpc = {}
+
+
+def escolher_taxa_ldpc(taxa_erro, margem=1.0):
+    """
+    Escolhe a maior taxa de código capaz de corrigir a taxa de erro medida
+
+    Args:
+        taxa_erro (float): Taxa de erro medida na chave peneirada
+        margem (float): Fator de segurança aplicado à taxa de erro
+
+    Returns:
+        float: Taxa de código escolhida em `LIMIARES_LDPC`
+    """
+    for taxa, limiar in LIMIARES_LDPC:
+        if taxa_erro * margem <= limiar:
+            return taxa
+    return LIMIARES_LDPC[-1][0]
+
+
+def matriz_ldpc(n, m, grau_coluna=3, seed=0):
+    """
+    Constrói (ou recupera do cache) uma matriz de verificação LDPC esparsa
+
+    A matriz é gerada pelo modelo de configuração: cada coluna recebe
+    `grau_coluna` conexões e as linhas recebem graus o mais uniformes
+    possível. Conexões repetidas são descartadas.
+
+    Args:
+        n (int): Número de colunas (tamanho do quadro)
+        m (int): Número de linhas (tamanho da síndrome)
+        grau_coluna (int): Número de uns por coluna
+        seed (int): Semente pública do código
+
+    Returns:
+        tuple: (linhas, colunas) das arestas, ordenadas por linha
+    """
+    chave = (n, m, grau_coluna, seed)
+    if chave not in _matrizes_ldpc:
+        rng = np.random.default_rng(seed)
+        colunas = np.repeat(np.arange(n), grau_coluna)
+        linhas = rng.permutation(np.arange(n * grau_coluna) % m)
+        arestas = np.unique(linhas.astype(np.int64) * n + colunas)
+        _matrizes_ldpc[chave] = (arestas // n, arestas % n)
+    return _matrizes_ldpc[chave]
+
+
+def _inicios_segmentos(indices):
+    """
+    Retorna as posições em que um vetor ordenado muda de valor
+
+    Args:
+        indices (np.ndarray): Vetor ordenado
+
+    Returns:
+        np.ndarray: Início de cada segmento, adequado para `np.ufunc.reduceat`
+    """
+    return np.flatnonzero(np.r_[True, indices[1:] != indices[:-1]])
+
+
+def _sindromes(quadros, linhas, colunas, inicios_linhas):
+    """
+    Calcula a síndrome H·x (mod 2) de vários quadros de uma vez
+
+    Args:
+        quadros (np.ndarray): Matriz (quadros, n) de bits
+        linhas (np.ndarray): Linha de cada aresta
+        colunas (np.ndarray): Coluna de cada aresta
+        inicios_linhas (np.ndarray): Início das arestas de cada linha
+
+    Returns:
+        np.ndarray: Matriz (quadros, m) de bits de síndrome
+    """
+    return np.add.reduceat(quadros[:, colunas], inicios_linhas, axis=1, dtype=np.int32) & 1
+
+
+def decodificar_min_sum(llr_canal, sindromes, linhas, colunas, max_iter=50, fator=0.8):
+    """
+    Decodifica vários quadros com belief propagation min-sum normalizado
+
+    Todas as mensagens ficam em matrizes (quadros, arestas); as atualizações
+    dos nós de verificação e dos nós de variável são reduções segmentadas
+    (`reduceat`) sobre as arestas ordenadas por linha e por coluna.
+
+    Args:
+        llr_canal (np.ndarray): Matriz (quadros, n) de razões de verossimilhança a priori
+        sindromes (np.ndarray): Matriz (quadros, m) com as síndromes de Alice
+        linhas (np.ndarray): Linha de cada aresta, em ordem crescente
+        colunas (np.ndarray): Coluna de cada aresta
+        max_iter (int): Número máximo de iterações
+        fator (float): Fator de normalização do min-sum
+
+    Returns:
+        tuple: (bits decodificados, máscara de quadros convergidos, iterações executadas)
+    """
+    n_quadros = llr_canal.shape[0]
+    inicios_linhas = _inicios_segmentos(linhas)
+    ordem_colunas = np.argsort(colunas, kind='stable')
+    inicios_colunas = _inicios_segmentos(colunas[ordem_colunas])
+
+    decodificados = (llr_canal < 0).astype(np.uint8)
+    convergidos = np.zeros(n_quadros, dtype=bool)
+    ativos = np.arange(n_quadros)
+
+    # Sinal extra de cada aresta imposto pela síndrome da sua linha
+    sinal_sindrome = sindromes[:, linhas].astype(bool)
+    v2c = llr_canal[:, colunas]
+
+    iteracao = 0
+    for iteracao in range(1, max_iter + 1):
+        # Nós de verificação: sinal é o produto dos demais sinais; módulo é o menor dos demais
+        modulo = np.abs(v2c)
+        negativo = v2c < 0
+        paridade = np.add.reduceat(negativo, inicios_linhas, axis=1, dtype=np.int32) & 1
+        sinal = (paridade[:, linhas] ^ negativo ^ sinal_sindrome[ativos]).astype(bool)
+
+        min1 = np.minimum.reduceat(modulo, inicios_linhas, axis=1)
+        eh_min1 = modulo == min1[:, linhas]
+        min2 = np.minimum.reduceat(np.where(eh_min1, np.inf, modulo), inicios_linhas, axis=1)
+        # Empates no mínimo fazem o segundo menor ser igual ao primeiro
+        empates = np.add.reduceat(eh_min1, inicios_linhas, axis=1, dtype=np.int32) > 1
+        min2 = np.where(empates, min1, min2)
+
+        c2v = fator * np.where(eh_min1, min2[:, linhas], min1[:, linhas])
+        c2v = np.where(sinal, -c2v, c2v)
+
+        # Nós de variável: soma do canal com todas as mensagens recebidas
+        total = llr_canal[ativos] + np.add.reduceat(c2v[:, ordem_colunas], inicios_colunas, axis=1)
+        v2c = total[:, colunas] - c2v
+
+        palpite = (total < 0).astype(np.uint8)
+        ok = np.all(_sindromes(palpite, linhas, colunas, inicios_linhas) == sindromes[ativos], axis=1)
+
+        decodificados[ativos] = palpite
+        convergidos[ativos[ok]] = True
+
+        # Quadros que já satisfazem a síndrome saem do lote
+        ativos = ativos[~ok]
+        v2c = v2c[~ok]
+        if len(ativos) == 0:
+            break
+
+    return decodificados, convergidos, iteracao
+
+
+def ldpc_reconciliacao(alice_chave, bob_chave, taxa_erro, tamanho_quadro=4096,
+                       margem=1.0, max_iter=50, seed=0):
+    """
+    Reconcilia as chaves peneiradas com códigos LDPC em um único sentido
+
+    Alice envia a síndrome de cada quadro (única mensagem no canal clássico)
+    e Bob decodifica todos os quadros simultaneamente. A taxa do código é
+    escolhida a partir da taxa de erro medida; bits que não completam um
+    quadro são descartados.
+
+    Args:
+        alice_chave (np.ndarray): Chave peneirada de Alice
+        bob_chave (np.ndarray): Chave peneirada de Bob
+        taxa_erro (float): Taxa de erro medida na chave peneirada
+        tamanho_quadro (int): Número de bits por quadro LDPC
+        margem (float): Fator de segurança sobre a taxa de erro na escolha do código
+        max_iter (int): Número máximo de iterações do decodificador
+        seed (int): Semente pública do código
+
+    Returns:
+        dict: Quadros corrigidos de Bob e estatísticas da reconciliação
+    """
+    alice = np.asarray(alice_chave, dtype=np.uint8)
+    bob = np.asarray(bob_chave, dtype=np.uint8)
+    n_quadros = len(alice) // tamanho_quadro
+    usados = n_quadros * tamanho_quadro
+
+    taxa_codigo = escolher_taxa_ldpc(taxa_erro, margem)
+    m = int(round((1 - taxa_codigo) * tamanho_quadro))
+    linhas, colunas = matriz_ldpc(tamanho_quadro, m, seed=seed)
+
+    quadros_alice = alice[:usados].reshape(n_quadros, tamanho_quadro)
+    quadros_bob = bob[:usados].reshape(n_quadros, tamanho_quadro)
+
+    # Alice calcula e envia as síndromes de todos os quadros
+    sindromes = _sindromes(quadros_alice, linhas, colunas, _inicios_segmentos(linhas))
+
+    q = min(max(taxa_erro, 1e-6), 0.5 - 1e-6)
+    llr = np.log((1 - q) / q)
+    llr_canal = np.where(quadros_bob == 1, -llr, llr).astype(np.float32)
+
+    inicio = time.perf_counter()
+    decodificados, convergidos, iteracoes = decodificar_min_sum(llr_canal, sindromes, linhas, colunas, max_iter)
+    duracao = time.perf_counter() - inicio
+
+    limite_shannon = usados * float(entropia_binaria(taxa_erro))
+    bits_vazados = n_quadros * m
+
+    return {
+        'chave_corrigida': decodificados.reshape(-1),
+        'quadros_validos': convergidos & np.all(decodificados == quadros_alice, axis=1),
+        'tamanho_quadro': tamanho_quadro,
+        'taxa_codigo': taxa_codigo,
+        'bits_descartados': len(alice) - usados,
+        'bits_vazados': bits_vazados,
+        'limite_shannon': limite_shannon,
+        'eficiencia': bits_vazados / limite_shannon if limite_shannon > 0 else float('inf'),
+        'iteracoes': iteracoes,
+        'quadros_por_segundo': n_quadros / duracao if duracao > 0 else float('inf'),
+        'rodadas': 1
+    }
@@ -0,0 +1,284 @@
+import numpy as np
+
+from empacotamento import contar_erros, desempacotar, empacotar, mascara_peneiramento, popcount
+
+
+class ResumoBB84:
+    """
+    Resumo de uma execução do BB84, sem nenhum array
+
+    Ocupa algumas centenas de bytes qualquer que seja `n_bits`, o que permite
+    guardar milhares de execuções em varreduras e painéis. Aceita acesso no
+    estilo de dicionário (`resumo['taxa_erro']`), como o resultado completo.
+
+    Args:
+        n_bits (int): Qubits transmitidos
+        tamanho_chave (int): Bits da chave peneirada
+        erros (int): Bits divergentes entre as chaves de Alice e Bob
+        taxa_erro (float): Taxa de erro da chave peneirada
+        extras (dict | None): Estatísticas adicionais (Eve, perfil)
+    """
+    __slots__ = ('n_bits', 'tamanho_chave', 'erros', 'taxa_erro', 'extras')
+
+    def __init__(self, n_bits, tamanho_chave, erros, taxa_erro, extras=None):
+        self.n_bits = n_bits
+        self.tamanho_chave = tamanho_chave
+        self.erros = erros
+        self.taxa_erro = taxa_erro
+        self.extras = extras if extras is not None else {}
+
+    def __eq__(self, outro):
+        if not isinstance(outro, ResumoBB84):
+            return NotImplemented
+        return all(getattr(self, campo) == getattr(outro, campo) for campo in self.__slots__)
+
+    def __repr__(self):
+        return (f"ResumoBB84(n_bits={self.n_bits}, tamanho_chave={self.tamanho_chave}, erros={self.erros}, "
+                f"taxa_erro={self.taxa_erro:.4f})")
+
+    def __getitem__(self, chave):
+        if chave in ('n_bits', 'tamanho_chave', 'erros', 'taxa_erro'):
+            return getattr(self, chave)
+        return self.extras[chave]
+
+    def get(self, chave, padrao=None):
+        try:
+            return self[chave]
+        except KeyError:
+            return padrao
+
+
+class ResultadoBB84:
+    """
+    Resultado completo do BB84 com campos derivados calculados sob demanda
+
+    Guarda apenas bits e bases de Alice, bases de Bob e suas medições, em
+    uint8; a máscara de peneiramento, as chaves e a taxa de erro são
+    calculadas no primeiro acesso e memorizadas. Aceita acesso no estilo de
+    dicionário com as mesmas chaves do resultado de `bb84_protocolo`, além de
+    'alice_bases', 'bob_bases' e 'mesma_base'.
+
+    Args:
+        alice_bits (np.ndarray): Bits de Alice
+        alice_bases (np.ndarray): Bases de Alice
+        bob_bases (np.ndarray): Bases de Bob
+        bob_resultados (np.ndarray): Medições de Bob
+        extras (dict | None): Estatísticas adicionais (Eve, perfil)
+    """
+    __slots__ = ('alice_bits', 'alice_bases', 'bob_bases', 'bob_resultados', 'extras',
+                 '_mesma_base', '_alice_chave', '_bob_chave', '_erros')
+
+    CHAVES = ('alice_bits', 'bob_resultados', 'alice_chave', 'bob_chave', 'taxa_erro', 'tamanho_chave',
+              'alice_bases', 'bob_bases', 'mesma_base')
+
+    def __init__(self, alice_bits, alice_bases, bob_bases, bob_resultados, extras=None):
+        self.alice_bits = np.asarray(alice_bits, dtype=np.uint8)
+        self.alice_bases = np.asarray(alice_bases, dtype=np.uint8)
+        self.bob_bases = np.asarray(bob_bases, dtype=np.uint8)
+        self.bob_resultados = np.asarray(bob_resultados, dtype=np.uint8)
+        self.extras = extras if extras is not None else {}
+        self._mesma_base = None
+        self._alice_chave = None
+        self._bob_chave = None
+        self._erros = None
+
+    @property
+    def n_bits(self):
+        return len(self.alice_bits)
+
+    @property
+    def mesma_base(self):
+        if self._mesma_base is None:
+            self._mesma_base = self.alice_bases == self.bob_bases
+        return self._mesma_base
+
+    @property
+    def alice_chave(self):
+        if self._alice_chave is None:
+            self._alice_chave = self.alice_bits[self.mesma_base]
+        return self._alice_chave
+
+    @property
+    def bob_chave(self):
+        if self._bob_chave is None:
+            self._bob_chave = self.bob_resultados[self.mesma_base]
+        return self._bob_chave
+
+    @property
+    def tamanho_chave(self):
+        return int(np.count_nonzero(self.mesma_base))
+
+    @property
+    def erros(self):
+        if self._erros is None:
+            # Conta os erros sem materializar as chaves
+            self._erros = int(np.count_nonzero((self.alice_bits != self.bob_resultados) & self.mesma_base))
+        return self._erros
+
+    @property
+    def taxa_erro(self):
+        tamanho_chave = self.tamanho_chave
+        return self.erros / tamanho_chave if tamanho_chave > 0 else 0
+
+    @classmethod
+    def concatenar(cls, blocos):
+        """
+        Junta os resultados de blocos consecutivos (como os de `bb84_stream`) em um só
+
+        Estatísticas numéricas em `extras` (como as de Eve, que são frações da
+        chave peneirada) são combinadas pela média ponderada pelo tamanho da
+        chave de cada bloco; as demais são descartadas.
+
+        Args:
+            blocos (iterable): Resultados `ResultadoBB84` de cada bloco, em ordem
+
+        Returns:
+            ResultadoBB84: Resultado equivalente ao da execução inteira
+        """
+        blocos = list(blocos)
+        if not blocos:
+            return cls([], [], [], [])
+
+        pesos = np.array([bloco.tamanho_chave for bloco in blocos], dtype=float)
+        extras = {}
+        for chave, valor in blocos[0].extras.items():
+            if isinstance(valor, (int, float, np.number)) and pesos.sum() > 0:
+                extras[chave] = float(np.dot([bloco.extras[chave] for bloco in blocos], pesos) / pesos.sum())
+
+        return cls(np.concatenate([bloco.alice_bits for bloco in blocos]),
+                   np.concatenate([bloco.alice_bases for bloco in blocos]),
+                   np.concatenate([bloco.bob_bases for bloco in blocos]),
+                   np.concatenate([bloco.bob_resultados for bloco in blocos]),
+                   extras)
+
+    def empacotar(self):
+        """
+        Converte para a forma empacotada, com 8 bits por byte
+
+        Returns:
+            ResultadoEmpacotado: Resultado equivalente, cerca de 10 vezes menor
+        """
+        return ResultadoEmpacotado(self.n_bits, empacotar(self.alice_bits), empacotar(self.alice_bases),
+                                   empacotar(self.bob_bases), empacotar(self.bob_resultados), dict(self.extras))
+
+    def resumo(self):
+        """
+        Descarta os arrays, mantendo só as contagens
+
+        Returns:
+            ResumoBB84: Resumo da execução
+        """
+        return ResumoBB84(self.n_bits, self.tamanho_chave, self.erros, self.taxa_erro, dict(self.extras))
+
+    def como_dict(self):
+        """
+        Converte para o dicionário devolvido por `bb84_protocolo`
+
+        Returns:
+            dict: Resultado no formato original
+        """
+        return {chave: self[chave] for chave in self.keys()}
+
+    def keys(self):
+        return list(self.CHAVES) + list(self.extras)
+
+    def __getitem__(self, chave):
+        if chave in self.CHAVES:
+            return getattr(self, chave)
+        return self.extras[chave]
+
+    def __contains__(self, chave):
+        return chave in self.CHAVES or chave in self.extras
+
+    def get(self, chave, padrao=None):
+        try:
+            return self[chave]
+        except KeyError:
+            return padrao
+
+    def __repr__(self):
+        return f"ResultadoBB84(n_bits={self.n_bits}, tamanho_chave={self.tamanho_chave}, taxa_erro={self.taxa_erro:.4f})"
+
+
+class ResultadoEmpacotado(ResultadoBB84):
+    """
+    Resultado completo do BB84 guardado com bits e bases empacotados
+
+    Para guardar execuções grandes por muito tempo (como no cache da
+    interface): ocupa um oitavo dos arrays de `ResultadoBB84`, sem as
+    máscaras e chaves memorizadas. Tamanho da chave e erros são contados
+    sobre as máscaras empacotadas e memorizados; bits, bases, máscara e
+    chaves são desempacotados a cada acesso, então quem os usa várias vezes
+    deve guardar o array devolvido.
+
+    Args:
+        n_bits (int): Qubits transmitidos
+        alice_bits (np.ndarray): Bits de Alice empacotados
+        alice_bases (np.ndarray): Bases de Alice empacotadas
+        bob_bases (np.ndarray): Bases de Bob empacotadas
+        bob_resultados (np.ndarray): Medições de Bob empacotadas
+        extras (dict | None): Estatísticas adicionais (Eve, perfil)
+    """
+    __slots__ = ('_n_bits', '_pacotes', '_mascara', '_tamanho_chave')
+
+    def __init__(self, n_bits, alice_bits, alice_bases, bob_bases, bob_resultados, extras=None):
+        self._n_bits = n_bits
+        self._pacotes = {'alice_bits': alice_bits, 'alice_bases': alice_bases,
+                         'bob_bases': bob_bases, 'bob_resultados': bob_resultados}
+        self._mascara = mascara_peneiramento(alice_bases, bob_bases, n_bits)
+        self._tamanho_chave = popcount(self._mascara)
+        self._erros = contar_erros(alice_bits, bob_resultados, self._mascara)
+        self.extras = extras if extras is not None else {}
+
+    @property
+    def n_bits(self):
+        return self._n_bits
+
+    @property
+    def alice_bits(self):
+        return desempacotar(self._pacotes['alice_bits'], self._n_bits)
+
+    @property
+    def alice_bases(self):
+        return desempacotar(self._pacotes['alice_bases'], self._n_bits)
+
+    @property
+    def bob_bases(self):
+        return desempacotar(self._pacotes['bob_bases'], self._n_bits)
+
+    @property
+    def bob_resultados(self):
+        return desempacotar(self._pacotes['bob_resultados'], self._n_bits)
+
+    @property
+    def mesma_base(self):
+        return desempacotar(self._mascara, self._n_bits).astype(bool)
+
+    @property
+    def alice_chave(self):
+        return self.alice_bits[self.mesma_base]
+
+    @property
+    def bob_chave(self):
+        return self.bob_resultados[self.mesma_base]
+
+    @property
+    def tamanho_chave(self):
+        return self._tamanho_chave
+
+    @property
+    def erros(self):
+        return self._erros
+
+    def empacotar(self):
+        return self
+
+    def __reduce__(self):
+        # O estado padrão dos slots passaria pelas propriedades e guardaria os arrays desempacotados
+        pacotes = self._pacotes
+        return (ResultadoEmpacotado, (self._n_bits, pacotes['alice_bits'], pacotes['alice_bases'],
+                                      pacotes['bob_bases'], pacotes['bob_resultados'], self.extras))
+
+    def __repr__(self):
+        return (f"ResultadoEmpacotado(n_bits={self.n_bits}, tamanho_chave={self.tamanho_chave}, "
+                f"taxa_erro={self.taxa_erro:.4f})")
@@ -0,0 +1,70 @@
+import numpy as np
+from qiskit_aer.noise import (NoiseModel, ReadoutError, amplitude_damping_error, depolarizing_error,
+                              pauli_error)
+
+# Tipos de ruído de canal disponíveis para `bb84_protocolo(ruido=...)`
+TIPOS_RUIDO = ('bit_flip', 'phase_flip', 'depolarizante', 'amortecimento', 'leitura')
+
+# Ruídos descritos por canais de Pauli, compatíveis com o método 'stabilizer'
+RUIDOS_CLIFFORD = frozenset({'bit_flip', 'phase_flip', 'depolarizante', 'leitura'})
+
+# Portas em que o ruído é definido; o canal é marcado por uma porta `id`
+PORTAS_BASE = ['id', 'x', 'h']
+
+
+def modelo_ruido(tipo, p):
+    """
+    Constrói o NoiseModel do Aer que representa o canal quântico
+
+    O erro de porta é associado à identidade que `_montar_qubit` insere entre
+    a preparação de Alice e a medição de Bob; o erro de leitura vale para
+    todas as medições.
+
+    Args:
+        tipo (str): Um dos `TIPOS_RUIDO`
+        p (float): Probabilidade do erro (ou γ, no amortecimento de amplitude)
+
+    Returns:
+        NoiseModel: Modelo de ruído para o AerSimulator
+    """
+    if tipo not in TIPOS_RUIDO:
+        raise ValueError(f"Ruído desconhecido: {tipo!r}. Opções: {', '.join(TIPOS_RUIDO)}")
+
+    modelo = NoiseModel(basis_gates=PORTAS_BASE)
+    if tipo == 'bit_flip':
+        modelo.add_all_qubit_quantum_error(pauli_error([('X', p), ('I', 1 - p)]), ['id'])
+    elif tipo == 'phase_flip':
+        modelo.add_all_qubit_quantum_error(pauli_error([('Z', p), ('I', 1 - p)]), ['id'])
+    elif tipo == 'depolarizante':
+        modelo.add_all_qubit_quantum_error(depolarizing_error(p, 1), ['id'])
+    elif tipo == 'amortecimento':
+        modelo.add_all_qubit_quantum_error(amplitude_damping_error(p), ['id'])
+    else:
+        modelo.add_all_qubit_readout_error(ReadoutError([[1 - p, p], [p, 1 - p]]))
+    return modelo
+
+
+def qber_ruido(tipo, p):
+    """
+    Calcula a taxa de erro esperada na chave peneirada, sem espião, para cada ruído
+
+    Bit flip afeta só a base computacional e phase flip só a de Hadamard
+    (metade dos bits cada); o canal despolarizante troca o estado por um
+    misto com probabilidade p e erra metade dessas vezes em qualquer base; o
+    amortecimento leva |1⟩ a |0⟩ com probabilidade γ e erra |±⟩ com
+    probabilidade (1 - sqrt(1 - γ))/2; o erro de leitura vale para qualquer base.
+
+    Args:
+        tipo (str): Um dos `TIPOS_RUIDO`
+        p (float): Probabilidade do erro (ou γ, no amortecimento de amplitude)
+
+    Returns:
+        float: Taxa de erro esperada
+    """
+    if tipo in ('bit_flip', 'phase_flip', 'depolarizante'):
+        return p / 2
+    if tipo == 'amortecimento':
+        return float(p / 4 + (1 - np.sqrt(1 - p)) / 4)
+    if tipo == 'leitura':
+        return p
+    raise ValueError(f"Ruído desconhecido: {tipo!r}. Opções: {', '.join(TIPOS_RUIDO)}")
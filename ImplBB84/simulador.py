@@ -0,0 +1,164 @@
+import threading
+from collections import OrderedDict
+
+from qiskit import transpile
+from qiskit_aer import AerSimulator
+
+from perfil import etapa
+from ruido import RUIDOS_CLIFFORD, modelo_ruido
+
+# Instruções que mantêm o circuito no grupo de Clifford (simuláveis por tableau)
+INSTRUCOES_CLIFFORD = frozenset({
+    'id', 'x', 'y', 'z', 'h', 's', 'sdg', 'sx', 'sxdg', 'cx', 'cy', 'cz', 'swap',
+    'measure', 'reset', 'barrier'
+})
+
+# Até esta largura, circuitos com ruído usam matriz densidade: o ruído entra
+# em ρ e os shots são amostrados sem repetir a simulação a cada shot
+LARGURA_MAXIMA_MATRIZ_DENSIDADE = 10
+
+# Instruções de controle que o Aer executa sem constarem das portas base
+INSTRUCOES_NATIVAS = frozenset({'measure', 'barrier', 'reset'})
+
+# Número máximo de circuitos compilados mantidos em memória
+MAX_CIRCUITOS_COMPILADOS = 4096
+
+# Estado compartilhado pelo processo inteiro; como o módulo é importado uma
+# única vez, ele sobrevive entre chamadas e entre reexecuções do Streamlit
+_simuladores = {}
+_circuitos_compilados = OrderedDict()
+_estatisticas_cache = {'acertos': 0, 'falhas': 0}
+_trava = threading.Lock()
+
+
+def simulador_compartilhado(metodo="automatic", ruido=None):
+    """
+    Retorna a instância única do AerSimulator para um método de simulação
+
+    Args:
+        metodo (str): Método do AerSimulator ('stabilizer', 'automatic', ...)
+        ruido (tuple | None): (tipo, p) do NoiseModel do canal (ver `ruido`)
+
+    Returns:
+        AerSimulator: Simulador reutilizado por todas as chamadas do processo
+    """
+    with _trava:
+        if (metodo, ruido) not in _simuladores:
+            modelo = modelo_ruido(*ruido) if ruido is not None else None
+            _simuladores[metodo, ruido] = AerSimulator(method=metodo, noise_model=modelo)
+        return _simuladores[metodo, ruido]
+
+
+def metodo_simulacao(circuitos, ruido=None):
+    """
+    Escolhe 'stabilizer' quando todos os circuitos são de Clifford
+
+    Circuitos com apenas X, H e medições (como os do BB84) são simulados
+    pelo formalismo de tableau em tempo polinomial; qualquer outra
+    instrução devolve 'automatic' e o Aer escolhe o método. Com ruído,
+    circuitos estreitos usam 'density_matrix'; nos largos, ruídos de Pauli
+    seguem no tableau e os demais usam 'matrix_product_state', que trata
+    qubits não emaranhados em memória linear.
+
+    Args:
+        circuitos (QuantumCircuit | list): Circuito ou lista de circuitos
+        ruido (tuple | None): (tipo, p) do NoiseModel do canal
+
+    Returns:
+        str: Método do AerSimulator
+    """
+    if not isinstance(circuitos, (list, tuple)):
+        circuitos = [circuitos]
+    if ruido is not None:
+        if max(qc.num_qubits for qc in circuitos) <= LARGURA_MAXIMA_MATRIZ_DENSIDADE:
+            return 'density_matrix'
+        if ruido[0] not in RUIDOS_CLIFFORD:
+            return 'matrix_product_state'
+    for qc in circuitos:
+        if any(instrucao.operation.name not in INSTRUCOES_CLIFFORD for instrucao in qc.data):
+            return 'automatic'
+    return 'stabilizer'
+
+
+def sequencia_portas(qc):
+    """
+    Descreve um circuito pela sequência de instruções, usada como chave do cache
+
+    Args:
+        qc (QuantumCircuit): Circuito a descrever
+
+    Returns:
+        tuple: (qubits, bits clássicos, instruções com seus índices e parâmetros)
+    """
+    return (qc.num_qubits, qc.num_clbits, tuple(
+        (instrucao.operation.name,
+         tuple(qc.find_bit(q).index for q in instrucao.qubits),
+         tuple(qc.find_bit(c).index for c in instrucao.clbits),
+         tuple(instrucao.operation.params))
+        for instrucao in qc.data
+    ))
+
+
+def compilar(qc, ruido=None):
+    """
+    Transpila um circuito para o simulador adequado, reaproveitando compilações
+
+    O cache é indexado pela sequência de portas e vale para o processo
+    inteiro: preparações idênticas, na mesma chamada ou em chamadas
+    diferentes, são transpiladas uma única vez. As entradas menos usadas
+    são descartadas acima de `MAX_CIRCUITOS_COMPILADOS`. Circuitos feitos
+    só de portas base do simulador (como os do BB84) dispensam a
+    transpilação, que contra o alvo de milhares de qubits do Aer custa
+    quase um segundo por circuito. Com ruído, a transpilação não otimiza o
+    circuito, para preservar a porta `id` que marca o canal.
+
+    Args:
+        qc (QuantumCircuit): Circuito a executar
+        ruido (tuple | None): (tipo, p) do NoiseModel do canal
+
+    Returns:
+        tuple: (simulador compartilhado, circuito transpilado)
+    """
+    chave = (sequencia_portas(qc), ruido)
+    with _trava:
+        if chave in _circuitos_compilados:
+            _circuitos_compilados.move_to_end(chave)
+            _estatisticas_cache['acertos'] += 1
+            return _circuitos_compilados[chave]
+        _estatisticas_cache['falhas'] += 1
+
+    simulador = simulador_compartilhado(metodo_simulacao(qc, ruido), ruido)
+    nativas = INSTRUCOES_NATIVAS.union(simulador.configuration().basis_gates)
+    with etapa('transpilacao'):
+        if all(instrucao.operation.name in nativas for instrucao in qc.data):
+            compilado = (simulador, qc)
+        elif ruido is None:
+            compilado = (simulador, transpile(qc, simulador))
+        else:
+            compilado = (simulador, transpile(qc, simulador, optimization_level=0))
+
+    with _trava:
+        _circuitos_compilados[chave] = compilado
+        while len(_circuitos_compilados) > MAX_CIRCUITOS_COMPILADOS:
+            _circuitos_compilados.popitem(last=False)
+    return compilado
+
+
+def estatisticas_cache():
+    """
+    Informa o estado do cache de circuitos compilados
+
+    Returns:
+        dict: Circuitos em cache, acertos e falhas desde o início do processo
+    """
+    with _trava:
+        return {'circuitos': len(_circuitos_compilados), **_estatisticas_cache}
+
+
+def limpar_cache():
+    """
+    Esvazia o cache de circuitos compilados e zera suas estatísticas
+    """
+    with _trava:
+        _circuitos_compilados.clear()
+        _estatisticas_cache.update(acertos=0, falhas=0)
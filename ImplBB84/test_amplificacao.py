@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from amplificacao import hash_toeplitz
+
+
+def _toeplitz_denso(semente, n, m):
+    """
+    Monta explicitamente a matriz T[i, j] = semente[i - j + n - 1]
+
+    Args:
+        semente (np.ndarray): Vetor de n + m - 1 bits
+        n (int): Número de colunas
+        m (int): Número de linhas
+
+    Returns:
+        np.ndarray: Matriz (m, n) de bits
+    """
+    i, j = np.indices((m, n))
+    return semente[i - j + n - 1]
+
+
+@pytest.mark.parametrize('n, m', [(1, 1), (7, 3), (64, 64), (100, 37), (257, 200), (1000, 1)])
+def test_hash_toeplitz_igual_ao_produto_denso(n, m):
+    rng = np.random.default_rng(n * 1000 + m)
+    semente = rng.integers(0, 2, n + m - 1, dtype=np.uint8)
+    blocos = rng.integers(0, 2, (5, n), dtype=np.uint8)
+
+    esperado = (blocos.astype(np.int64) @ _toeplitz_denso(semente, n, m).T.astype(np.int64)) & 1
+
+    np.testing.assert_array_equal(hash_toeplitz(semente, blocos, m), esperado.astype(np.uint8))
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from eve import interceptar_reenviar
+from main import bb84_protocolo
+
+# Qubits por execução: o backend 'aer' executa um circuito por qubit e
+# limita o tamanho da amostra; o 'numpy' serve de referência com muito mais
+N_BITS_AER = {'aer': 2_000, 'aer_lote': 10_000, 'aer_modelos': 50_000}
+N_BITS_NUMPY = 1_000_000
+
+# Desvios padrão tolerados entre as proporções dos dois backends; com as
+# sementes fixas o teste é determinístico, e z = 4 corresponde a uma chance
+# de falso alarme da ordem de 1e-4
+Z_TOLERANCIA = 4.0
+
+ERRO_CANAL = 0.1
+
+
+def _dentro_do_intervalo(sucessos_a, n_a, sucessos_b, n_b):
+    """
+    Verifica se duas proporções binomiais são compatíveis
+
+    Args:
+        sucessos_a (int): Sucessos da primeira amostra
+        n_a (int): Tamanho da primeira amostra
+        sucessos_b (int): Sucessos da segunda amostra
+        n_b (int): Tamanho da segunda amostra
+
+    Returns:
+        bool: True se a diferença cabe em `Z_TOLERANCIA` desvios padrão da proporção combinada
+    """
+    combinada = (sucessos_a + sucessos_b) / (n_a + n_b)
+    desvio = np.sqrt(combinada * (1 - combinada) * (1 / n_a + 1 / n_b))
+    return abs(sucessos_a / n_a - sucessos_b / n_b) <= Z_TOLERANCIA * desvio
+
+
+@pytest.fixture(scope='module')
+def referencias():
+    return {
+        presenca_eve: bb84_protocolo(n_bits=N_BITS_NUMPY, erro_canal=ERRO_CANAL, presenca_eve=presenca_eve,
+                                     backend='numpy', manter_arrays=False, seed=2024)
+        for presenca_eve in (False, True)
+    }
+
+
+@pytest.mark.parametrize('presenca_eve', [False, True])
+@pytest.mark.parametrize('backend', list(N_BITS_AER))
+def test_numpy_equivale_ao_aer(backend, presenca_eve, referencias):
+    n_bits = N_BITS_AER[backend]
+    aer = bb84_protocolo(n_bits=n_bits, erro_canal=ERRO_CANAL, presenca_eve=presenca_eve, backend=backend,
+                         manter_arrays=False, seed=7)
+    numpy = referencias[presenca_eve]
+
+    # Fração peneirada: bits da chave por qubit transmitido
+    assert _dentro_do_intervalo(aer.tamanho_chave, n_bits, numpy.tamanho_chave, N_BITS_NUMPY)
+    # Taxa de erro: bits divergentes por bit da chave peneirada
+    assert _dentro_do_intervalo(aer.erros, aer.tamanho_chave, numpy.erros, numpy.tamanho_chave)
+
+
+@pytest.mark.parametrize('ruido', ['leitura', 'depolarizante'])
+def test_ruido_com_eve_igual_nos_backends_aer(ruido):
+    # No 'aer' Eve mede em um job próprio; nos outros, no meio do circuito ruidoso
+    por_qubit = bb84_protocolo(n_bits=N_BITS_AER['aer'], erro_canal=ERRO_CANAL, presenca_eve=True, backend='aer',
+                               ruido=ruido, manter_arrays=False, seed=7)
+    modelos = bb84_protocolo(n_bits=N_BITS_AER['aer_modelos'], erro_canal=ERRO_CANAL, presenca_eve=True,
+                             backend='aer_modelos', ruido=ruido, manter_arrays=False, seed=7)
+    assert _dentro_do_intervalo(por_qubit.erros, por_qubit.tamanho_chave, modelos.erros, modelos.tamanho_chave)
+
+
+@pytest.mark.parametrize('presenca_eve', [False, True])
+def test_numpy_segue_a_taxa_de_erro_teorica(presenca_eve, referencias):
+    # O canal só afeta a base computacional (metade dos qubits), e Eve erra metade das bases
+    esperada = 0.25 + ERRO_CANAL / 4 if presenca_eve else ERRO_CANAL / 2
+    resumo = referencias[presenca_eve]
+    desvio = np.sqrt(esperada * (1 - esperada) / resumo.tamanho_chave)
+    assert abs(resumo.taxa_erro - esperada) <= Z_TOLERANCIA * desvio
+
+
+def test_numpy_devolve_o_mesmo_dicionario_que_o_aer():
+    aer = bb84_protocolo(n_bits=50, presenca_eve=True, backend='aer', seed=1)
+    numpy = bb84_protocolo(n_bits=50, presenca_eve=True, backend='numpy', seed=1)
+    assert aer.keys() == numpy.keys()
+    for chave in aer:
+        assert type(aer[chave]) is type(numpy[chave]), chave
+    assert len(numpy['alice_bits']) == len(numpy['bob_resultados']) == 50
+
+
+def test_eve_exige_presenca_eve_compativel():
+    with pytest.raises(ValueError):
+        bb84_protocolo(n_bits=50, presenca_eve=False, backend='numpy', eve=interceptar_reenviar(0.5), seed=1)
+    # Sem presenca_eve explícito, ou com True, o modelo de ataque é usado
+    implicito = bb84_protocolo(n_bits=50, backend='numpy', eve=interceptar_reenviar(0.5), seed=1)
+    explicito = bb84_protocolo(n_bits=50, presenca_eve=True, backend='numpy', eve=interceptar_reenviar(0.5), seed=1)
+    np.testing.assert_array_equal(implicito['bob_resultados'], explicito['bob_resultados'])
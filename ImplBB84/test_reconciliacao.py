@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from reconciliacao import LIMIARES_LDPC, ldpc_reconciliacao
+
+TAMANHO_QUADRO = 4096
+QUADROS = 100
+# Taxa de falha de quadro prometida em `LIMIARES_LDPC`
+FER_MAXIMA = 0.05
+
+
+def test_limiares_ldpc_sao_monotonicos():
+    taxas = [taxa for taxa, _ in LIMIARES_LDPC]
+    limiares = [limiar for _, limiar in LIMIARES_LDPC]
+    assert taxas == sorted(taxas, reverse=True)
+    assert limiares == sorted(set(limiares))
+
+
+@pytest.mark.parametrize('taxa_codigo, limiar', LIMIARES_LDPC)
+def test_ldpc_corrige_a_taxa_de_erro_do_limiar(taxa_codigo, limiar):
+    rng = np.random.default_rng(2024)
+    alice = rng.integers(0, 2, QUADROS * TAMANHO_QUADRO, dtype=np.uint8)
+    bob = alice ^ (rng.random(alice.size) < limiar).astype(np.uint8)
+
+    resultado = ldpc_reconciliacao(alice, bob, limiar, tamanho_quadro=TAMANHO_QUADRO)
+
+    assert resultado['taxa_codigo'] == taxa_codigo
+    assert 1 - resultado['quadros_validos'].mean() <= FER_MAXIMA
@@ -0,0 +1,26 @@
+import math
+
+import pytest
+
+from varredura import VarreduraBB84, _resumir
+
+
+def test_resumir_sem_intervalo_com_uma_repeticao():
+    linha = _resumir([0.03], 'taxa_erro')
+    assert linha['taxa_erro_media'] == 0.03
+    assert all(math.isnan(linha[f'taxa_erro_{coluna}']) for coluna in ('desvio', 'ic_inf', 'ic_sup'))
+
+
+def test_resumir_intervalo_em_torno_da_media():
+    linha = _resumir([1.0, 2.0, 3.0], 'tamanho_chave')
+    assert linha['tamanho_chave_media'] == 2.0
+    assert linha['tamanho_chave_desvio'] == 1.0
+    assert linha['tamanho_chave_ic_inf'] < 2.0 < linha['tamanho_chave_ic_sup']
+    assert linha['tamanho_chave_ic_sup'] - 2.0 == pytest.approx(1.959963984540054 / math.sqrt(3))
+
+
+def test_varredura_recusa_fracao_intermediaria_fora_do_numpy():
+    with pytest.raises(ValueError):
+        VarreduraBB84((0.05,), fracao_eve=(0.0, 0.5), backend='aer_modelos')
+    # Interceptação nula ou total funciona em qualquer backend
+    assert VarreduraBB84((0.05,), fracao_eve=(0.0, 1.0), backend='aer_modelos').faltantes() == 2
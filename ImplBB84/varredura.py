@@ -0,0 +1,368 @@
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from eve import interceptar_reenviar
+from execucao import CANCELADA, CONCLUIDA, EXECUTANDO, FALHOU, PENDENTE
+from main import BACKENDS, bb84_protocolo
+from reconciliacao import entropia_binaria
+
+# Quantil da normal padrão para intervalos de confiança de 95%
+Z_95 = 1.959963984540054
+
+
+def taxa_chave_assintotica(tamanho_chave, n_bits, taxa_erro):
+    """
+    Calcula a taxa de chave secreta por qubit transmitido no limite assintótico
+
+    Usa o limite de Shor-Preskill, 1 - 2·h(Q) bits seguros por bit peneirado,
+    que se anula a partir de Q ≈ 11%.
+
+    Args:
+        tamanho_chave (int | np.ndarray): Bits da chave peneirada
+        n_bits (int): Qubits transmitidos
+        taxa_erro (float | np.ndarray): Taxa de erro da chave peneirada
+
+    Returns:
+        float | np.ndarray: Bits de chave secreta por qubit transmitido
+    """
+    fracao_segura = np.maximum(1 - 2 * entropia_binaria(taxa_erro), 0.0)
+    return (np.asarray(tamanho_chave, dtype=float) / n_bits * fracao_segura)[()]
+
+
+def _executar_ponto(tarefa):
+    """
+    Executa as repetições de um ponto (erro do canal, fração interceptada) em um processo do pool
+
+    Interceptação nula ou total usa `presenca_eve`, aceito por todos os
+    backends; frações intermediárias usam `eve.interceptar_reenviar` e
+    exigem o backend 'numpy'. Cada ponto recebe seu próprio fluxo
+    aleatório, independente da ordem de execução.
+
+    Args:
+        tarefa (tuple): (n_bits, erro_canal, fracao_eve, repeticoes, backend, semente)
+
+    Returns:
+        tuple: Listas com a taxa de erro e o tamanho da chave de cada repetição
+    """
+    n_bits, erro_canal, fracao_eve, repeticoes, backend, semente = tarefa
+    if fracao_eve in (0, 1):
+        ataque = {'presenca_eve': bool(fracao_eve)}
+    else:
+        ataque = {'eve': interceptar_reenviar(fracao_eve)}
+
+    rng = np.random.default_rng(semente)
+    taxas_erro = []
+    tamanhos_chave = []
+    for _ in range(repeticoes):
+        resultado = bb84_protocolo(n_bits=n_bits, erro_canal=erro_canal, backend=backend, manter_arrays=False,
+                                   rng=rng, **ataque)
+        taxas_erro.append(float(resultado['taxa_erro']))
+        tamanhos_chave.append(int(resultado['tamanho_chave']))
+    return taxas_erro, tamanhos_chave
+
+
+def _resumir(valores, prefixo):
+    """
+    Calcula média, desvio padrão e intervalo de confiança de 95% de uma amostra
+
+    Args:
+        valores (list): Valores observados nas repetições
+        prefixo (str): Prefixo dos nomes das colunas
+
+    Returns:
+        dict: Colunas `<prefixo>_media`, `_desvio`, `_ic_inf` e `_ic_sup`
+            (desvio e intervalo são NaN com menos de duas repetições)
+    """
+    valores = np.asarray(valores, dtype=float)
+    media = valores.mean()
+    # Com uma única repetição não há como estimar a dispersão
+    desvio = valores.std(ddof=1) if len(valores) > 1 else float('nan')
+    margem = Z_95 * desvio / np.sqrt(len(valores))
+    return {
+        f'{prefixo}_media': float(media),
+        f'{prefixo}_desvio': float(desvio),
+        f'{prefixo}_ic_inf': float(media - margem),
+        f'{prefixo}_ic_sup': float(media + margem),
+    }
+
+
+def varrer_parametros(n_bits=(1000,), erro_canal=(0.05,), presenca_eve=(False, True),
+                      repeticoes=10, backend="numpy", seed=None, max_workers=None):
+    """
+    Executa o BB84 sobre a grade de parâmetros em paralelo (Monte Carlo)
+
+    Cada ponto da grade recebe um filho independente de
+    `np.random.SeedSequence(seed)`, de modo que o resultado é idêntico bit a
+    bit para a mesma semente, qualquer que seja o número de processos.
+
+    Args:
+        n_bits (iterable): Valores de número de qubits
+        erro_canal (iterable): Valores de taxa de erro do canal
+        presenca_eve (iterable): Valores de presença de espião
+        repeticoes (int): Repetições por ponto da grade
+        backend (str): Backend de `bb84_protocolo`
+        seed (int | None): Semente raiz da varredura
+        max_workers (int | None): Número de processos (None usa todos os núcleos)
+
+    Returns:
+        list: Uma linha (dict) por ponto da grade, com médias e intervalos de confiança
+    """
+    configuracoes = list(itertools.product(n_bits, erro_canal, presenca_eve))
+    sementes = np.random.SeedSequence(seed).spawn(len(configuracoes))
+    # Presença de Eve equivale a interceptar todos os qubits (fração 1) ou nenhum (fração 0)
+    tarefas = [(n, erro, float(bool(eve)), repeticoes, backend, semente)
+               for (n, erro, eve), semente in zip(configuracoes, sementes)]
+
+    # Agrupa tarefas pequenas para reduzir a comunicação entre processos
+    n_processos = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(tarefas) // (4 * n_processos))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        resultados = list(executor.map(_executar_ponto, tarefas, chunksize=chunksize))
+
+    tabela = []
+    for (n, erro, eve), (taxas_erro, tamanhos_chave) in zip(configuracoes, resultados):
+        linha = {'n_bits': n, 'erro_canal': erro, 'presenca_eve': eve, 'repeticoes': repeticoes}
+        linha.update(_resumir(taxas_erro, 'taxa_erro'))
+        linha.update(_resumir(tamanhos_chave, 'tamanho_chave'))
+        tabela.append(linha)
+    return tabela
+
+
+def chave_ponto(n_bits, erro_canal, fracao_eve, repeticoes, backend, seed):
+    """
+    Identifica um ponto de varredura no cache de `VarreduraBB84`
+
+    Args:
+        n_bits (int): Qubits por repetição
+        erro_canal (float): Taxa de erro do canal quântico
+        fracao_eve (float): Fração dos qubits interceptados por Eve
+        repeticoes (int): Repetições do ponto
+        backend (str): Backend de `bb84_protocolo`
+        seed (int): Semente raiz da varredura
+
+    Returns:
+        tuple: Chave hashable, com as frações arredondadas para evitar ruído de ponto flutuante
+    """
+    return (int(n_bits), round(float(erro_canal), 6), round(float(fracao_eve), 6), int(repeticoes), backend, seed)
+
+
+def podar_cache(cache, limite, preservar=()):
+    """
+    Descarta os pontos mais antigos do cache até que ele caiba em `limite`
+
+    Args:
+        cache (dict): Linhas indexadas por `chave_ponto`, em ordem de inserção
+        limite (int): Número máximo de pontos
+        preservar (iterable): Chaves que não podem ser descartadas (as de varreduras em andamento)
+
+    Returns:
+        int: Número de pontos descartados
+    """
+    excesso = len(cache) - limite
+    if excesso <= 0:
+        return 0
+    preservar = set(preservar)
+    descartados = 0
+    for chave in list(cache):
+        if descartados >= excesso:
+            break
+        if chave not in preservar and cache.pop(chave, None) is not None:
+            descartados += 1
+    return descartados
+
+
+class VarreduraBB84:
+    """
+    Varredura Monte Carlo de erro do canal × fração interceptada, preenchida ponto a ponto
+
+    Cada ponto da grade é uma tarefa do pool de processos; as linhas (como
+    as de `varrer_parametros`, com a taxa de chave assintótica e a fração
+    interceptada) entram em `cache` à medida que os pontos terminam, e
+    `tabela()` devolve os já disponíveis, em ordem de grade. Pontos já
+    presentes em `cache` não são recalculados, e cada ponto tem uma
+    semente derivada apenas da semente raiz e dos seus parâmetros: a mesma
+    grade, ou outra que a contenha, reproduz os mesmos valores. Como
+    `execucao.ExecucaoBB84`, `iniciar()` cria uma thread própria e
+    `executar()` roda na thread de quem chama.
+
+    Args:
+        erro_canal (iterable): Valores de taxa de erro do canal
+        fracao_eve (iterable): Valores de fração dos qubits interceptados (0 a 1)
+        n_bits (int): Qubits por repetição
+        repeticoes (int): Repetições por ponto
+        backend (str): Backend de `bb84_protocolo` ('numpy' para frações intermediárias)
+        seed (int | None): Semente raiz (None sorteia uma)
+        cache (dict | None): Linhas já calculadas, indexadas por `chave_ponto`; atualizado pela varredura
+        executor (concurrent.futures.Executor | None): Pool a usar; None cria um `ProcessPoolExecutor` próprio
+        max_workers (int | None): Processos do pool próprio (None usa todos os núcleos)
+    """
+
+    def __init__(self, erro_canal, fracao_eve=(0.0, 1.0), n_bits=10_000, repeticoes=10, backend="numpy",
+                 seed=None, cache=None, executor=None, max_workers=None):
+        if n_bits <= 0 or repeticoes <= 0:
+            raise ValueError("n_bits e repeticoes devem ser positivos")
+        fracao_eve = list(fracao_eve)
+        if any(not 0 <= fracao <= 1 for fracao in fracao_eve):
+            raise ValueError("fracao_eve deve estar entre 0 e 1")
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend desconhecido: {backend!r}. Opções: {', '.join(BACKENDS)}")
+        # Falha aqui, e não nos processos do pool, se `bb84_protocolo` recusaria o modelo de Eve
+        if backend != 'numpy' and any(0 < fracao < 1 for fracao in fracao_eve):
+            raise ValueError("Frações intermediárias de fracao_eve exigem o backend 'numpy'")
+        self.grade = list(itertools.product(erro_canal, fracao_eve))
+        self.n_bits = n_bits
+        self.repeticoes = repeticoes
+        self.backend = backend
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy)
+        self.cache = cache if cache is not None else {}
+        self.executor = executor
+        self.max_workers = max_workers
+
+        self.chaves = [chave_ponto(n_bits, erro, fracao, repeticoes, backend, self.seed) for erro, fracao in self.grade]
+        self.reaproveitados = sum(chave in self.cache for chave in self.chaves)
+        self.estado = PENDENTE
+        self.erro = None
+        self._calculados = 0
+        self._inicio = None
+        self._fim = None
+        self._cancelar = threading.Event()
+        self._terminada = threading.Event()
+
+    def iniciar(self):
+        """
+        Inicia a varredura em uma thread própria
+
+        Returns:
+            VarreduraBB84: A própria varredura
+        """
+        threading.Thread(target=self.executar, daemon=True, name="VarreduraBB84").start()
+        return self
+
+    def executar(self):
+        """
+        Calcula os pontos que faltam no cache, até o fim ou o cancelamento
+
+        Returns:
+            VarreduraBB84: A própria varredura
+        """
+        if self._cancelar.is_set():
+            return self
+        self._inicio = time.perf_counter()
+        self.estado = EXECUTANDO
+        executor = self.executor or ProcessPoolExecutor(max_workers=self.max_workers)
+        futuros = {}
+        try:
+            for (erro, fracao), chave in zip(self.grade, self.chaves):
+                if chave in self.cache or chave in futuros.values():
+                    continue
+                tarefa = (self.n_bits, erro, fracao, self.repeticoes, self.backend, self._semente(erro, fracao))
+                futuros[executor.submit(_executar_ponto, tarefa)] = chave
+
+            pendentes = set(futuros)
+            while pendentes:
+                # Espera com prazo para atender ao cancelamento mesmo sem pontos terminando
+                prontos, pendentes = wait(pendentes, timeout=0.2, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    self._registrar(futuros[futuro], *futuro.result())
+                if self._cancelar.is_set():
+                    self.estado = CANCELADA
+                    return self
+            self.estado = CONCLUIDA
+        except Exception as erro:
+            self.erro = erro
+            self.estado = FALHOU
+        finally:
+            for futuro in futuros:
+                futuro.cancel()
+            if self.executor is None:
+                executor.shutdown(wait=False)
+            self._fim = time.perf_counter()
+            self._terminada.set()
+        return self
+
+    def cancelar(self):
+        """
+        Pede a interrupção da varredura; pontos já em cálculo terminam, mas são descartados
+
+        Uma varredura que ainda não começou é cancelada na hora.
+        """
+        self._cancelar.set()
+        if self.estado == PENDENTE:
+            self.estado = CANCELADA
+            self._terminada.set()
+
+    def aguardar(self, timeout=None):
+        """
+        Bloqueia até a varredura terminar
+
+        Args:
+            timeout (float | None): Tempo máximo de espera, em segundos
+
+        Returns:
+            bool: True se a varredura terminou
+        """
+        return self._terminada.wait(timeout)
+
+    @property
+    def ativa(self):
+        return self.estado in (PENDENTE, EXECUTANDO)
+
+    def faltantes(self):
+        """
+        Conta os pontos da grade ainda ausentes do cache
+
+        Returns:
+            int: Número de pontos
+        """
+        return sum(chave not in self.cache for chave in set(self.chaves))
+
+    def progresso(self):
+        """
+        Retrata o estado atual da varredura
+
+        Returns:
+            dict: Estado, pontos da grade, reaproveitados do cache e calculados, fração concluída e tempo decorrido
+        """
+        total = len(set(self.chaves))
+        concluidos = total - self.faltantes()
+        fim = self._fim if self._fim is not None else time.perf_counter()
+        return {
+            'estado': self.estado,
+            'total': total,
+            'reaproveitados': self.reaproveitados,
+            'calculados': self._calculados,
+            'fracao': concluidos / total if total else 1.0,
+            'tempo': fim - self._inicio if self._inicio is not None else 0.0,
+        }
+
+    def tabela(self):
+        """
+        Lista as linhas dos pontos da grade já disponíveis
+
+        Returns:
+            list: Uma linha (dict) por ponto disponível, em ordem de grade
+        """
+        # O cache pode ser podado por outra thread entre a consulta e a leitura
+        linhas = (self.cache.get(chave) for chave in self.chaves)
+        return [linha for linha in linhas if linha is not None]
+
+    def _semente(self, erro_canal, fracao_eve):
+        # Depende só da semente raiz e do ponto, não da grade em que ele aparece
+        return np.random.SeedSequence(self.seed, spawn_key=(self.n_bits, round(erro_canal * 1e6),
+                                                            round(fracao_eve * 1e6)))
+
+    def _registrar(self, chave, taxas_erro, tamanhos_chave):
+        n_bits, erro, fracao, repeticoes, backend, _ = chave
+        linha = {'n_bits': n_bits, 'erro_canal': erro, 'fracao_eve': fracao, 'repeticoes': repeticoes}
+        linha.update(_resumir(taxas_erro, 'taxa_erro'))
+        linha.update(_resumir(tamanhos_chave, 'tamanho_chave'))
+        linha.update(_resumir(taxa_chave_assintotica(np.array(tamanhos_chave), n_bits, np.array(taxas_erro)),
+                              'taxa_chave'))
+        self.cache[chave] = linha
+        self._calculados += 1
@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+# O simulador BB84 fica em ImplBB84, com importações planas entre módulos
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ImplBB84'))
+
+import qiskit_aer  # noqa: E402
+from main import BACKENDS, bb84_protocolo  # noqa: E402
+
+# Tamanhos medidos por backend; os backends Aer por qubit são ordens de grandeza mais lentos
+TAMANHOS_PADRAO = {
+    'aer': [100, 1000],
+    'aer_lote': [1000, 10_000],
+    'aer_modelos': [10_000, 100_000],
+    'numpy': [100_000, 1_000_000],
+}
+
+# Tamanhos reduzidos para uma verificação rápida
+TAMANHOS_RAPIDOS = {
+    'aer': [100],
+    'aer_lote': [1000],
+    'aer_modelos': [10_000],
+    'numpy': [100_000],
+}
+
+
+def benchmark_cenario(backend, n_bits, presenca_eve, repeticoes=5, aquecimento=2, erro_canal=0.05, seed=0):
+    """
+    Mede a vazão de `bb84_protocolo` em um cenário
+
+    As execuções de aquecimento preenchem os caches de simuladores e
+    circuitos compilados; o tempo de cada repetição é medido com
+    `perf_counter` e a mediana é usada como valor representativo. O pico de
+    memória vem de uma execução extra sob `tracemalloc`, para não distorcer
+    os tempos, e cobre apenas alocações Python/NumPy (não a memória interna
+    do Aer).
+
+    Args:
+        backend (str): Backend de `bb84_protocolo`
+        n_bits (int): Qubits por execução
+        presenca_eve (bool): Se True, simula a presença de um espião
+        repeticoes (int): Execuções cronometradas
+        aquecimento (int): Execuções descartadas antes da medição
+        erro_canal (float): Taxa de erro do canal quântico
+        seed (int): Semente das execuções
+
+    Returns:
+        dict: Qubits e bits peneirados por segundo (mediana e extremos), tempos e pico de memória
+    """
+    for i in range(aquecimento):
+        bb84_protocolo(n_bits=n_bits, erro_canal=erro_canal, presenca_eve=presenca_eve, backend=backend,
+                       manter_arrays=False, seed=seed + i)
+
+    tempos = []
+    peneirados = []
+    for i in range(repeticoes):
+        inicio = time.perf_counter()
+        resumo = bb84_protocolo(n_bits=n_bits, erro_canal=erro_canal, presenca_eve=presenca_eve,
+                                backend=backend, manter_arrays=False, seed=seed + aquecimento + i)
+        tempos.append(time.perf_counter() - inicio)
+        peneirados.append(resumo.tamanho_chave)
+
+    tracemalloc.start()
+    bb84_protocolo(n_bits=n_bits, erro_canal=erro_canal, presenca_eve=presenca_eve, backend=backend,
+                   manter_arrays=False, seed=seed)
+    pico_memoria = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    vazoes = [n_bits / tempo for tempo in tempos]
+    vazoes_peneiradas = [bits / tempo for bits, tempo in zip(peneirados, tempos)]
+    return {
+        'backend': backend,
+        'n_bits': n_bits,
+        'presenca_eve': presenca_eve,
+        'repeticoes': repeticoes,
+        'qubits_por_segundo': statistics.median(vazoes),
+        'qubits_por_segundo_min': min(vazoes),
+        'qubits_por_segundo_max': max(vazoes),
+        'bits_peneirados_por_segundo': statistics.median(vazoes_peneiradas),
+        'tempo_mediano': statistics.median(tempos),
+        'pico_memoria': pico_memoria
+    }
+
+
+def benchmark_bb84(tamanhos=None, repeticoes=5, aquecimento=2, seed=0):
+    """
+    Executa o benchmark em todos os backends, tamanhos e com/sem espião
+
+    Args:
+        tamanhos (dict | None): Backend -> lista de n_bits (padrão: `TAMANHOS_PADRAO`)
+        repeticoes (int): Execuções cronometradas por cenário
+        aquecimento (int): Execuções descartadas por cenário
+        seed (int): Semente das execuções
+
+    Returns:
+        dict: Resultado de cada cenário, indexado por 'backend/n_bits/eve'
+    """
+    tamanhos = tamanhos or TAMANHOS_PADRAO
+    resultados = {}
+    for backend, lista_n_bits in tamanhos.items():
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend desconhecido: {backend!r}")
+        for n_bits in lista_n_bits:
+            for presenca_eve in (False, True):
+                chave = f"{backend}/{n_bits}/{'com_eve' if presenca_eve else 'sem_eve'}"
+                resultados[chave] = benchmark_cenario(backend, n_bits, presenca_eve, repeticoes, aquecimento,
+                                                      seed=seed)
+                print(f"{chave:32s} {resultados[chave]['qubits_por_segundo']:>14,.0f} qubits/s "
+                      f"{resultados[chave]['bits_peneirados_por_segundo']:>14,.0f} bits peneirados/s "
+                      f"{resultados[chave]['pico_memoria'] / 2 ** 20:>8.1f} MiB")
+    return resultados
+
+
+def salvar_resultados(resultados, caminho):
+    """
+    Grava os resultados em JSON, com a descrição do ambiente de execução
+
+    Args:
+        resultados (dict): Saída de `benchmark_bb84`
+        caminho (str): Arquivo de saída
+    """
+    documento = {
+        'ambiente': {
+            'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'processador': platform.processor(),
+            'numpy': np.__version__,
+            'qiskit_aer': qiskit_aer.__version__,
+        },
+        'resultados': resultados
+    }
+    with open(caminho, 'w') as arquivo:
+        json.dump(documento, arquivo, indent=2)
+
+
+def comparar_com_base(resultados, base, limiar=0.2):
+    """
+    Compara a vazão de cada cenário com uma execução anterior
+
+    Args:
+        resultados (dict): Saída de `benchmark_bb84`
+        base (dict): Documento gravado por `salvar_resultados`
+        limiar (float): Queda relativa de qubits/s tolerada (0.2 = 20%)
+
+    Returns:
+        tuple: (linhas de comparação, lista de cenários com regressão)
+    """
+    comparacao = []
+    regressoes = []
+    for chave, atual in resultados.items():
+        anterior = base['resultados'].get(chave)
+        if anterior is None:
+            continue
+        variacao = atual['qubits_por_segundo'] / anterior['qubits_por_segundo'] - 1
+        comparacao.append({
+            'cenario': chave,
+            'qubits_por_segundo_base': anterior['qubits_por_segundo'],
+            'qubits_por_segundo': atual['qubits_por_segundo'],
+            'variacao': variacao
+        })
+        if variacao < -limiar:
+            regressoes.append(chave)
+    return comparacao, regressoes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de vazão do simulador BB84")
+    parser.add_argument('--saida', default='benchmark_bb84.json', help="Arquivo JSON com os resultados")
+    parser.add_argument('--base', default=None, help="Resultados anteriores para detectar regressões")
+    parser.add_argument('--limiar', type=float, default=0.2,
+                        help="Queda relativa de vazão que conta como regressão (padrão: 0.2)")
+    parser.add_argument('--repeticoes', type=int, default=5, help="Execuções cronometradas por cenário")
+    parser.add_argument('--aquecimento', type=int, default=2, help="Execuções descartadas por cenário")
+    parser.add_argument('--backends', nargs='+', default=list(TAMANHOS_PADRAO), choices=list(TAMANHOS_PADRAO),
+                        help="Backends a medir")
+    parser.add_argument('--rapido', action='store_true', help="Usa apenas os tamanhos menores")
+    args = parser.parse_args()
+
+    # A base é lida antes de medir; gravar a saída por cima dela apagaria a referência
+    base = None
+    if args.base:
+        if os.path.realpath(args.base) == os.path.realpath(args.saida):
+            parser.error("--saida não pode ser o mesmo arquivo de --base")
+        with open(args.base) as arquivo:
+            base = json.load(arquivo)
+
+    tabela_tamanhos = TAMANHOS_RAPIDOS if args.rapido else TAMANHOS_PADRAO
+    resultados = benchmark_bb84({b: tabela_tamanhos[b] for b in args.backends}, args.repeticoes, args.aquecimento)
+    salvar_resultados(resultados, args.saida)
+    print(f"\nResultados salvos em {args.saida}")
+
+    if base is not None:
+        comparacao, regressoes = comparar_com_base(resultados, base, args.limiar)
+
+        print(f"\nComparação com {args.base}:")
+        for linha in comparacao:
+            marca = '  <-- REGRESSÃO' if linha['cenario'] in regressoes else ''
+            print(f"{linha['cenario']:32s} {linha['qubits_por_segundo_base']:>14,.0f} -> "
+                  f"{linha['qubits_por_segundo']:>14,.0f} qubits/s ({linha['variacao']:+.1%}){marca}")
+
+        if regressoes:
+            print(f"\n{len(regressoes)} cenário(s) com queda de vazão acima de {args.limiar:.0%}")
+            sys.exit(1)
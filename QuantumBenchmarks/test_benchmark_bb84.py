@@ -0,0 +1,26 @@
+from benchmark_bb84 import comparar_com_base
+
+
+def _cenario(qubits_por_segundo):
+    return {'qubits_por_segundo': qubits_por_segundo}
+
+
+def test_comparar_com_base_aponta_queda_de_vazao():
+    base = {'resultados': {
+        'numpy/100000/sem_eve': _cenario(1_000_000),
+        'numpy/100000/com_eve': _cenario(800_000),
+        'aer_lote/1000/sem_eve': _cenario(5_000),
+    }}
+    # Lentidão injetada só no cenário com Eve: metade da vazão anterior
+    resultados = {
+        'numpy/100000/sem_eve': _cenario(950_000),
+        'numpy/100000/com_eve': _cenario(400_000),
+        'aer_modelos/10000/sem_eve': _cenario(50_000),
+    }
+
+    comparacao, regressoes = comparar_com_base(resultados, base, limiar=0.2)
+
+    assert regressoes == ['numpy/100000/com_eve']
+    # Cenários ausentes da base não entram na comparação
+    assert [linha['cenario'] for linha in comparacao] == ['numpy/100000/sem_eve', 'numpy/100000/com_eve']
+    assert comparacao[1]['variacao'] == -0.5